@@ -0,0 +1,145 @@
+# benchmarks/generators.py
+"""
+Synthetic gazettes in the same JSON shape as the files under input/.
+
+Amendment and person gazettes are generated against a current state, so their
+OMIT positions, MOVEs, TERMINATEs and RENAMEs point at departments and
+portfolios that actually exist and exercise the same lookups as real input.
+"""
+import random
+
+TOPICS = [
+    "Defence", "Finance", "Health", "Education", "Agriculture", "Fisheries", "Irrigation",
+    "Transport", "Highways", "Ports", "Aviation", "Energy", "Power", "Water Supply",
+    "Environment", "Wildlife", "Forest Conservation", "Tourism", "Trade", "Industries",
+    "Justice", "Labour", "Foreign Employment", "Mass Media", "Technology", "Science",
+    "Research", "Youth Affairs", "Sports", "Women and Child Affairs", "Public Security",
+    "Urban Development", "Housing", "Plantation", "Cultural Affairs", "Buddhasasana",
+    "Religious Affairs", "Public Administration", "Home Affairs", "Provincial Councils",
+    "Local Government", "Skills Development", "Vocational Training", "Disaster Management",
+]
+DEPARTMENT_PATTERNS = [
+    "Department of {}", "{} Authority", "National {} Board", "{} Development Corporation",
+    "{} Research Institute", "{} Commission", "Office of the Commissioner of {}", "{} Fund",
+]
+POSITIONS = ["Minister", "State Minister", "Deputy Minister"]
+FIRST_NAMES = [
+    "Sarath", "Kabir", "Thalatha", "Mahinda", "Ranil", "Sajith", "Anura", "Dinesh", "Pavithra",
+    "Bandula", "Keheliya", "Nimal", "Harin", "Manusha", "Vijitha", "Kanchana", "Susil", "Wimal",
+]
+LAST_NAMES = [
+    "Amunugama", "Hashim", "Atukorale", "Perera", "Fernando", "Silva", "Gunawardena",
+    "Wanniarachchi", "Rambukwella", "Siripala", "Fernandopulle", "Herath", "Jayasekara",
+    "Rajapaksa", "Premadasa", "Dissanayake", "Wickremesinghe", "Weerawansa",
+]
+
+
+class SyntheticGazettes:
+    """Seeded generator; every name it hands out is unique within one instance."""
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+        self._used = set()
+
+    def _fresh(self, make) -> str:
+        for _ in range(20):
+            name = make()
+            if name not in self._used:
+                break
+        else:
+            name = f"{make()} {len(self._used)}"
+        self._used.add(name)
+        return name
+
+    def ministry_name(self) -> str:
+        return self._fresh(lambda: "Minister of " + " and ".join(self.rng.sample(TOPICS, self.rng.choice([1, 1, 2]))))
+
+    def department_name(self) -> str:
+        return self._fresh(lambda: self.rng.choice(DEPARTMENT_PATTERNS).format(self.rng.choice(TOPICS)))
+
+    def portfolio_name(self) -> str:
+        return self._fresh(lambda: "Ministry of " + " and ".join(self.rng.sample(TOPICS, self.rng.choice([1, 2, 2, 3]))))
+
+    def person_name(self) -> str:
+        return self._fresh(lambda: f"Hon. {self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}")
+
+    def initial(self, ministries: int = 30, departments: int = 20) -> dict:
+        """An initial gazette with `ministries` ministers of `departments` departments each."""
+        return {
+            "ministers": [
+                {"name": self.ministry_name(), "departments": [self.department_name() for _ in range(departments)]}
+                for _ in range(ministries)
+            ]
+        }
+
+    def amendment(self, state: dict, adds: int = 4, omits: int = 3, moves: int = 3) -> dict:
+        """
+        An amendment gazette on top of `state` ({"ministers": [...]}): `adds`
+        new departments, `omits` departments omitted outright and `moves`
+        departments omitted from one ministry and inserted into another.
+        """
+        ministers = [m for m in state["ministers"] if m["departments"]]
+        slots = [(m["name"], pos, dept) for m in ministers for pos, dept in enumerate(m["departments"], start=1)]
+        picked = self.rng.sample(slots, min(omits + moves, len(slots)))
+
+        omitted = {}
+        inserted = {}
+        for index, (ministry, position, dept) in enumerate(picked):
+            omitted.setdefault(ministry, []).append(position)
+            if index >= omits:
+                others = [m["name"] for m in ministers if m["name"] != ministry] or [ministry]
+                inserted.setdefault(self.rng.choice(others), []).append(dept)
+        for _ in range(adds):
+            inserted.setdefault(self.rng.choice(ministers)["name"], []).append(self.department_name())
+
+        sizes = {m["name"]: len(m["departments"]) for m in ministers}
+        add_entries = []
+        for ministry, depts in inserted.items():
+            details = []
+            for dept in depts:
+                sizes[ministry] += 1
+                details.append(f"Inserted: item {self.rng.randint(1, sizes[ministry])} — {dept}")
+            add_entries.append({"ministry_name": ministry, "affected_column": "II", "details": details})
+
+        omit_entries = []
+        for ministry, positions in omitted.items():
+            items = [str(p) for p in sorted(positions)]
+            detail = f"Omitted: item {items[0]}" if len(items) == 1 else f"Omitted items {', '.join(items[:-1])} and {items[-1]}"
+            omit_entries.append({"ministry_name": ministry, "affected_column": "II", "details": [detail]})
+
+        return {"ADD": add_entries, "OMIT": omit_entries}
+
+    def person(self, state: dict, date_str: str, adds: int = 5, terminates: int = 3, moves: int = 2, renames: int = 1) -> dict:
+        """
+        A person gazette on top of `state` ({"persons": [...]}). A MOVE is a
+        TERMINATE and an ADD for the same person, as in the real gazettes.
+        """
+        # One portfolio per person, so nobody is both moved and terminated
+        held = []
+        for person in state["persons"]:
+            if person["portfolios"]:
+                pf = self.rng.choice(person["portfolios"])
+                held.append((person["person_name"], pf["name"], pf["position"]))
+        portfolios = sorted({pf["name"] for person in state["persons"] for pf in person["portfolios"]})
+        picked = self.rng.sample(held, min(terminates + moves + renames, len(held)))
+
+        data = {"ADD": [], "TERMINATE": [], "RENAME": []}
+        for index, (name, ministry, position) in enumerate(picked):
+            if index < terminates + moves:
+                data["TERMINATE"].append({"name": name, "Ministry": ministry, "date": date_str, "position": position})
+            if terminates <= index < terminates + moves:
+                to_ministry = self.rng.choice(portfolios) if portfolios else self.portfolio_name()
+                data["ADD"].append({"name": name, "Ministry": to_ministry, "date": date_str, "position": self.rng.choice(POSITIONS)})
+            elif index >= terminates + moves:
+                data["RENAME"].append({
+                    "name": name, "old_ministry": ministry, "new_ministry": self.portfolio_name(),
+                    "date": date_str, "position": position,
+                })
+        for _ in range(adds):
+            data["ADD"].append({
+                "name": self.person_name(),
+                "Ministry": self.rng.choice(portfolios) if portfolios and self.rng.random() < 0.5 else self.portfolio_name(),
+                "date": date_str,
+                "position": self.rng.choice(POSITIONS),
+            })
+        return {key: entries for key, entries in data.items() if entries}
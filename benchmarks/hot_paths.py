@@ -0,0 +1,280 @@
+# benchmarks/hot_paths.py
+"""
+Hot-path benchmarks on synthetic gazettes.
+
+Times the processors, both apply_transactions_to_db paths, the state reads and
+the CSV writer on a scratch data/state directory, and reports throughput and
+peak traced memory for each. The mindep and person DBs grow by one version per
+apply, the way they do in production.
+
+Run from the repo root:
+
+    python -m benchmarks.hot_paths --iterations 20 --ministries 30 --departments 20
+
+`--save report.json` keeps the results; `--compare report.json` exits with 1
+if any benchmark got slower or used more memory than that report by more
+than `--tolerance` (default 25%), so it can gate a deployment.
+The storage settings (GZTP_STORAGE, GZTP_POSTGRES_DSN, ...) are honoured;
+note that the run re-creates the PostgreSQL schema.
+"""
+import argparse
+import contextlib
+import copy
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmarks.generators import SyntheticGazettes
+
+START_DATE = date(2020, 1, 1)
+
+
+class Versions:
+    """Hands out increasing (gazette_number, date) pairs, one day apart."""
+
+    def __init__(self, prefix: int):
+        self.prefix = prefix
+        self.count = 0
+
+    def next(self) -> tuple[str, str]:
+        self.count += 1
+        return f"{self.prefix}-{self.count:03d}", (START_DATE + timedelta(days=self.count)).isoformat()
+
+
+def measure(name: str, prepare, run, iterations: int, items: int = 1) -> dict:
+    """
+    Call `run(*prepare())` `iterations` times and once more under tracemalloc.
+    Only `run` is timed; `items` is how many entities one call handles.
+    """
+    timings = []
+    with open(os.devnull, "w") as devnull:
+        for _ in range(iterations):
+            args = prepare()
+            with contextlib.redirect_stdout(devnull):
+                started = time.perf_counter()
+                run(*args)
+                timings.append(time.perf_counter() - started)
+
+        # Traced separately: tracemalloc slows the calls down several times
+        args = prepare()
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(devnull):
+                run(*args)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    total = sum(timings)
+    return {
+        "name": name,
+        "iterations": iterations,
+        "ops_per_s": iterations / total if total else 0.0,
+        "items_per_s": iterations * items / total if total else 0.0,
+        "mean_ms": total / iterations * 1000,
+        "max_ms": max(timings) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def run_benchmarks(args) -> list[dict]:
+    # Imported here so GZTP_DATA_DIR/GZTP_STATE_DIR from main() take effect
+    from gztprocessor.db_connections import db_gov, db_person, db_trans
+    from gztprocessor.gazette_processors import mindep_gazette_processor, person_gazette_processor
+    from gztprocessor.database_handlers import mindep_database_handler, person_database_handler
+    from gztprocessor.state_managers.snapshot_writer import snapshot_writer
+    from gztprocessor import csv_writer
+
+    db_gov.init_db()
+    db_person.init_db()
+    db_trans.init_db()
+
+    gen = SyntheticGazettes(args.seed)
+    mindep_versions = Versions(9000)
+    person_versions = Versions(8000)
+    mindep_state = mindep_database_handler.mindep_state_manager
+    person_state = person_database_handler.person_state_manager
+
+    def latest(state_manager) -> tuple[str, str, dict]:
+        # Lets the background snapshot writes finish outside the timed calls
+        snapshot_writer.flush()
+        with state_manager.get_connection() as conn:
+            cur = conn.cursor()
+            gazette_number, date_str = state_manager.get_latest_db_row(cur)
+            return gazette_number, date_str, state_manager._get_state_from_db(cur, gazette_number, date_str)
+
+    def quiet(fn, *fn_args):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            return fn(*fn_args)
+
+    # Seed both domains
+    initial = gen.initial(args.ministries, args.departments)
+    gazette_number, date_str = mindep_versions.next()
+    ministries = quiet(mindep_gazette_processor.extract_initial_gazette_data, gazette_number, date_str, copy.deepcopy(initial))
+    quiet(mindep_database_handler.load_initial_state_to_db, gazette_number, date_str, ministries)
+
+    gazette_number, date_str = person_versions.next()
+    seed_gazette = gen.person({"persons": []}, date_str, adds=args.persons, terminates=0, moves=0, renames=0)
+    transactions = quiet(person_gazette_processor.process_person_gazette, gazette_number, date_str, seed_gazette)
+    quiet(person_database_handler.apply_transactions_to_db, gazette_number, date_str, transactions)
+
+    department_count = args.ministries * args.departments
+    amendment_size = args.adds + args.omits + args.moves
+    person_size = args.person_adds + args.person_terminates + args.person_moves + args.person_renames
+    results = []
+
+    def next_initial():
+        # Re-reads every department's previous ministry from the latest version
+        gazette_number, date_str = mindep_versions.next()
+        return gazette_number, date_str, copy.deepcopy(initial)
+
+    results.append(measure(
+        "extract_initial_gazette_data", next_initial,
+        mindep_gazette_processor.extract_initial_gazette_data, args.iterations, department_count,
+    ))
+
+    def next_amendment():
+        gazette_number, date_str = mindep_versions.next()
+        return gazette_number, date_str, gen.amendment(latest(mindep_state)[2], args.adds, args.omits, args.moves)
+
+    results.append(measure(
+        "process_amendment_gazette", next_amendment,
+        mindep_gazette_processor.process_amendment_gazette, args.iterations, amendment_size,
+    ))
+
+    def next_amendment_transactions():
+        gazette_number, date_str, data = next_amendment()
+        return gazette_number, date_str, quiet(mindep_gazette_processor.process_amendment_gazette, gazette_number, date_str, data)
+
+    results.append(measure(
+        "mindep apply_transactions_to_db", next_amendment_transactions,
+        mindep_database_handler.apply_transactions_to_db, args.iterations, amendment_size,
+    ))
+
+    def next_person_gazette():
+        gazette_number, date_str = person_versions.next()
+        data = gen.person(
+            latest(person_state)[2], date_str,
+            args.person_adds, args.person_terminates, args.person_moves, args.person_renames,
+        )
+        return gazette_number, date_str, data
+
+    results.append(measure(
+        "process_person_gazette", next_person_gazette,
+        person_gazette_processor.process_person_gazette, args.iterations, person_size,
+    ))
+
+    def next_person_transactions():
+        gazette_number, date_str, data = next_person_gazette()
+        return gazette_number, date_str, quiet(person_gazette_processor.process_person_gazette, gazette_number, date_str, data)
+
+    results.append(measure(
+        "person apply_transactions_to_db", next_person_transactions,
+        person_database_handler.apply_transactions_to_db, args.iterations, person_size,
+    ))
+
+    def read_latest(state_manager):
+        def run(gazette_number, date_str):
+            with state_manager.get_connection() as conn:
+                state_manager._get_state_from_db(conn.cursor(), gazette_number, date_str)
+        return (lambda: latest(state_manager)[:2]), run
+
+    prepare, run = read_latest(mindep_state)
+    results.append(measure("mindep _get_state_from_db", prepare, run, args.iterations, department_count))
+    prepare, run = read_latest(person_state)
+    results.append(measure("person _get_state_from_db", prepare, run, args.iterations, args.persons))
+
+    # CSV output goes to output/ under the current (scratch) directory
+    mindep_latest = latest(mindep_state)
+    initial_structure = [
+        {"name": m["name"], "departments": [{"name": d, "previous_ministry": None} for d in m["departments"]]}
+        for m in mindep_latest[2]["ministers"]
+    ]
+    results.append(measure(
+        "csv_writer.generate_initial_add_csv", lambda: mindep_latest[:2] + (initial_structure,),
+        csv_writer.generate_initial_add_csv, args.iterations, department_count,
+    ))
+    results.append(measure(
+        "csv_writer.generate_amendment_csvs", next_amendment_transactions,
+        csv_writer.generate_amendment_csvs, args.iterations, amendment_size,
+    ))
+    results.append(measure(
+        "csv_writer.generate_person_csvs", next_person_transactions,
+        csv_writer.generate_person_csvs, args.iterations, person_size,
+    ))
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Names and figures of the benchmarks that regressed against `baseline`."""
+    previous = {result["name"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result["name"])
+        if not before:
+            continue
+        for key, label in (("mean_ms", "time"), ("peak_kib", "memory")):
+            if before[key] and result[key] > before[key] * (1 + tolerance):
+                regressions.append(f"{result['name']}: {label} {before[key]:.1f} → {result[key]:.1f} (+{result[key] / before[key] - 1:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and peak memory of the gazette hot paths.")
+    parser.add_argument("--iterations", type=int, default=20, help="timed calls per benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ministries", type=int, default=30, help="ministries in the initial gazette")
+    parser.add_argument("--departments", type=int, default=20, help="departments per ministry")
+    parser.add_argument("--adds", type=int, default=4, help="new departments per amendment")
+    parser.add_argument("--omits", type=int, default=3, help="omitted departments per amendment")
+    parser.add_argument("--moves", type=int, default=3, help="departments moved per amendment")
+    parser.add_argument("--persons", type=int, default=100, help="persons in the first person gazette")
+    parser.add_argument("--person-adds", type=int, default=5)
+    parser.add_argument("--person-terminates", type=int, default=3)
+    parser.add_argument("--person-moves", type=int, default=2)
+    parser.add_argument("--person-renames", type=int, default=1)
+    parser.add_argument("--save", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="JSON results of an earlier run to check against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown/growth against --compare")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="gztp_bench_"))
+    os.environ["GZTP_DATA_DIR"] = str(work_dir / "data")
+    os.environ["GZTP_STATE_DIR"] = str(work_dir / "state")
+    (work_dir / "data").mkdir()
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        results = run_benchmarks(args)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{'benchmark':<38} {'ops/s':>9} {'items/s':>10} {'mean ms':>9} {'max ms':>9} {'peak KiB':>10}")
+    for r in results:
+        print(
+            f"{r['name']:<38} {r['ops_per_s']:9.1f} {r['items_per_s']:10.1f} "
+            f"{r['mean_ms']:9.2f} {r['max_ms']:9.2f} {r['peak_kib']:10.1f}"
+        )
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
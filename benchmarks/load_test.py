@@ -0,0 +1,206 @@
+# benchmarks/load_test.py
+"""
+Multi-worker load test.
+
+For each worker count, starts `uvicorn main:app --workers N` on a fresh data
+and state directory, seeds it with the sample gazettes from request_body/,
+then lets concurrent clients mix state/search reads with re-applied gazettes
+for a fixed time and reports throughput. Afterwards every seeded version must
+still read back exactly as before the run: the re-applied gazettes carry the
+same input, so any difference means concurrent writers interleaved.
+
+Run from the repo root (needs the "api" extra):
+
+    python -m benchmarks.load_test --workers 1 2 4 --clients 16 --duration 10
+
+The storage settings (GZTP_STORAGE, GZTP_POSTGRES_DSN, ...) are passed on to
+the server; note that seeding re-creates the PostgreSQL schema.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+REQUEST_BODY = REPO_ROOT / "request_body"
+
+MINDEP_GAZETTES = [
+    ("initial", "2022-07-22", "2289-43", "initial_tabular"),
+    ("amendment", "2022-09-16", "2297-78", "first_amendment"),
+    ("amendment", "2022-09-16", "2300-24", "second_amendment"),
+]
+PERSON_GAZETTES = [
+    ("2022-07-22", "2067-09", "first_amendment"),
+    ("2022-09-16", "2068-06", "second_amendment"),
+    ("2022-10-05", "2070-12", "third_amendment"),
+]
+
+READS = [
+    "/mindep/state/latest",
+    "/person/state/latest",
+    "/mindep/state/asof/2022-10-01",
+    "/person/state/asof/2022-08-01",
+    "/mindep/state/2022-09-16/2297-78",
+    "/person/state/2022-09-16/2068-06",
+    "/mindep/state/timeline",
+    "/search?q=minister",
+]
+
+
+def _writes() -> list[tuple[str, dict]]:
+    writes = []
+    for kind, date_str, gazette_number, name in MINDEP_GAZETTES:
+        with open(REQUEST_BODY / "mindep" / f"{name}.json", "r", encoding="utf-8") as f:
+            writes.append((f"/mindep/{kind}/{date_str}/{gazette_number}", json.load(f)))
+    for date_str, gazette_number, name in PERSON_GAZETTES:
+        with open(REQUEST_BODY / "person" / f"{name}.json", "r", encoding="utf-8") as f:
+            writes.append((f"/person/{date_str}/{gazette_number}", json.load(f)))
+    return writes
+
+
+def _versions() -> list[str]:
+    return [f"/mindep/state/{d}/{g}" for _, d, g, _ in MINDEP_GAZETTES] + [
+        f"/person/state/{d}/{g}" for d, g, _ in PERSON_GAZETTES
+    ]
+
+
+def _request(base_url: str, path: str, body=None) -> dict:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(
+        base_url + path, data=data, method="POST" if data is not None else "GET",
+        headers={"Content-Type": "application/json", "Accept-Encoding": "identity"},
+    )
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return json.loads(response.read())
+
+
+def _start_server(workers: int, port: int, work_dir: Path, env: dict) -> subprocess.Popen:
+    # Run in the scratch dir so the CSVs under output/ land there too
+    subprocess.run(
+        [sys.executable, "-c",
+         "from gztprocessor.db_connections import db_gov, db_person, db_trans;"
+         "db_gov.init_db(); db_person.init_db(); db_trans.init_db()"],
+        cwd=work_dir, env=env, check=True, stdout=subprocess.DEVNULL,
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", str(REPO_ROOT),
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=work_dir, env=env, stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            _request(base_url, "/")
+            return server
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"Server with {workers} worker(s) did not start")
+
+
+def _client(base_url: str, writes: list, write_ratio: float, stop_at: float, seed: int, results: list):
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    while time.monotonic() < stop_at:
+        started = time.perf_counter()
+        try:
+            if rng.random() < write_ratio:
+                path, body = rng.choice(writes)
+                response = _request(base_url, path, body)
+            else:
+                response = _request(base_url, rng.choice(READS))
+            if isinstance(response, dict) and "error" in response:
+                errors += 1
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+    results.append((latencies, errors))
+
+
+def run(workers: int, clients: int, duration: float, write_ratio: float, port: int) -> dict:
+    work_dir = Path(tempfile.mkdtemp(prefix="gztp_load_"))
+    env = dict(os.environ)
+    env.update({
+        "GZTP_DATA_DIR": str(work_dir / "data"),
+        "GZTP_STATE_DIR": str(work_dir / "state"),
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")])),
+    })
+    server = _start_server(workers, port, work_dir, env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        writes = _writes()
+        for path, body in writes:
+            _request(base_url, path, body)
+        expected = {path: _request(base_url, path) for path in _versions()}
+
+        results = []
+        stop_at = time.monotonic() + duration
+        threads = [
+            threading.Thread(target=_client, args=(base_url, writes, write_ratio, stop_at, seed, results))
+            for seed in range(clients)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        mismatched = [path for path in expected if _request(base_url, path) != expected[path]]
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    latencies = sorted(latency for client_latencies, _ in results for latency in client_latencies)
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+        "mismatched": mismatched,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the API by number of uvicorn workers.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=16, help="concurrent client threads")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per worker count")
+    parser.add_argument("--write-ratio", type=float, default=0.05, help="share of requests re-applying a gazette")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    reports = []
+    for workers in args.workers:
+        report = run(workers, args.clients, args.duration, args.write_ratio, args.port)
+        reports.append(report)
+        print(
+            f"{report['workers']:>3} worker(s): {report['throughput']:8.1f} req/s  "
+            f"p50 {report['p50_ms']:7.1f} ms  p95 {report['p95_ms']:7.1f} ms  "
+            f"({report['requests']} requests, {report['errors']} errors)"
+        )
+        if report["mismatched"]:
+            print(f"❌ Versions changed under concurrent writes: {', '.join(report['mismatched'])}")
+
+    baseline = reports[0]["throughput"]
+    if baseline:
+        print("Scaling: " + ", ".join(f"{r['workers']}w x{r['throughput'] / baseline:.2f}" for r in reports))
+    if any(report["mismatched"] for report in reports):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
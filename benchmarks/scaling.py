@@ -0,0 +1,291 @@
+# benchmarks/scaling.py
+"""
+Latency against history length.
+
+Grows the mindep and person DBs one synthetic gazette at a time (the state
+grows too: every amendment adds a little more than it removes) and, each time
+the history reaches a checkpoint, requests every read endpoint of the state
+router through FastAPI's TestClient for random versions. Reports p50/p95/p99
+latency per endpoint, for get_latest_state_info and for the applies leading up
+to the checkpoint.
+
+Run from the repo root:
+
+    python -m benchmarks.scaling --versions 10 100 1000 10000 --plot scaling.png
+
+Populating 10,000 versions per domain takes a while; `--domains mindep`
+limits the run to one domain. `--plot` needs matplotlib; without it the
+report is printed (and saved with `--save`) only. DELETE /state/reset is not
+measured. The storage settings (GZTP_STORAGE, GZTP_POSTGRES_DSN, ...) are
+honoured; note that the run re-creates the PostgreSQL schema.
+"""
+import argparse
+import contextlib
+import copy
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.generators import SyntheticGazettes
+from benchmarks.hot_paths import Versions
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentiles(latencies: list[float]) -> dict:
+    ordered = sorted(latencies)
+    if not ordered:
+        return {f"p{p}": 0.0 for p in PERCENTILES}
+    return {f"p{p}": ordered[min(len(ordered) - 1, len(ordered) * p // 100)] * 1000 for p in PERCENTILES}
+
+
+class MindepHistory:
+    """Grows the mindep DB one amendment at a time, starting from an initial gazette."""
+
+    prefix = "mindep"
+
+    def __init__(self, gen: SyntheticGazettes, args):
+        from gztprocessor.gazette_processors import mindep_gazette_processor
+        from gztprocessor.database_handlers import mindep_database_handler
+
+        self.processor = mindep_gazette_processor
+        self.handler = mindep_database_handler
+        self.state_manager = mindep_database_handler.mindep_state_manager
+        self.gen = gen
+        self.args = args
+        self.versions = []
+        self.counter = Versions(9000)
+
+        gazette_number, date_str = self.counter.next()
+        initial = gen.initial(args.ministries, args.departments)
+        ministries = self.processor.extract_initial_gazette_data(gazette_number, date_str, copy.deepcopy(initial))
+        self.handler.load_initial_state_to_db(gazette_number, date_str, ministries)
+        self.state = {"ministers": initial["ministers"]}
+        self.versions.append((gazette_number, date_str))
+
+    def grow(self) -> float:
+        """Apply the next amendment; returns the seconds apply_transactions_to_db took."""
+        gazette_number, date_str = self.counter.next()
+        # Every `grow_every`th amendment adds one department more than it removes
+        extra = 1 if len(self.versions) % self.args.grow_every == 0 else 0
+        data = self.gen.amendment(self.state, self.args.adds + extra, self.args.omits, self.args.moves)
+        transactions = self.processor.process_amendment_gazette(gazette_number, date_str, data)
+
+        started = time.perf_counter()
+        self.handler.apply_transactions_to_db(gazette_number, date_str, transactions)
+        elapsed = time.perf_counter() - started
+
+        with self.state_manager.get_connection() as conn:
+            self.state = self.state_manager._get_state_from_db(conn.cursor(), gazette_number, date_str)
+        self.versions.append((gazette_number, date_str))
+        return elapsed
+
+
+class PersonHistory:
+    """Grows the person DB one person gazette at a time."""
+
+    prefix = "person"
+
+    def __init__(self, gen: SyntheticGazettes, args):
+        from gztprocessor.gazette_processors import person_gazette_processor
+        from gztprocessor.database_handlers import person_database_handler
+
+        self.processor = person_gazette_processor
+        self.handler = person_database_handler
+        self.state_manager = person_database_handler.person_state_manager
+        self.gen = gen
+        self.args = args
+        self.versions = []
+        self.counter = Versions(8000)
+        self.state = {"persons": []}
+        gazette_number, date_str = self.counter.next()
+        data = gen.person(self.state, date_str, adds=args.persons, terminates=0, moves=0, renames=0)
+        self._apply(gazette_number, date_str, data)
+
+    def _apply(self, gazette_number: str, date_str: str, data: dict) -> float:
+        transactions = self.processor.process_person_gazette(gazette_number, date_str, data)
+
+        started = time.perf_counter()
+        self.handler.apply_transactions_to_db(gazette_number, date_str, transactions)
+        elapsed = time.perf_counter() - started
+
+        with self.state_manager.get_connection() as conn:
+            self.state = self.state_manager._get_state_from_db(conn.cursor(), gazette_number, date_str)
+        self.versions.append((gazette_number, date_str))
+        return elapsed
+
+    def grow(self) -> float:
+        """Apply the next person gazette; returns the seconds apply_transactions_to_db took."""
+        gazette_number, date_str = self.counter.next()
+        # Every `grow_every`th gazette appoints one person more than it terminates
+        extra = 1 if len(self.versions) % self.args.grow_every == 0 else 0
+        data = self.gen.person(self.state, date_str, adds=1 + extra, terminates=1, moves=1, renames=1)
+        return self._apply(gazette_number, date_str, data)
+
+
+def endpoints(history, rng: random.Random) -> dict:
+    """One randomly chosen request path per state-router read endpoint."""
+    versions = history.versions
+    gazette_number, date_str = rng.choice(versions)
+    other_gazette, other_date = rng.choice(versions)
+    window = versions[-10:]
+    base = f"/{history.prefix}/state"
+    return {
+        "latest": f"{base}/latest",
+        "gazettes": f"{base}/gazettes/{versions[0][1]}/{versions[-1][1]}",
+        "range": f"{base}/range/{window[0][1]}/{window[-1][1]}",
+        "range?deltas": f"{base}/range/{window[0][1]}/{window[-1][1]}?deltas=true",
+        "timeline": f"{base}/timeline",
+        "asof": f"{base}/asof/{date_str}",
+        "diff": f"{base}/diff/{other_date}/{other_gazette}/{date_str}/{gazette_number}",
+        "by_date": f"{base}/{date_str}",
+        "by_version": f"{base}/{date_str}/{gazette_number}",
+    }
+
+
+def measure_checkpoint(client, history, apply_latencies: list[float], samples: int, rng: random.Random) -> dict:
+    from gztprocessor.state_managers.snapshot_writer import snapshot_writer
+
+    snapshot_writer.flush()
+    latencies = {}
+    for _ in range(samples):
+        for name, path in endpoints(history, rng).items():
+            started = time.perf_counter()
+            response = client.get(path)
+            latencies.setdefault(name, []).append(time.perf_counter() - started)
+            body = response.json()
+            if response.status_code != 200 or (isinstance(body, dict) and "error" in body):
+                raise RuntimeError(f"GET {path} failed: {response.status_code} {body}")
+
+        # get_latest_state_info is what every apply and processor call starts with
+        gazette_number, date_str = rng.choice(history.versions[1:] or history.versions)
+        with history.state_manager.get_connection() as conn:
+            cur = conn.cursor()
+            started = time.perf_counter()
+            try:
+                history.state_manager.get_latest_state_info(cur, gazette_number, date_str)
+            except FileNotFoundError:
+                pass
+            latencies.setdefault("get_latest_state_info", []).append(time.perf_counter() - started)
+
+    latencies["apply"] = apply_latencies[-samples:]
+    return {name: percentiles(values) for name, values in latencies.items()}
+
+
+def run(args) -> list[dict]:
+    # Imported here so GZTP_DATA_DIR/GZTP_STATE_DIR from main() take effect
+    from fastapi.testclient import TestClient
+    from gztprocessor.db_connections import db_gov, db_person, db_trans
+    from main import app
+
+    db_gov.init_db()
+    db_person.init_db()
+    db_trans.init_db()
+
+    client = TestClient(app)
+    gen = SyntheticGazettes(args.seed)
+    rng = random.Random(args.seed)
+    histories = {"mindep": MindepHistory, "person": PersonHistory}
+    report = []
+    with open(os.devnull, "w") as devnull:
+        for domain in args.domains:
+            with contextlib.redirect_stdout(devnull):
+                history = histories[domain](gen, args)
+            apply_latencies = []
+            for checkpoint in sorted(args.versions):
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(devnull):
+                    while len(history.versions) < checkpoint:
+                        apply_latencies.append(history.grow())
+                    results = measure_checkpoint(client, history, apply_latencies, args.samples, rng)
+                size = sum(len(m["departments"]) for m in history.state["ministers"]) if domain == "mindep" else \
+                    sum(len(p["portfolios"]) for p in history.state["persons"])
+                report.append({"domain": domain, "versions": len(history.versions), "state_size": size, "latency_ms": results})
+                print(f"⏱️ {domain}: {len(history.versions)} versions, state size {size} ({time.perf_counter() - started:.1f}s)")
+    return report
+
+
+def print_report(report: list[dict]):
+    for entry in report:
+        print(f"\n{entry['domain']} — {entry['versions']} versions, state size {entry['state_size']}")
+        print(f"  {'endpoint':<24} " + " ".join(f"{'p' + str(p) + ' ms':>10}" for p in PERCENTILES))
+        for name, values in entry["latency_ms"].items():
+            print(f"  {name:<24} " + " ".join(f"{values[f'p{p}']:10.2f}" for p in PERCENTILES))
+
+
+def plot_report(report: list[dict], path: Path) -> bool:
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("⚠️ matplotlib is not installed; skipping the plot")
+        return False
+
+    domains = sorted({entry["domain"] for entry in report})
+    figure, axes = plt.subplots(len(domains), 2, figsize=(12, 4.5 * len(domains)), squeeze=False)
+    for row, domain in enumerate(domains):
+        entries = [entry for entry in report if entry["domain"] == domain]
+        for col, percentile in enumerate(("p50", "p95")):
+            ax = axes[row][col]
+            for name in entries[0]["latency_ms"]:
+                ax.plot(
+                    [entry["versions"] for entry in entries],
+                    [entry["latency_ms"][name][percentile] for entry in entries],
+                    marker="o", label=name,
+                    # Direct calls rather than endpoints
+                    linestyle="--" if name in ("apply", "get_latest_state_info") else "-",
+                )
+            ax.set_xscale("log")
+            ax.set_yscale("log")
+            ax.set_title(f"{domain} {percentile}")
+            ax.set_xlabel("versions in history")
+            ax.set_ylabel("latency (ms)")
+            ax.grid(True, which="both", alpha=0.3)
+        axes[row][1].legend(fontsize="small", loc="upper left", bbox_to_anchor=(1.02, 1))
+    figure.tight_layout()
+    figure.savefig(path)
+    print(f"📈 Plot written to {path}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of the state endpoints and apply against history length.")
+    parser.add_argument("--versions", type=int, nargs="+", default=[10, 100, 1000, 10000], help="history lengths to measure at")
+    parser.add_argument("--domains", nargs="+", choices=["mindep", "person"], default=["mindep", "person"])
+    parser.add_argument("--samples", type=int, default=50, help="requests per endpoint per checkpoint")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ministries", type=int, default=20, help="ministries in the initial gazette")
+    parser.add_argument("--departments", type=int, default=10, help="departments per ministry")
+    parser.add_argument("--persons", type=int, default=50, help="persons in the first person gazette")
+    parser.add_argument("--adds", type=int, default=1, help="new departments per amendment")
+    parser.add_argument("--omits", type=int, default=1, help="omitted departments per amendment")
+    parser.add_argument("--moves", type=int, default=1, help="departments moved per amendment")
+    parser.add_argument("--grow-every", type=int, default=10, help="every Nth gazette adds one entry more than it removes")
+    parser.add_argument("--save", type=Path, help="write the report to this JSON file")
+    parser.add_argument("--plot", type=Path, help="write a latency plot to this image (needs matplotlib)")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="gztp_scaling_"))
+    os.environ["GZTP_DATA_DIR"] = str(work_dir / "data")
+    os.environ["GZTP_STATE_DIR"] = str(work_dir / "state")
+    (work_dir / "data").mkdir()
+    try:
+        report = run(args)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_report(report)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.plot:
+        plot_report(report, args.plot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import os
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+
+try:
+    from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
+except ImportError:
+    # Older Starlette only leaves server-sent events uncompressed
+    DEFAULT_EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Configuration (override via environment variables)
+COMPRESSION = os.environ.get("GZTP_COMPRESSION", "gzip").lower()  # "gzip", "br" or "none"
+COMPRESSION_MIN_SIZE = int(os.environ.get("GZTP_COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL = int(os.environ.get("GZTP_COMPRESSION_LEVEL", "6"))
+
+
+def is_excluded_content_type(content_type: str) -> bool:
+    """Whether Starlette's gzip would skip this content type (exact or `type/*` match)."""
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type in DEFAULT_EXCLUDED_CONTENT_TYPES or f"{media_type.partition('/')[0]}/*" in DEFAULT_EXCLUDED_CONTENT_TYPES
+
+
+class CompressionMiddleware:
+    """
+    Compress responses larger than `minimum_size` bytes.
+
+    gzip is always available (via Starlette's GZipMiddleware). When
+    `encoding` is "br" and the optional `brotli` package is installed,
+    clients that accept brotli get brotli and everyone else falls back to gzip.
+    Responses that already carry a Content-Encoding (e.g. pre-compressed
+    .csv.gz downloads) are passed through untouched.
+    """
+
+    def __init__(self, app, encoding: str = "gzip", minimum_size: int = 1024, level: int = 6):
+        if encoding == "br" and brotli is None:
+            print("⚠️ brotli is not installed, falling back to gzip compression.")
+            encoding = "gzip"
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.level = level
+        self.gzip_app = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=min(max(level, 1), 9))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.encoding == "none":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+        if self.encoding == "br" and "br" in accept_encoding:
+            await BrotliResponder(self.app, self.minimum_size, self.level)(scope, receive, send)
+            return
+
+        await self.gzip_app(scope, receive, send)
+
+
+class BrotliResponder:
+    """
+    Brotli counterpart of Starlette's GZipResponder. The body is compressed
+    chunk by chunk as the app sends it, so streamed responses (CSV exports)
+    stay streamed. HEAD requests, responses without a body (204/304), partial
+    responses, already-encoded responses and the content types Starlette's
+    gzip leaves alone (e.g. text/event-stream) are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int, level: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.quality = min(max(level, 0), 11)
+        self.send = None
+        self.start_message = None
+        self.started = False
+        self.passthrough = False
+        self.compressor = None
+
+    async def __call__(self, scope, receive, send):
+        if scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        self.send = send
+        await self.app(scope, receive, self.send_with_brotli)
+
+    async def send_start(self):
+        if self.start_message is not None:
+            await self.send(self.start_message)
+            self.start_message = None
+
+    async def send_with_brotli(self, message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                message["status"] in (204, 206, 304)
+                or "content-encoding" in headers
+                or is_excluded_content_type(headers.get("content-type", ""))
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                # Held back until the first body chunk decides the headers
+                self.start_message = message
+            return
+
+        if self.passthrough or message["type"] != "http.response.body":
+            await self.send_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            if len(body) < self.minimum_size and not more_body:
+                await self.send_start()
+                await self.send(message)
+                return
+            self.compressor = brotli.Compressor(quality=self.quality)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = "br"
+            headers.add_vary_header("Accept-Encoding")
+            del headers["Content-Length"]
+            if not more_body:
+                body = self.compressor.process(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send_start()
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send_start()
+
+        if self.compressor is None:
+            # The first chunk went out uncompressed
+            await self.send(message)
+            return
+        # Flush every chunk so each one reaches the client as it is produced
+        body = self.compressor.process(body) + (self.compressor.flush() if more_body else self.compressor.finish())
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -5,12 +5,65 @@ export const fetchTransactions = (number) => {
     return axios.get(`http://localhost:8000/transactions/${number}`);
 };
 
-export const saveTransactions = (number, payload) => {
-    return axios.post(
+// Last draft saved per gazette, so autosaves can send only what changed
+const savedDrafts = {};
+
+const escapePointer = (key) => String(key).replace(/~/g, '~0').replace(/\//g, '~1');
+const isPlainObject = (value) => value !== null && typeof value === 'object' && !Array.isArray(value);
+
+// JSON Patch (RFC 6902) operations turning `before` into `after`
+const diffJson = (before, after, path = '', ops = []) => {
+    if (Array.isArray(before) && Array.isArray(after)) {
+        const shared = Math.min(before.length, after.length);
+        for (let i = 0; i < shared; i++) diffJson(before[i], after[i], `${path}/${i}`, ops);
+        for (let i = before.length - 1; i >= after.length; i--) ops.push({ op: 'remove', path: `${path}/${i}` });
+        for (let i = before.length; i < after.length; i++) ops.push({ op: 'add', path: `${path}/-`, value: after[i] });
+    } else if (isPlainObject(before) && isPlainObject(after)) {
+        for (const key of Object.keys(before)) {
+            if (!(key in after)) ops.push({ op: 'remove', path: `${path}/${escapePointer(key)}` });
+        }
+        for (const key of Object.keys(after)) {
+            const child = `${path}/${escapePointer(key)}`;
+            if (key in before) diffJson(before[key], after[key], child, ops);
+            else ops.push({ op: 'add', path: child, value: after[key] });
+        }
+    } else if (JSON.stringify(before) !== JSON.stringify(after)) {
+        ops.push({ op: 'replace', path, value: after });
+    }
+    return ops;
+};
+
+const saveWholeDraft = async (number, draft) => {
+    const res = await axios.post(
+        `http://localhost:8000/transactions/${number}`,
+        draft,
+        { headers: { 'Content-Type': 'application/json' } }
+    );
+    if (res.data && res.data.version !== undefined) {
+        savedDrafts[number] = { version: res.data.version, draft };
+    }
+    return res;
+};
+
+export const saveTransactions = async (number, payload) => {
+    const draft = JSON.parse(JSON.stringify(payload));
+    const saved = savedDrafts[number];
+    if (!saved) return saveWholeDraft(number, draft);
+
+    const patch = diffJson(saved.draft, draft);
+    if (patch.length === 0) return { data: { status: 'success', version: saved.version } };
+
+    const res = await axios.patch(
         `http://localhost:8000/transactions/${number}`,
-        payload,
+        { patch, base_version: saved.version },
         { headers: { 'Content-Type': 'application/json' } }
     );
+    if (res.data && res.data.error) {
+        // Saved elsewhere since, or the patch didn't apply: send the whole draft
+        return saveWholeDraft(number, draft);
+    }
+    savedDrafts[number] = { version: res.data.version, draft };
+    return res;
 };
 
 export const setWarning = (number, warning) => {
@@ -1,102 +1,148 @@
-import os 
+import os
 from pathlib import Path
 import csv
+import gzip
+import hashlib
+import tempfile
 
-def generate_initial_add_csv(gazette_number: str, date_str: str, structure: list[dict]):
-    output_dir = Path("output") / "mindep" / date_str / gazette_number
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    add_rows = []
-    move_rows = []
-    counter = 1
-
-    # 1. Ministers → AS_MINISTER (always ADD)
-    for minister in structure:
-        transaction_id = f"{gazette_number}_tr_{counter:02d}"
-        add_rows.append({
-            "transaction_id": transaction_id,
-            "parent": "Government of Sri Lanka",
-            "parent_type": "government",
-            "child": minister["name"],
-            "child_type": "minister",
-            "rel_type": "AS_MINISTER",
-            "date": date_str
-        })
-        counter += 1
-
-    # 2. Departments → either ADD or MOVE
-    for minister in structure:
-        for dept in minister["departments"]:
-            transaction_id = f"{gazette_number}_tr_{counter:02d}"
-            dept_name = dept["name"]
-            prev_min = dept.get("previous_ministry")
-
-            if prev_min:
-                # MOVE
-                move_rows.append({
-                    "transaction_id": transaction_id,
-                    "old_parent": prev_min,
-                    "new_parent": minister["name"],
-                    "child": dept_name,
-                    "type": "AS_DEPARTMENT",
-                    "date": date_str
-                })
-            else:
-                # ADD
-                add_rows.append({
-                    "transaction_id": transaction_id,
-                    "parent": minister["name"],
-                    "parent_type": "minister",
-                    "child": dept_name,
-                    "child_type": "department",
-                    "rel_type": "AS_DEPARTMENT",
-                    "date": date_str
-                })
-            counter += 1
-
-    add_csv_path = output_dir / "add.csv"
-    if add_rows:
-        with open(add_csv_path, "w", newline='', encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                "transaction_id", "parent", "parent_type", "child", "child_type", "rel_type", "date"
-            ])
-            writer.writeheader()
-            writer.writerows(add_rows)
-        print(f"✅ ADD CSV created at: {add_csv_path}")
-    else:
-        if add_csv_path.exists():
-            os.remove(add_csv_path)
-            print(f"🗑️ No add rows found. Existing add.csv deleted at: {add_csv_path}")
-        else:
-            print("ℹ️ No add rows and no existing add.csv to delete.")
-            
-    move_csv_path = output_dir / "move.csv"
-    if move_rows:
-        with open(move_csv_path, "w", newline='', encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                "transaction_id", "old_parent", "new_parent", "child", "type", "date"
-            ])
-            writer.writeheader()
-            writer.writerows(move_rows)
-        print(f"✅ MOVE CSV created at: {move_csv_path}")
-    else:
-        if move_csv_path.exists():
-            os.remove(move_csv_path)
-            print(f"🗑️ No move rows found. Existing move.csv deleted at: {move_csv_path}")
+from gztprocessor.metrics import timed
+
+# Column layouts shared by the CSV exports
+EDGE_FIELDS = ["transaction_id", "parent", "parent_type", "child", "child_type", "rel_type", "date"]
+INITIAL_MOVE_FIELDS = ["transaction_id", "old_parent", "new_parent", "child", "type", "date"]
+AMENDMENT_MOVE_FIELDS = ["transaction_id", "old_parent", "new_parent", "child", "rel_type", "date"]
+PERSON_MOVE_FIELDS = ["transaction_id", "old_parent", "new_parent", "parent_type", "child", "child_type", "rel_type", "date"]
+
+
+def gzip_path_for(csv_path: Path) -> Path:
+    return csv_path.with_name(csv_path.name + ".gz")
+
+
+class TransactionIdAllocator:
+    """
+    Content-addressed transaction ids: `<gazette_number>_tr_<hash>`, hashing
+    the domain, gazette, CSV kind and row values. Re-exporting a gazette
+    gives the same ids, so loaders can upsert by id, and ids from different
+    gazettes or files can't collide. Identical rows within one export get
+    their occurrence number mixed in to stay distinct.
+    """
+
+    def __init__(self, domain: str, gazette_number: str):
+        self.domain = domain
+        self.gazette_number = gazette_number
+        self._seen = {}
+
+    def allocate(self, kind: str, row: dict, fieldnames: list[str]) -> str:
+        values = [str(row.get(field, "")) for field in fieldnames if field != "transaction_id"]
+        key = "\x1f".join([self.domain, self.gazette_number, kind, *values])
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        occurrence = self._seen.get(digest, 0)
+        self._seen[digest] = occurrence + 1
+        if occurrence:
+            digest = hashlib.sha1(f"{key}\x1f#{occurrence}".encode("utf-8")).hexdigest()[:16]
+        return f"{self.gazette_number}_tr_{digest}"
+
+
+class _CsvSink:
+    """
+    One output CSV. The plain file and its pre-compressed .csv.gz sibling
+    (served as-is by the download endpoint) are written in the same pass,
+    to temporary names that replace the real files on commit.
+    """
+
+    def __init__(self, path: Path, fieldnames: list[str]):
+        self.path = path
+        self.rows = 0
+        # Unique temp names, so workers exporting the same gazette at once don't collide
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        self._tmp_path = Path(tmp_path)
+        self._file = open(fd, "w", newline='', encoding="utf-8")
+        gz_fd, tmp_gz_path = tempfile.mkstemp(dir=path.parent, prefix=f".{gzip_path_for(path).name}.", suffix=".tmp")
+        self._tmp_gz_path = Path(tmp_gz_path)
+        # mtime=0 keeps the .gz byte-identical for identical CSVs
+        self._gz_file = open(gz_fd, "wb")
+        self._gz = gzip.GzipFile(gzip_path_for(path).name, mode="wb", compresslevel=9, fileobj=self._gz_file, mtime=0)
+        self._writer = csv.DictWriter(self, fieldnames=fieldnames)
+        self._writer.writeheader()
+
+    def write(self, text: str):
+        self._file.write(text)
+        self._gz.write(text.encode("utf-8"))
+
+    def writerow(self, row: dict):
+        self._writer.writerow(row)
+        self.rows += 1
+
+    def close(self, commit: bool):
+        self._file.close()
+        self._gz.close()
+        self._gz_file.close()
+        if commit:
+            # mkstemp creates owner-only files
+            os.chmod(self._tmp_path, 0o644)
+            os.chmod(self._tmp_gz_path, 0o644)
+            os.replace(self._tmp_path, self.path)
+            os.replace(self._tmp_gz_path, gzip_path_for(self.path))
         else:
-            print("ℹ️ No move rows and no existing move.csv to delete.")
+            self._tmp_path.unlink(missing_ok=True)
+            self._tmp_gz_path.unlink(missing_ok=True)
 
 
-def generate_amendment_csvs(gazette_number: str, date_str: str, transactions: dict):
+class TransactionCsvWriter:
     """
-    Generate 3 separate CSVs (add.csv, terminate.csv, move.csv) from amendment transactions.
-    Formats:
-    - ADD, TERMINATE: transaction_id,parent,parent_type,child,child_type,rel_type,date
-    - MOVE: transaction_id,old_parent,new_parent,child,type,date
+    Streams transaction rows into add/terminate/move CSVs under `output_dir`.
+
+    `sinks` maps each kind ("add", "terminate", "move") to its columns and
+    `ids` fills in each row's transaction_id. A
+    sink's file is opened on its first row, so memory use doesn't grow with
+    the number of transactions. On close, kinds that got no rows have any
+    stale CSV from an earlier run removed. Use as a context manager; if the
+    block raises, the previous files are left untouched.
     """
-    output_dir = Path("output") / "mindep" / date_str / gazette_number
-    output_dir.mkdir(parents=True, exist_ok=True)
 
+    def __init__(self, output_dir: Path, sinks: dict[str, list[str]], ids: TransactionIdAllocator):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.fieldnames = sinks
+        self.ids = ids
+        self._sinks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+    def path_for(self, kind: str) -> Path:
+        return self.output_dir / f"{kind}.csv"
+
+    def write(self, kind: str, row: dict):
+        sink = self._sinks.get(kind)
+        if sink is None:
+            sink = self._sinks[kind] = _CsvSink(self.path_for(kind), self.fieldnames[kind])
+        sink.writerow({"transaction_id": self.ids.allocate(kind, row, self.fieldnames[kind]), **row})
+
+    def close(self, commit: bool = True):
+        for sink in self._sinks.values():
+            sink.close(commit)
+        if not commit:
+            return
+        for kind in self.fieldnames:
+            path = self.path_for(kind)
+            if kind in self._sinks:
+                print(f"✅ {kind.upper()} CSV written to: {path} ({self._sinks[kind].rows} rows)")
+                continue
+            gz_path = gzip_path_for(path)
+            if gz_path.exists():
+                gz_path.unlink()
+            if path.exists():
+                path.unlink()
+                print(f"🗑️ No {kind} rows found. Existing {path.name} deleted at: {path}")
+            else:
+                print(f"ℹ️ No {kind} rows and no existing {path.name} to delete.")
+
+
+def _mindep_transactions(transactions) -> list[dict]:
     if isinstance(transactions, dict) and "transactions" in transactions:
         transactions = transactions["transactions"]
     if isinstance(transactions, dict):
@@ -105,86 +151,92 @@ def generate_amendment_csvs(gazette_number: str, date_str: str, transactions: di
             transactions.get("adds", []) +
             transactions.get("terminates", [])
         )
+    return transactions
 
-    add_rows = []
-    terminate_rows = []
-    move_rows = []
-
-    counter = 1
 
-    for tx in transactions:
-        transaction_id = f"{gazette_number}_tr_{counter:02d}"
-
-        if tx["type"] == "ADD":
-            add_rows.append({
-                "transaction_id": transaction_id,
-                "parent": tx["to_ministry"],
-                "parent_type": "minister",
-                "child": tx["department"],
-                "child_type": "department",
-                "rel_type": "AS_DEPARTMENT",
+@timed("csv.generate_initial_add_csv")
+def generate_initial_add_csv(gazette_number: str, date_str: str, structure: list[dict]):
+    output_dir = Path("output") / "mindep" / date_str / gazette_number
+    sinks = {"add": EDGE_FIELDS, "move": INITIAL_MOVE_FIELDS}
+
+    with TransactionCsvWriter(output_dir, sinks, TransactionIdAllocator("mindep", gazette_number)) as writer:
+        for minister in structure:
+            # Ministers → AS_MINISTER (always ADD)
+            writer.write("add", {
+                "parent": "Government of Sri Lanka",
+                "parent_type": "government",
+                "child": minister["name"],
+                "child_type": "minister",
+                "rel_type": "AS_MINISTER",
                 "date": date_str
             })
 
-        elif tx["type"] == "TERMINATE":
-            terminate_rows.append({
-                "transaction_id": transaction_id,
-                "parent": tx["from_ministry"],
-                "parent_type": "minister",
-                "child": tx["department"],
-                "child_type": "department",
-                "rel_type": "AS_DEPARTMENT",
-                "date": date_str
-            })
+            # Departments → either ADD or MOVE
+            for dept in minister["departments"]:
+                prev_min = dept.get("previous_ministry")
+                if prev_min:
+                    writer.write("move", {
+                        "old_parent": prev_min,
+                        "new_parent": minister["name"],
+                        "child": dept["name"],
+                        "type": "AS_DEPARTMENT",
+                        "date": date_str
+                    })
+                else:
+                    writer.write("add", {
+                        "parent": minister["name"],
+                        "parent_type": "minister",
+                        "child": dept["name"],
+                        "child_type": "department",
+                        "rel_type": "AS_DEPARTMENT",
+                        "date": date_str
+                    })
+
+
+@timed("csv.generate_amendment_csvs")
+def generate_amendment_csvs(gazette_number: str, date_str: str, transactions: dict):
+    """
+    Generate 3 separate CSVs (add.csv, terminate.csv, move.csv) from amendment transactions.
+    Formats:
+    - ADD, TERMINATE: transaction_id,parent,parent_type,child,child_type,rel_type,date
+    - MOVE: transaction_id,old_parent,new_parent,child,rel_type,date
+    """
+    output_dir = Path("output") / "mindep" / date_str / gazette_number
+    sinks = {"add": EDGE_FIELDS, "terminate": EDGE_FIELDS, "move": AMENDMENT_MOVE_FIELDS}
 
-        elif tx["type"] == "MOVE":
-            move_rows.append({
-                "transaction_id": transaction_id,
-                "old_parent": tx["from_ministry"],
-                "new_parent": tx["to_ministry"],
-                "child": tx["department"],
-                "rel_type": "AS_DEPARTMENT",
-                "date": date_str
-            })
+    with TransactionCsvWriter(output_dir, sinks, TransactionIdAllocator("mindep", gazette_number)) as writer:
+        for tx in _mindep_transactions(transactions):
+            if tx["type"] == "ADD":
+                writer.write("add", {
+                    "parent": tx["to_ministry"],
+                    "parent_type": "minister",
+                    "child": tx["department"],
+                    "child_type": "department",
+                    "rel_type": "AS_DEPARTMENT",
+                    "date": date_str
+                })
 
-        counter += 1
+            elif tx["type"] == "TERMINATE":
+                writer.write("terminate", {
+                    "parent": tx["from_ministry"],
+                    "parent_type": "minister",
+                    "child": tx["department"],
+                    "child_type": "department",
+                    "rel_type": "AS_DEPARTMENT",
+                    "date": date_str
+                })
 
-    # Helper to write or delete CSVs
-    def write_or_delete_csv(rows, path, fieldnames):
-        if rows:
-            with open(path, "w", newline='', encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(rows)
-            print(f"✅ CSV written to: {path}")
-        else:
-            if path.exists():
-                os.remove(path)
-                print(f"🗑️ No rows found. Existing CSV deleted at: {path}")
-            else:
-                print(f"ℹ️ No rows and no existing CSV to delete at: {path}")
-
-    # Write ADD CSV
-    csv_path = output_dir / "add.csv"
-    write_or_delete_csv(add_rows, csv_path, [
-        "transaction_id", "parent", "parent_type",
-        "child", "child_type", "rel_type", "date"
-    ])
-
-    # Write TERMINATE CSV
-    csv_path = output_dir / "terminate.csv"
-    write_or_delete_csv(terminate_rows, csv_path, [
-        "transaction_id", "parent", "parent_type",
-        "child", "child_type", "rel_type", "date"
-    ])
-
-    # Write MOVE CSV
-    csv_path = output_dir / "move.csv"
-    write_or_delete_csv(move_rows, csv_path, [
-        "transaction_id", "old_parent", "new_parent",
-        "child", "rel_type", "date"
-    ])
+            elif tx["type"] == "MOVE":
+                writer.write("move", {
+                    "old_parent": tx["from_ministry"],
+                    "new_parent": tx["to_ministry"],
+                    "child": tx["department"],
+                    "rel_type": "AS_DEPARTMENT",
+                    "date": date_str
+                })
 
+
+@timed("csv.generate_person_csvs")
 def generate_person_csvs(gazette_number: str, date_str: str, transactions: dict):
     """
     Generate CSVs for person-related transactions: ADDs, TERMINATEs, MOVEs, RENAMES.
@@ -194,138 +246,50 @@ def generate_person_csvs(gazette_number: str, date_str: str, transactions: dict)
     - MOVE: transaction_id, old_parent, new_parent, parent_type, child, child_type, rel_type, date
     """
     output_dir = Path("output") / "person" / date_str / gazette_number
-    output_dir.mkdir(parents=True, exist_ok=True)
+    sinks = {"add": EDGE_FIELDS, "terminate": EDGE_FIELDS, "move": PERSON_MOVE_FIELDS}
 
     txs = transactions.get("transactions", transactions)
 
-    move_rows = []
-    add_rows = []
-    terminate_rows = []
-
-    counter = 1
-
-    # Process ADDs
-    for tx in txs.get("adds", []):
-        transaction_id = f"{gazette_number}_tr_{counter:02d}"
-        add_rows.append({
-            "transaction_id": transaction_id,
-            "parent": tx["new_ministry"],
-            "parent_type": tx["new_position"].lower().replace(" ", "_"),
-            "child": tx["new_person"],
-            "child_type": "person",
-            "rel_type": "AS_APPOINTED",
-            "date": tx["date"]
-        })
-        counter += 1
-
-    # Process TERMINATES
-    for tx in txs.get("terminates", []):
-        transaction_id = f"{gazette_number}_tr_{counter:02d}"
-        terminate_rows.append({
-            "transaction_id": transaction_id,
-            "parent": tx["ministry"],
-            "parent_type": tx["position"].lower().replace(" ", "_"),
-            "child": tx["name"],
-            "child_type": "person",
-            "rel_type": "AS_APPOINTED",
-            "date": tx["date"]
-        })
-        counter += 1
-
-    # Process MOVES
-    for tx in txs.get("moves", []):
-        transaction_id = f"{gazette_number}_tr_{counter:02d}"
-        move_rows.append({
-            "transaction_id": transaction_id,
-            "old_parent": tx["from_ministry"],
-            "new_parent": tx["to_ministry"],
-            "parent_type": tx["to_position"].lower().replace(" ", "_"),
-            "child": tx["name"],
-            "child_type": "person",
-            "rel_type": "AS_APPOINTED",
-            "date": tx["date"]
-        })
-        counter += 1
-
-    # Process RENAMES as TERMINATE + ADD
-    for tx in txs.get("renames", []):
-        name = tx["name"]
-        old_ministry = tx["old_ministry"]
-        new_ministry = tx["new_ministry"]
-        date = tx["date"]
-
-        # TERMINATE from old ministry
-        transaction_id = f"{gazette_number}_tr_{counter:02d}"
-        terminate_rows.append({
-            "transaction_id": transaction_id,
-            "parent": old_ministry,
-            "parent_type": "minister",
-            "child": name,
-            "child_type": "person",
-            "rel_type": "AS_APPOINTED",
-            "date": date
-        })
-        counter += 1
-
-        # ADD to new ministry
-        transaction_id = f"{gazette_number}_tr_{counter:02d}"
-        add_rows.append({
-            "transaction_id": transaction_id,
-            "parent": new_ministry,
-            "parent_type": "minister",
-            "child": name,
-            "child_type": "person",
-            "rel_type": "AS_APPOINTED",
-            "date": date
-        })
-        counter += 1
-
-    # File paths
-    add_csv = output_dir / "add.csv"
-    terminate_csv = output_dir / "terminate.csv"
-    move_csv = output_dir / "move.csv"
-
-    # Write ADD CSV or delete if empty
-    if add_rows:
-        with open(add_csv, "w", newline='', encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                "transaction_id", "parent", "parent_type",
-                "child", "child_type", "rel_type", "date"
-            ])
-            writer.writeheader()
-            writer.writerows(add_rows)
-        print(f"✅ ADD CSV written to: {add_csv}")
-    else:
-        if add_csv.exists():
-            add_csv.unlink()
-            print(f"🗑️ ADD CSV deleted because no rows present.")
-
-    # Write TERMINATE CSV or delete if empty
-    if terminate_rows:
-        with open(terminate_csv, "w", newline='', encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                "transaction_id", "parent", "parent_type",
-                "child", "child_type", "rel_type", "date"
-            ])
-            writer.writeheader()
-            writer.writerows(terminate_rows)
-        print(f"✅ TERMINATE CSV written to: {terminate_csv}")
-    else:
-        if terminate_csv.exists():
-            terminate_csv.unlink()
-            print(f"🗑️ TERMINATE CSV deleted because no rows present.")
-
-    # Write MOVE CSV or delete if empty
-    if move_rows:
-        with open(move_csv, "w", newline='', encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                "transaction_id", "old_parent", "new_parent",
-                "parent_type", "child", "child_type", "rel_type", "date"
-            ])
-            writer.writeheader()
-            writer.writerows(move_rows)
-        print(f"✅ MOVE CSV written to: {move_csv}")
-    else:
-        if move_csv.exists():
-            move_csv.unlink()
-            print(f"🗑️ MOVE CSV deleted because no rows present.")
+    with TransactionCsvWriter(output_dir, sinks, TransactionIdAllocator("person", gazette_number)) as writer:
+        for tx in txs.get("adds", []):
+            writer.write("add", {
+                "parent": tx["new_ministry"],
+                "parent_type": tx["new_position"].lower().replace(" ", "_"),
+                "child": tx["new_person"],
+                "child_type": "person",
+                "rel_type": "AS_APPOINTED",
+                "date": tx["date"]
+            })
+
+        for tx in txs.get("terminates", []):
+            writer.write("terminate", {
+                "parent": tx["ministry"],
+                "parent_type": tx["position"].lower().replace(" ", "_"),
+                "child": tx["name"],
+                "child_type": "person",
+                "rel_type": "AS_APPOINTED",
+                "date": tx["date"]
+            })
+
+        for tx in txs.get("moves", []):
+            writer.write("move", {
+                "old_parent": tx["from_ministry"],
+                "new_parent": tx["to_ministry"],
+                "parent_type": tx["to_position"].lower().replace(" ", "_"),
+                "child": tx["name"],
+                "child_type": "person",
+                "rel_type": "AS_APPOINTED",
+                "date": tx["date"]
+            })
+
+        # RENAMES become a TERMINATE from the old ministry plus an ADD to the new one
+        for tx in txs.get("renames", []):
+            for kind, ministry in (("terminate", tx["old_ministry"]), ("add", tx["new_ministry"])):
+                writer.write(kind, {
+                    "parent": ministry,
+                    "parent_type": "minister",
+                    "child": tx["name"],
+                    "child_type": "person",
+                    "rel_type": "AS_APPOINTED",
+                    "date": tx["date"]
+                })
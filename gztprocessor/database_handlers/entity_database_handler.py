@@ -0,0 +1,150 @@
+# database_handlers/entity_database_handler.py
+from gztprocessor.metrics import cache_lookup
+from gztprocessor.storage import storage
+from gztprocessor.database_handlers.ledger_database_handler import get_generation
+
+
+class EntityDictionary:
+    """
+    Interns ministry/department/person/portfolio names to integer ids.
+
+    Each name resolves through the alias table first, then the canonical
+    names, and is created if missing. Resolved ids are cached in memory;
+    ids touched inside a transaction are only promoted to the cache by
+    commit(), so a rolled-back insert can't leave a dangling id behind.
+    The cache remembers the domain's write generation it is valid for and
+    is dropped by begin() once another worker has written.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._ids = {}  # (entity_type, name) -> entity id
+        self._pending = {}
+        self._generation = None
+        self.hits = 0
+        self.misses = 0
+
+    def begin(self, cur):
+        self._pending.clear()
+        generation = get_generation(cur, self.prefix)
+        if generation != self._generation:
+            self._ids.clear()
+            self._generation = generation
+
+    def commit(self, generation: int):
+        """Promote the transaction's ids; `generation` is the one its write committed."""
+        self._ids.update(self._pending)
+        self._pending.clear()
+        self._generation = generation
+
+    def invalidate(self):
+        self._ids.clear()
+        self._pending.clear()
+
+    def _count(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        cache_lookup(f"{self.prefix}_entities", hit)
+
+    def lookup(self, cur, entity_type: str, name: str) -> int | None:
+        """Id for `name` (canonical or alias) without creating it."""
+        key = (entity_type, name)
+        if key in self._pending:
+            self._count(hit=True)
+            return self._pending[key]
+        if key in self._ids:
+            self._count(hit=True)
+            return self._ids[key]
+
+        self._count(hit=False)
+        cur.execute(
+            f"SELECT entity_id FROM {self.prefix}_entity_alias WHERE entity_type = ? AND alias = ?",
+            (entity_type, name),
+        )
+        row = cur.fetchone()
+        if not row:
+            cur.execute(
+                f"SELECT id FROM {self.prefix}_entity WHERE entity_type = ? AND name = ?",
+                (entity_type, name),
+            )
+            row = cur.fetchone()
+        if not row:
+            return None
+        self._pending[key] = row[0]
+        return row[0]
+
+    def intern(self, cur, entity_type: str, name: str) -> int:
+        entity_id = self.lookup(cur, entity_type, name)
+        if entity_id is None:
+            entity_id = storage.insert_returning_id(
+                cur,
+                f"INSERT INTO {self.prefix}_entity (entity_type, name) VALUES (?, ?) ON CONFLICT DO NOTHING",
+                (entity_type, name),
+            )
+            if entity_id is None:
+                # Another writer interned it since the lookup
+                entity_id = self.lookup(cur, entity_type, name)
+            self._pending[(entity_type, name)] = entity_id
+        return entity_id
+
+    def add_alias(self, cur, entity_type: str, alias: str, name: str, version: tuple[str, str] | None = None) -> int | None:
+        """
+        Make `alias` resolve to the entity for `name` (e.g. a portfolio's new
+        name after a rename). `version` is the (gazette_number, date) whose
+        gazette introduced it; drop_version_aliases() takes it back when that
+        version is rebuilt. Returns the entity id, or None if `alias` already
+        belongs to a different entity.
+        """
+        entity_id = self.intern(cur, entity_type, name)
+        existing = self.lookup(cur, entity_type, alias)
+        if existing is not None and existing != entity_id:
+            print(f"⚠️ Alias '{alias}' already names another {entity_type}; not linking it to '{name}'")
+            return None
+        if existing is None:
+            gazette_number, date_str = version or (None, None)
+            cur.execute(
+                f"INSERT INTO {self.prefix}_entity_alias (entity_type, alias, entity_id, gazette_number, date) VALUES (?, ?, ?, ?, ?)",
+                (entity_type, alias, entity_id, gazette_number, date_str),
+            )
+            self._pending[(entity_type, alias)] = entity_id
+        return entity_id
+
+    def drop_version_aliases(self, cur, gazette_number: str, date_str: str):
+        """Remove the aliases a version introduced, before that version is rebuilt."""
+        cur.execute(
+            f"SELECT entity_type, alias FROM {self.prefix}_entity_alias WHERE gazette_number = ? AND date = ?",
+            (gazette_number, date_str),
+        )
+        keys = [tuple(row) for row in cur.fetchall()]
+        if not keys:
+            return
+        cur.execute(
+            f"DELETE FROM {self.prefix}_entity_alias WHERE gazette_number = ? AND date = ?",
+            (gazette_number, date_str),
+        )
+        for key in keys:
+            self._ids.pop(key, None)
+            self._pending.pop(key, None)
+
+    def get_name(self, cur, entity_id: int) -> str | None:
+        cur.execute(f"SELECT name FROM {self.prefix}_entity WHERE id = ?", (entity_id,))
+        row = cur.fetchone()
+        return row[0] if row else None
+
+    def get_aliases(self, cur, entity_id: int) -> list[str]:
+        cur.execute(
+            f"SELECT alias FROM {self.prefix}_entity_alias WHERE entity_id = ? ORDER BY alias",
+            (entity_id,),
+        )
+        return [row[0] for row in cur.fetchall()]
+
+    def clear(self, cur):
+        cur.execute(f"DELETE FROM {self.prefix}_entity_alias")
+        cur.execute(f"DELETE FROM {self.prefix}_entity")
+        self.invalidate()
+
+
+mindep_entity_dictionary = EntityDictionary("mindep")
+person_entity_dictionary = EntityDictionary("person")
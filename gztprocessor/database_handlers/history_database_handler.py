@@ -0,0 +1,379 @@
+# database_handlers/history_database_handler.py
+from itertools import groupby
+
+from gztprocessor.db_connections.db_gov import get_connection as get_gov_connection
+from gztprocessor.db_connections.db_person import get_connection as get_person_connection
+from gztprocessor.storage import storage
+
+# Interval history tables. An interval is identified by its key columns and
+# stays open (end_* NULL) until a version no longer contains that key. The
+# attribute columns hold their values from the version that opened it: a
+# department's position shifts whenever a sibling is inserted above it, and
+# that doesn't end its time under the ministry.
+DEPARTMENT_HISTORY = {
+    "table": "department_history",
+    "version_table": "department_history_version",
+    "source_table": "ministry",
+    "key_columns": ("department", "ministry"),
+    "attr_columns": ("position",),
+    "rebuild_query": """
+        SELECT d.gazette_number, d.date, d.name, m.name, d.position
+        FROM department d
+        JOIN ministry m ON d.ministry_id = m.id
+        ORDER BY d.date, d.gazette_number, m.id, d.position
+    """,
+    "version_query": """
+        SELECT d.name, m.name, d.position
+        FROM department d
+        JOIN ministry m ON d.ministry_id = m.id
+        WHERE d.gazette_number = ? AND d.date = ?
+        ORDER BY m.id, d.position
+    """,
+}
+
+PORTFOLIO_HISTORY = {
+    "table": "portfolio_history",
+    "version_table": "portfolio_history_version",
+    "source_table": "person",
+    "key_columns": ("person", "portfolio", "position"),
+    "attr_columns": (),
+    "rebuild_query": """
+        SELECT pf.gazette_number, pf.date, p.name, pf.name, pf.position
+        FROM portfolio pf
+        JOIN person p ON pf.person_id = p.id
+        ORDER BY pf.date, pf.gazette_number, p.id, pf.id
+    """,
+    "version_query": """
+        SELECT p.name, pf.name, pf.position
+        FROM portfolio pf
+        JOIN person p ON pf.person_id = p.id
+        WHERE pf.gazette_number = ? AND pf.date = ?
+        ORDER BY p.id, pf.id
+    """,
+}
+
+
+def mindep_placements(state: dict) -> dict:
+    """(department, ministry) -> (position,) for a mindep state."""
+    placements = {}
+    for ministry in state["ministers"]:
+        for position, dept in enumerate(ministry["departments"], start=1):
+            placements.setdefault((dept, ministry["name"]), (position,))
+    return placements
+
+
+def person_placements(state: dict) -> dict:
+    """(person, portfolio, position) -> () for a person state."""
+    return {
+        (person["person_name"], pf["name"], pf["position"]): ()
+        for person in state["persons"]
+        for pf in person["portfolios"]
+    }
+
+
+def _get_indexed_version(cur, cfg):
+    cur.execute(f"SELECT gazette_number, date FROM {cfg['version_table']}")
+    row = cur.fetchone()
+    return tuple(row) if row else None
+
+
+def _set_indexed_version(cur, cfg, gazette_number: str, date_str: str):
+    cur.execute(f"DELETE FROM {cfg['version_table']}")
+    cur.execute(
+        f"INSERT INTO {cfg['version_table']} (gazette_number, date) VALUES (?, ?)",
+        (gazette_number, date_str),
+    )
+
+
+def _compare(column: str, op: str, gazette_number: str, date_str: str) -> tuple[str, tuple]:
+    """SQL comparing the `<column>_date`/`<column>_gazette_number` version with a version, and its params."""
+    return (
+        f"({column}_date {op[0]} ? OR ({column}_date = ? AND {column}_gazette_number {op} ?))",
+        (date_str, date_str, gazette_number),
+    )
+
+
+def _get_previous_version(cur, cfg, gazette_number: str, date_str: str):
+    cur.execute(
+        f"""
+        SELECT gazette_number, date FROM {cfg['source_table']}
+        WHERE (date < ? OR (date = ? AND gazette_number < ?))
+        ORDER BY date DESC, gazette_number DESC LIMIT 1
+        """,
+        (date_str, date_str, gazette_number),
+    )
+    row = cur.fetchone()
+    return tuple(row) if row else None
+
+
+def _get_next_version(cur, cfg, gazette_number: str, date_str: str):
+    cur.execute(
+        f"""
+        SELECT gazette_number, date FROM {cfg['source_table']}
+        WHERE (date > ? OR (date = ? AND gazette_number > ?))
+        ORDER BY date, gazette_number LIMIT 1
+        """,
+        (date_str, date_str, gazette_number),
+    )
+    row = cur.fetchone()
+    return tuple(row) if row else None
+
+
+def _get_latest_version(cur, cfg):
+    cur.execute(
+        f"SELECT gazette_number, date FROM {cfg['source_table']} ORDER BY date DESC, gazette_number DESC LIMIT 1"
+    )
+    row = cur.fetchone()
+    return tuple(row) if row else None
+
+
+def _version_placements(cur, cfg, gazette_number: str, date_str: str) -> dict:
+    """Placements of a stored version, read from the versioned tables."""
+    n_keys = len(cfg["key_columns"])
+    cur.execute(cfg["version_query"], (gazette_number, date_str))
+    placements = {}
+    for row in cur.fetchall():
+        placements.setdefault(tuple(row[:n_keys]), tuple(row[n_keys:]))
+    return placements
+
+
+def _insert_columns(cfg) -> list[str]:
+    return [*cfg["key_columns"], *cfg["attr_columns"], "start_gazette_number", "start_date"]
+
+
+def _open_intervals(cur, cfg, gazette_number: str, date_str: str) -> dict:
+    """key -> id of the intervals open just before the given version."""
+    key_columns = cfg["key_columns"]
+    started_before, params = _compare("start", "<", gazette_number, date_str)
+    cur.execute(
+        f"SELECT id, {', '.join(key_columns)} FROM {cfg['table']} WHERE end_gazette_number IS NULL AND {started_before}",
+        params,
+    )
+    return {tuple(row[1:]): row[0] for row in cur.fetchall()}
+
+
+def _advance_history(cur, cfg, gazette_number: str, date_str: str, placements: dict):
+    open_intervals = _open_intervals(cur, cfg, gazette_number, date_str)
+
+    closed = [interval_id for key, interval_id in open_intervals.items() if key not in placements]
+    cur.executemany(
+        f"UPDATE {cfg['table']} SET end_gazette_number = ?, end_date = ? WHERE id = ?",
+        [(gazette_number, date_str, interval_id) for interval_id in closed],
+    )
+
+    storage.copy_rows(
+        cur, cfg["table"], _insert_columns(cfg),
+        [
+            (*key, *attrs, gazette_number, date_str)
+            for key, attrs in placements.items()
+            if key not in open_intervals
+        ],
+    )
+    _set_indexed_version(cur, cfg, gazette_number, date_str)
+
+
+def _restart_history(cur, cfg, window: list[tuple], following: tuple | None):
+    """
+    Re-fold the history from the first version in `window` ([(version,
+    placements), ...], consecutive and oldest first) up to `following`, the
+    first later version whose state didn't change (None if the window runs
+    to the latest version). Intervals from before the window are reopened,
+    and the ones still running at `following` get their old ends back, so
+    the intervals past it are left as they are.
+    """
+    first_gazette, first_date = window[0][0]
+    key_columns = cfg["key_columns"]
+
+    # Where each interval running through `following` used to end
+    tail = {}
+    if following:
+        started_by, start_params = _compare("start", "<=", *following)
+        ended_after, end_params = _compare("end", ">", *following)
+        cur.execute(
+            f"""
+            SELECT {', '.join(key_columns)}, end_gazette_number, end_date FROM {cfg['table']}
+            WHERE {started_by} AND (end_gazette_number IS NULL OR {ended_after})
+            """,
+            start_params + end_params,
+        )
+        tail = {tuple(row[:-2]): tuple(row[-2:]) for row in cur.fetchall()}
+
+    # Drop the intervals opened inside the window and reopen those it cut short
+    started_from, params = _compare("start", ">=", first_gazette, first_date)
+    if following:
+        started_by, start_params = _compare("start", "<=", *following)
+        cur.execute(f"DELETE FROM {cfg['table']} WHERE {started_from} AND {started_by}", params + start_params)
+    else:
+        cur.execute(f"DELETE FROM {cfg['table']} WHERE {started_from}", params)
+    started_before, start_params = _compare("start", "<", first_gazette, first_date)
+    ended_from, end_params = _compare("end", ">=", first_gazette, first_date)
+    cur.execute(
+        f"UPDATE {cfg['table']} SET end_gazette_number = NULL, end_date = NULL WHERE {started_before} AND {ended_from}",
+        start_params + end_params,
+    )
+
+    for (gazette_number, date_str), placements in window:
+        _advance_history(cur, cfg, gazette_number, date_str, placements)
+    if not following:
+        return
+
+    _advance_history(cur, cfg, *following, _version_placements(cur, cfg, *following))
+    after_gazette, after_date = _get_next_version(cur, cfg, *following) or following
+    reclosed = [
+        (*tail[key], interval_id)
+        for key, interval_id in _open_intervals(cur, cfg, after_gazette, after_date).items()
+        if tail.get(key, (None, None))[0] is not None
+    ]
+    cur.executemany(f"UPDATE {cfg['table']} SET end_gazette_number = ?, end_date = ? WHERE id = ?", reclosed)
+    _set_indexed_version(cur, cfg, *_get_latest_version(cur, cfg))
+
+
+def collect_intervals(rows, n_keys: int) -> tuple[list[list], tuple | None]:
+    """
+    Fold version-ordered (gazette_number, date, *key, *attrs) rows into
+    [*key, *attrs, start_gazette, start_date, end_gazette, end_date]
+    intervals. Returns the intervals and the last version seen.
+    """
+    intervals = []
+    open_intervals = {}  # key -> index into intervals
+    last_version = None
+
+    for version, version_rows in groupby(rows, key=lambda row: (row[0], row[1])):
+        placements = {}
+        for row in version_rows:
+            placements.setdefault(tuple(row[2:2 + n_keys]), tuple(row[2 + n_keys:]))
+
+        for key in [key for key in open_intervals if key not in placements]:
+            intervals[open_intervals.pop(key)].extend(version)
+        for key, attrs in placements.items():
+            if key not in open_intervals:
+                open_intervals[key] = len(intervals)
+                intervals.append([*key, *attrs, *version])
+        last_version = version
+
+    for index in open_intervals.values():
+        intervals[index].extend([None, None])
+    return intervals, last_version
+
+
+def _rebuild_history(cur, cfg):
+    cur.execute(cfg["rebuild_query"])
+    intervals, last_version = collect_intervals(cur.fetchall(), len(cfg["key_columns"]))
+
+    columns = _insert_columns(cfg) + ["end_gazette_number", "end_date"]
+    cur.execute(f"DELETE FROM {cfg['table']}")
+    storage.copy_rows(cur, cfg["table"], columns, intervals)
+    cur.execute(f"DELETE FROM {cfg['version_table']}")
+    if last_version:
+        _set_indexed_version(cur, cfg, *last_version)
+    print(f"🔁 Rebuilt {cfg['table']} ({len(intervals)} intervals)")
+
+
+def _update_history(cur, cfg, gazette_number: str, date_str: str, placements: dict, rebased: list[tuple]):
+    """
+    Fold a freshly written version, and the later versions rebased onto it
+    (`rebased`: [(version, placements), ...] of those whose state changed,
+    oldest first), into the history index.
+
+    The history is re-folded from the written version up to the first later
+    version that didn't change, so the cost follows the affected suffix. If
+    the index wasn't current before this write it is rebuilt from the
+    versioned tables instead.
+    """
+    indexed = _get_indexed_version(cur, cfg)
+    latest = _get_latest_version(cur, cfg)
+    previous = _get_previous_version(cur, cfg, gazette_number, date_str)
+    if indexed != latest and not (indexed == previous and latest == (gazette_number, date_str)):
+        _rebuild_history(cur, cfg)
+        return
+
+    # Versions left without rows aren't in the index, as in a rebuild
+    window = [
+        (version, version_placements)
+        for version, version_placements in [((gazette_number, date_str), placements), *rebased]
+        if version_placements
+    ]
+    last_gazette, last_date = rebased[-1][0] if rebased else (gazette_number, date_str)
+    following = _get_next_version(cur, cfg, last_gazette, last_date)
+    if window:
+        _restart_history(cur, cfg, window, following)
+    else:
+        _rebuild_history(cur, cfg)
+
+
+def update_department_history(cur, gazette_number: str, date_str: str, state: dict, rebased: list[dict] = ()):
+    _update_history(
+        cur, DEPARTMENT_HISTORY, gazette_number, date_str, mindep_placements(state),
+        [((v["gazette_number"], v["date"]), mindep_placements(v["state"])) for v in rebased if v["state_changed"]],
+    )
+
+
+def update_portfolio_history(cur, gazette_number: str, date_str: str, state: dict, rebased: list[dict] = ()):
+    _update_history(
+        cur, PORTFOLIO_HISTORY, gazette_number, date_str, person_placements(state),
+        [((v["gazette_number"], v["date"]), person_placements(v["state"])) for v in rebased if v["state_changed"]],
+    )
+
+
+def rebuild_department_history():
+    with get_gov_connection() as conn, storage.write_lock(conn, "gov"):
+        _rebuild_history(conn.cursor(), DEPARTMENT_HISTORY)
+        conn.commit()
+
+
+def rebuild_portfolio_history():
+    with get_person_connection() as conn, storage.write_lock(conn, "person"):
+        _rebuild_history(conn.cursor(), PORTFOLIO_HISTORY)
+        conn.commit()
+
+
+def _interval(row) -> dict:
+    start_gazette, start_date, end_gazette, end_date = row
+    return {
+        "from": {"gazette_number": start_gazette, "date": start_date},
+        "to": {"gazette_number": end_gazette, "date": end_date} if end_gazette else None,
+    }
+
+
+def get_department_history(department: str, since: str | None = None) -> list[dict]:
+    """
+    Ministries a department has belonged to, oldest first. `to` is None for
+    the current placement. With `since`, intervals that ended before that
+    date are left out.
+    """
+    with get_gov_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            SELECT ministry, position, start_gazette_number, start_date, end_gazette_number, end_date
+            FROM department_history
+            WHERE {storage.nocase_equals("department")}
+              AND (CAST(? AS TEXT) IS NULL OR end_date IS NULL OR end_date >= ?)
+            ORDER BY start_date, start_gazette_number
+            """,
+            (department, since, since),
+        )
+        return [
+            {"ministry": row[0], "start_position": row[1], **_interval(row[2:])}
+            for row in cur.fetchall()
+        ]
+
+
+def get_person_history(name: str, since: str | None = None) -> list[dict]:
+    """Portfolios a person has held, oldest first. `to` is None for current ones."""
+    with get_person_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            SELECT portfolio, position, start_gazette_number, start_date, end_gazette_number, end_date
+            FROM portfolio_history
+            WHERE {storage.nocase_equals("person")}
+              AND (CAST(? AS TEXT) IS NULL OR end_date IS NULL OR end_date >= ?)
+            ORDER BY start_date, start_gazette_number
+            """,
+            (name, since, since),
+        )
+        return [
+            {"portfolio": row[0], "position": row[1], **_interval(row[2:])}
+            for row in cur.fetchall()
+        ]
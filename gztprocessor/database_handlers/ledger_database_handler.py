@@ -0,0 +1,103 @@
+# database_handlers/ledger_database_handler.py
+import hashlib
+import json
+
+
+def content_hash(value) -> str:
+    """sha256 of a JSON value in canonical form (sorted keys, no whitespace)."""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _record(row) -> dict:
+    gazette_number, date_str, kind, input_json, input_hash, state_hash, applied_at = row
+    return {
+        "gazette_number": gazette_number,
+        "date": date_str,
+        "kind": kind,
+        "input": json.loads(input_json),
+        "input_hash": input_hash,
+        "state_hash": state_hash,
+        "applied_at": applied_at,
+    }
+
+
+_COLUMNS = "gazette_number, date, kind, input, input_hash, state_hash, applied_at"
+
+
+def record_version(cur, prefix: str, gazette_number: str, date_str: str, kind: str, payload, state: dict) -> str:
+    """Store the input a version was built from; returns the state hash."""
+    state_hash = content_hash(state)
+    cur.execute(
+        f"""
+        INSERT INTO {prefix}_applied_version (gazette_number, date, kind, input, input_hash, state_hash)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (gazette_number, date) DO UPDATE SET
+            kind = excluded.kind, input = excluded.input, input_hash = excluded.input_hash,
+            state_hash = excluded.state_hash, applied_at = CURRENT_TIMESTAMP
+        """,
+        (gazette_number, date_str, kind, json.dumps(payload, ensure_ascii=False), content_hash(payload), state_hash),
+    )
+    return state_hash
+
+
+def is_version_unchanged(cur, prefix: str, gazette_number: str, date_str: str, payload, state: dict) -> bool:
+    """True if the version is already recorded with this exact input and resulting state."""
+    cur.execute(
+        f"SELECT input_hash, state_hash FROM {prefix}_applied_version WHERE gazette_number = ? AND date = ?",
+        (gazette_number, date_str),
+    )
+    row = cur.fetchone()
+    return row is not None and tuple(row) == (content_hash(payload), content_hash(state))
+
+
+def get_version_record(cur, prefix: str, gazette_number: str, date_str: str) -> dict | None:
+    cur.execute(
+        f"SELECT {_COLUMNS} FROM {prefix}_applied_version WHERE gazette_number = ? AND date = ?",
+        (gazette_number, date_str),
+    )
+    row = cur.fetchone()
+    return _record(row) if row else None
+
+
+def get_later_version_records(cur, prefix: str, gazette_number: str, date_str: str) -> list[dict]:
+    """Ledger entries for versions after (gazette_number, date_str), oldest first."""
+    cur.execute(
+        f"""
+        SELECT {_COLUMNS} FROM {prefix}_applied_version
+        WHERE (date > ? OR (date = ? AND gazette_number > ?))
+        ORDER BY date, gazette_number
+        """,
+        (date_str, date_str, gazette_number),
+    )
+    return [_record(row) for row in cur.fetchall()]
+
+
+def get_version_records_between(cur, prefix: str, from_date: str, to_date: str) -> list[dict]:
+    """Ledger entries for versions dated from_date..to_date (inclusive), oldest first."""
+    cur.execute(
+        f"SELECT {_COLUMNS} FROM {prefix}_applied_version WHERE date >= ? AND date <= ? ORDER BY date, gazette_number",
+        (from_date, to_date),
+    )
+    return [_record(row) for row in cur.fetchall()]
+
+
+def clear_ledger(cur, prefix: str):
+    cur.execute(f"DELETE FROM {prefix}_applied_version")
+
+
+def get_generation(cur, prefix: str) -> int:
+    """Counter bumped by every committed write to the domain (see bump_generation)."""
+    cur.execute(f"SELECT generation FROM {prefix}_generation")
+    row = cur.fetchone()
+    return row[0] if row else 0
+
+
+def bump_generation(cur, prefix: str) -> int:
+    """
+    Mark the domain as changed inside the current write transaction.
+    Other workers compare the counter against the one their caches were
+    filled at and drop those caches when it moved. Returns the new value.
+    """
+    cur.execute(f"UPDATE {prefix}_generation SET generation = generation + 1")
+    return get_generation(cur, prefix)
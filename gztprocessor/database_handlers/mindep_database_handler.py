@@ -1,43 +1,81 @@
 from gztprocessor.db_connections.db_gov import get_connection
 from collections import defaultdict
+from functools import partial
 from gztprocessor.state_managers.mindep_state_manager import MindepStateManager
+from gztprocessor.database_handlers.history_database_handler import update_department_history
+from gztprocessor.database_handlers.search_database_handler import index_mindep_state
+from gztprocessor.database_handlers.entity_database_handler import EntityDictionary, mindep_entity_dictionary as entities
+from gztprocessor.database_handlers.ledger_database_handler import bump_generation, is_version_unchanged, record_version
+from gztprocessor.version_rebuilder import discard_binary_snapshots, publish_rebased, rebase_later_versions, replay_range, versions_between
+from gztprocessor.storage import storage
+from gztprocessor.metrics import timed
 
 mindep_state_manager = MindepStateManager()
 
-def load_initial_state_to_db(gazette_number: str, date_str: str, ministries: list[dict]):
-    with get_connection() as conn:
-        cur = conn.cursor()
 
-        # 1. Delete all ministries and departments for the incoming gazette_number and date_str
-        cur.execute("SELECT id FROM ministry WHERE gazette_number = ? AND date = ?", (gazette_number, date_str))
-        ministry_ids = [r[0] for r in cur.fetchall()]
-        if ministry_ids:
-            cur.execute("DELETE FROM department WHERE ministry_id IN ({})".format(",".join(["?"]*len(ministry_ids))), ministry_ids)
-            cur.execute("DELETE FROM ministry WHERE gazette_number = ? AND date = ?", (gazette_number, date_str))
-
-        # 2. Insert the new initial state
-        for ministry in ministries:
-            cur.execute(
-                "INSERT INTO ministry (name, gazette_number, date) VALUES (?, ?, ?)",
-                (ministry["name"], gazette_number, date_str)
-            )
-            ministry_id = cur.lastrowid
-            position = 1
-            for dept in ministry["departments"]:
-                dept = dept["name"]
-                cur.execute(
-                    "INSERT INTO department (name, ministry_id, position, gazette_number, date) VALUES (?, ?, ?, ?, ?)",
-                    (dept, ministry_id, position, gazette_number, date_str)
-                )
-                position += 1
-
-        conn.commit()
-
-    mindep_state_manager.export_state_snapshot(gazette_number, date_str)
-    print(f"Initial state replaced for gazette {gazette_number} on {date_str}.")
+def _delete_version(cur, gazette_number: str, date_str: str):
+    cur.execute("SELECT id FROM ministry WHERE gazette_number = ? AND date = ?", (gazette_number, date_str))
+    ministry_ids = [r[0] for r in cur.fetchall()]
+    if ministry_ids:
+        cur.execute("DELETE FROM department WHERE ministry_id IN ({})".format(",".join(["?"]*len(ministry_ids))), ministry_ids)
+        cur.execute("DELETE FROM ministry WHERE gazette_number = ? AND date = ?", (gazette_number, date_str))
 
 
-def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: dict):
+def _insert_ministry(cur, gazette_number: str, date_str: str, ministry: tuple[int, str], departments: list[tuple[int, str]]):
+    """Insert one ministry row and its departments; `ministry` and each department are (entity_id, name)."""
+    ministry_entity_id, ministry_name = ministry
+    ministry_id = storage.insert_returning_id(
+        cur,
+        "INSERT INTO ministry (name, entity_id, gazette_number, date) VALUES (?, ?, ?, ?)",
+        (ministry_name, ministry_entity_id, gazette_number, date_str)
+    )
+    storage.copy_rows(
+        cur, "department", ["name", "entity_id", "ministry_id", "position", "gazette_number", "date"],
+        [
+            (dept_name, dept_entity_id, ministry_id, position, gazette_number, date_str)
+            for position, (dept_entity_id, dept_name) in enumerate(departments, start=1)
+        ]
+    )
+
+
+@timed("mindep.write_version")
+def _write_version(cur, gazette_number: str, date_str: str, state: dict):
+    """Replace the rows for one version with `state`."""
+    _delete_version(cur, gazette_number, date_str)
+    for ministry in state["ministers"]:
+        _insert_ministry(
+            cur, gazette_number, date_str,
+            (entities.intern(cur, "ministry", ministry["name"]), ministry["name"]),
+            [(entities.intern(cur, "department", dept), dept) for dept in ministry["departments"]]
+        )
+    index_mindep_state(cur, gazette_number, date_str, state)
+
+
+def _initial_state(ministries: list[dict]) -> dict:
+    return {
+        "ministers": [
+            {"name": ministry["name"], "departments": [dept["name"] for dept in ministry["departments"]]}
+            for ministry in ministries
+        ]
+    }
+
+
+def _enrich_initial(ministries: list[dict], base_state: dict) -> list[dict]:
+    """Re-derive each department's previous_ministry from the state before the gazette."""
+    previous = {}
+    for ministry in base_state["ministers"]:
+        for dept in ministry["departments"]:
+            previous.setdefault(dept, ministry["name"])
+    return [
+        {
+            **ministry,
+            "departments": [{**dept, "previous_ministry": previous.get(dept["name"])} for dept in ministry["departments"]],
+        }
+        for ministry in ministries
+    ]
+
+
+def _normalize_transactions(transactions) -> list[dict]:
     if isinstance(transactions, dict) and "transactions" in transactions:
         transactions = transactions["transactions"]
     if isinstance(transactions, dict):
@@ -48,7 +86,7 @@ def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: d
         )
 
     # Filter out any invalid transactions with empty departments or ministries
-    transactions = [
+    return [
         tx for tx in transactions
         if tx.get("type") and tx.get("department") and (
             tx["type"] != "ADD" or tx.get("to_ministry")
@@ -59,96 +97,179 @@ def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: d
         )
     ]
 
-    with get_connection() as conn:
-        cur = conn.cursor()
 
-        # 1. Get the latest gazette_number and date in the DB
-        cur.execute("SELECT gazette_number, date FROM ministry ORDER BY date DESC, gazette_number DESC LIMIT 1")
-        row = cur.fetchone()
-        if row:
-            latest_gazette, latest_date = row
-        else:
-            # No data yet, return
-            return
-
-        # 2. Load the latest state into memory
-        ministry_depts = defaultdict(list)
-        cur.execute(
-            """
-            SELECT m.name, d.name
-            FROM ministry m
-            JOIN department d ON m.id = d.ministry_id
-            WHERE m.gazette_number = ? AND m.date = ? AND d.gazette_number = ? AND d.date = ?
-            ORDER BY m.id, d.position
-            """,
-            (latest_gazette, latest_date, latest_gazette, latest_date)
+@timed("mindep.build_amendment_state")
+def build_amendment_state(
+    cur, base_state: dict, transactions: list[dict], entities: EntityDictionary = entities, version: tuple[str, str] | None = None
+) -> dict:
+    """
+    Apply amendment transactions to `base_state` in memory and return the new
+    state. `version` is the (gazette_number, date) being built: the aliases
+    its earlier build recorded are dropped first, so a re-post without a
+    fuzzy-matched MOVE no longer links the two spellings.
+    """
+    if version is not None:
+        entities.drop_version_aliases(cur, *version)
+    # Key the base state by entity id: ministry id -> [department ids], plus id -> display name
+    ministry_depts = defaultdict(list)
+    names = {}
+    for ministry in base_state["ministers"]:
+        ministry_id = entities.intern(cur, "ministry", ministry["name"])
+        names.setdefault(ministry_id, ministry["name"])
+        for dept_name in ministry["departments"]:
+            dept_id = entities.intern(cur, "department", dept_name)
+            names.setdefault(dept_id, dept_name)
+            ministry_depts[ministry_id].append(dept_id)
+
+    for tx in transactions:
+        t = tx["type"]
+        dept = tx["department"]
+
+        if t == "MOVE":
+            from_min = tx["from_ministry"]
+            to_min = tx["to_ministry"]
+            pos = tx.get("position")
+            # A fuzzy-matched MOVE names the department as it was in the previous state
+            prev_dept = tx.get("previous_department") or dept
+            dept_id = entities.lookup(cur, "department", prev_dept)
+            from_id = entities.lookup(cur, "ministry", from_min)
+            if dept_id is None or from_id is None or dept_id not in ministry_depts[from_id]:
+                print(f"⚠️ {prev_dept} not found in {from_min}")
+                continue
+            if prev_dept != dept:
+                # Same department under a new spelling: keep its id and remember the spelling
+                entities.add_alias(cur, "department", dept, prev_dept, version)
+                names[dept_id] = dept
+            to_id = entities.intern(cur, "ministry", to_min)
+            names.setdefault(to_id, to_min)
+            ministry_depts[from_id].remove(dept_id)
+            if pos is not None:
+                insert_at = max(pos - 1, 0)
+                ministry_depts[to_id].insert(insert_at, dept_id)
+            else:
+                ministry_depts[to_id].append(dept_id)
+
+        elif t == "ADD":
+            to_min = tx["to_ministry"]
+            pos = tx.get("position")
+            dept_id = entities.intern(cur, "department", dept)
+            to_id = entities.intern(cur, "ministry", to_min)
+            # The gazette's spelling wins over the one the base state had
+            names[dept_id] = dept
+            names.setdefault(to_id, to_min)
+            if dept_id in ministry_depts[to_id]:
+                continue
+            if pos is not None:
+                insert_at = max(pos - 1, 0)
+                ministry_depts[to_id].insert(insert_at, dept_id)
+            else:
+                ministry_depts[to_id].append(dept_id)
+
+        elif t == "TERMINATE":
+            dept_id = entities.lookup(cur, "department", dept)
+            from_id = entities.lookup(cur, "ministry", tx["from_ministry"])
+            if from_id is not None and dept_id in ministry_depts[from_id]:
+                ministry_depts[from_id].remove(dept_id)
+
+    return {
+        "ministers": [
+            {"name": names[ministry_id], "departments": [names[dept_id] for dept_id in dept_ids]}
+            for ministry_id, dept_ids in ministry_depts.items()
+            if dept_ids  # skip empty ministries
+        ]
+    }
+
+
+def _replay(cur, record: dict, base_state: dict, entities: EntityDictionary = entities) -> tuple[dict, object]:
+    """Rebuild a recorded version on a new base state; returns (state, input)."""
+    if record["kind"] == "initial":
+        # The initial state doesn't depend on earlier versions; only its MOVE rows do
+        ministries = _enrich_initial(record["input"], base_state)
+        return _initial_state(ministries), ministries
+    version = (record["gazette_number"], record["date"])
+    return build_amendment_state(cur, base_state, record["input"], entities, version), record["input"]
+
+
+def _commit_version(conn, cur, gazette_number: str, date_str: str, kind: str, payload, state: dict) -> dict:
+    """
+    Write a version, rebase the versions after it and commit. Returns the
+    rebase summary once the snapshots are queued.
+    A re-post giving the same input and state as recorded writes nothing.
+    """
+    if is_version_unchanged(cur, "mindep", gazette_number, date_str, payload, state):
+        conn.rollback()
+        print(f"⏭️ Gazette {gazette_number} on {date_str} is unchanged; nothing rewritten")
+        return {"unchanged": True, "rebased": []}
+
+    _write_version(cur, gazette_number, date_str, state)
+    record_version(cur, "mindep", gazette_number, date_str, kind, payload, state)
+    with timed("mindep.rebase_later_versions"):
+        rebased = rebase_later_versions(
+            cur, "mindep", mindep_state_manager.VERSION_TABLE, gazette_number, date_str, state, _replay, _write_version
         )
-        for ministry_name, dept_name in cur.fetchall():
-            if ministry_name and dept_name:
-                ministry_depts[ministry_name].append(dept_name)
-
-        # 3. Apply transactions in memory
-        for tx in transactions:
-            t = tx["type"]
-            dept = tx["department"]
-
-            if t == "MOVE":
-                from_min = tx["from_ministry"]
-                to_min = tx["to_ministry"]
-                pos = tx.get("position")
-                if dept not in ministry_depts[from_min]:
-                    print(f"⚠️ {dept} not found in {from_min}")
-                    continue
-                ministry_depts[from_min].remove(dept)
-                if pos is not None:
-                    insert_at = max(pos - 1, 0)
-                    ministry_depts[to_min].insert(insert_at, dept)
-                else:
-                    ministry_depts[to_min].append(dept)
-
-            elif t == "ADD":
-                to_min = tx["to_ministry"]
-                pos = tx.get("position")
-                if dept in ministry_depts[to_min]:
-                    continue
-                if pos is not None:
-                    insert_at = max(pos - 1, 0)
-                    ministry_depts[to_min].insert(insert_at, dept)
-                else:
-                    ministry_depts[to_min].append(dept)
-
-            elif t == "TERMINATE":
-                from_min = tx["from_ministry"]
-                if dept in ministry_depts[from_min]:
-                    ministry_depts[from_min].remove(dept)
-
-        # 4. Delete all ministries and departments for the incoming gazette_number and date_str
-        cur.execute("SELECT id FROM ministry WHERE gazette_number = ? AND date = ?", (gazette_number, date_str))
-        ministry_ids = [r[0] for r in cur.fetchall()]
-        if ministry_ids:
-            cur.execute("DELETE FROM department WHERE ministry_id IN ({})".format(",".join(["?"]*len(ministry_ids))), ministry_ids)
-            cur.execute("DELETE FROM ministry WHERE gazette_number = ? AND date = ?", (gazette_number, date_str))
-
-        # 5. Insert the new state
-        ministry_id_map = {}
-        for ministry_name, departments in ministry_depts.items():
-            if not ministry_name or not departments:
-                continue  # skip empty ministries
-            cur.execute(
-                "INSERT INTO ministry (name, gazette_number, date) VALUES (?, ?, ?)",
-                (ministry_name, gazette_number, date_str)
-            )
-            ministry_id = cur.lastrowid
-            ministry_id_map[ministry_name] = ministry_id
-            for idx, dept_name in enumerate(departments, start=1):
-                cur.execute(
-                    "INSERT INTO department (name, ministry_id, position, gazette_number, date) VALUES (?, ?, ?, ?, ?)",
-                    (dept_name, ministry_id, idx, gazette_number, date_str)
-                )
-
-        conn.commit()
+    with timed("mindep.update_department_history"):
+        update_department_history(cur, gazette_number, date_str, state, rebased)
+    generation = bump_generation(cur, "mindep")
+    discard_binary_snapshots(mindep_state_manager, gazette_number, date_str, rebased)
+
+    conn.commit()
+    entities.commit(generation)
+
+    mindep_state_manager.invalidate_version_timeline()
+    mindep_state_manager.export_state_snapshot(gazette_number, date_str, state, generation)
+    return publish_rebased(mindep_state_manager, rebased, generation)
+
+
+@timed("mindep.load_initial_state_to_db")
+def load_initial_state_to_db(gazette_number: str, date_str: str, ministries: list[dict]) -> dict:
+    with get_connection() as conn, storage.write_lock(conn, "gov"):
+        cur = conn.cursor()
+        entities.begin(cur)
+        summary = _commit_version(conn, cur, gazette_number, date_str, "initial", ministries, _initial_state(ministries))
+
+    print(f"Initial state replaced for gazette {gazette_number} on {date_str}.")
+    return summary
+
+
+@timed("mindep.apply_transactions_to_db")
+def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: dict) -> dict | None:
+    """
+    Apply amendment transactions on top of the version before this gazette
+    (not necessarily the latest one), then rebase any later versions.
+    """
+    transactions = _normalize_transactions(transactions)
+
+    with get_connection() as conn, storage.write_lock(conn, "gov"):
+        cur = conn.cursor()
+        entities.begin(cur)
+
+        try:
+            prev_gazette, prev_date = mindep_state_manager.get_latest_state_info(cur, gazette_number, date_str)
+        except FileNotFoundError:
+            # No earlier state yet, return
+            return None
+        base_state = mindep_state_manager._get_state_from_db(cur, prev_gazette, prev_date)
+
+        state = build_amendment_state(cur, base_state, transactions, version=(gazette_number, date_str))
+        summary = _commit_version(conn, cur, gazette_number, date_str, "amendment", transactions, state)
         print("DB updated with new positions (versioned, no deletes)")
 
-    mindep_state_manager.export_state_snapshot(gazette_number, date_str)
-    print(f"Exported state snapshot for {date_str}")
+    print(f"Queued state snapshot export for {date_str}")
+    return summary
+
 
+@timed("mindep.get_states_between")
+def get_states_between(from_date: str, to_date: str) -> list[dict]:
+    """
+    States of every version dated from_date..to_date, oldest first, built in
+    one pass by replaying each version's transactions on the one before it.
+    """
+    with get_connection() as conn:
+        cur = conn.cursor()
+        versions, records = versions_between(cur, "mindep", mindep_state_manager.VERSION_TABLE, from_date, to_date)
+        # A private dictionary and a rollback keep the replay's interning out of
+        # the shared cache and the DB
+        replay = partial(_replay, entities=EntityDictionary("mindep"))
+        states = replay_range(cur, versions, records, replay, mindep_state_manager.load_state)
+        conn.rollback()
+    return states
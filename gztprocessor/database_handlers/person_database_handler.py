@@ -1,111 +1,209 @@
 # database_handlers/person_database_handler.py
+from functools import partial
 from gztprocessor.db_connections.db_person import get_connection
 from gztprocessor.state_managers.person_state_manager import PersonStateManager
+from gztprocessor.database_handlers.history_database_handler import update_portfolio_history
+from gztprocessor.database_handlers.search_database_handler import index_person_state
+from gztprocessor.database_handlers.entity_database_handler import EntityDictionary, person_entity_dictionary as entities
+from gztprocessor.database_handlers.ledger_database_handler import bump_generation, is_version_unchanged, record_version
+from gztprocessor.version_rebuilder import discard_binary_snapshots, publish_rebased, rebase_later_versions, replay_range, versions_between
+from gztprocessor.storage import storage
+from gztprocessor.metrics import timed
 
 person_state_manager = PersonStateManager()
 
-def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: dict):
+@timed("person.write_version")
+def _write_version(cur, gazette_number: str, date_str: str, state: dict):
+    """Replace the rows for one version with `state`."""
+    cur.execute("SELECT id FROM person WHERE gazette_number = ? AND date = ?", (gazette_number, date_str))
+    person_ids = [r[0] for r in cur.fetchall()]
+    if person_ids:
+        cur.execute("DELETE FROM portfolio WHERE person_id IN ({})".format(",".join(["?"]*len(person_ids))), person_ids)
+        cur.execute("DELETE FROM person WHERE gazette_number = ? AND date = ?", (gazette_number, date_str))
+
+    for person in state["persons"]:
+        row_id = storage.insert_returning_id(
+            cur,
+            "INSERT INTO person (name, entity_id, gazette_number, date) VALUES (?, ?, ?, ?)",
+            (person["person_name"], entities.intern(cur, "person", person["person_name"]), gazette_number, date_str)
+        )
+        storage.copy_rows(
+            cur, "portfolio", ["name", "entity_id", "position", "person_id", "gazette_number", "date"],
+            [
+                (pf["name"], entities.intern(cur, "portfolio", pf["name"]), pf["position"], row_id, gazette_number, date_str)
+                for pf in person["portfolios"]
+            ]
+        )
+    index_person_state(cur, gazette_number, date_str, state)
+
+
+@timed("person.build_person_state")
+def build_person_state(
+    cur, base_state: dict, txs: dict, entities: EntityDictionary = entities, version: tuple[str, str] | None = None
+) -> dict:
+    """
+    Apply person transactions to `base_state` in memory and return the new
+    state. `version` is the (gazette_number, date) being built: the RENAME
+    aliases its earlier build recorded are dropped first.
+    """
+    if version is not None:
+        entities.drop_version_aliases(cur, *version)
+    # Build the new state in memory, keyed by entity id so matching is integer comparisons
+    # Map: person id -> {"person_name": ..., "portfolios": [{"name", "position", "entity_id"}, ...]}
+    new_state = {}
+    for person in base_state["persons"]:
+        new_state[entities.intern(cur, "person", person["person_name"])] = {
+            "person_name": person["person_name"],
+            "portfolios": [
+                {**pf, "entity_id": entities.intern(cur, "portfolio", pf["name"])}
+                for pf in person["portfolios"]
+            ]
+        }
+
+    # Apply TERMINATEs
+    for tx in txs.get("terminates", []):
+        person_id = entities.lookup(cur, "person", tx["name"])
+        ministry_id = entities.lookup(cur, "portfolio", tx["ministry"])
+        if person_id in new_state:
+            new_state[person_id]["portfolios"] = [pf for pf in new_state[person_id]["portfolios"] if pf["entity_id"] != ministry_id]
+            # If no portfolios left, remove person
+            if not new_state[person_id]["portfolios"]:
+                del new_state[person_id]
+
+    # Apply MOVEs
+    for tx in txs.get("moves", []):
+        name = tx["name"]
+        to_ministry = tx["to_ministry"]
+        to_position = tx["to_position"]
+        person_id = entities.intern(cur, "person", name)
+        from_id = entities.lookup(cur, "portfolio", tx["from_ministry"])
+        to_id = entities.intern(cur, "portfolio", to_ministry)
+        # Remove old portfolio
+        if person_id in new_state:
+            new_state[person_id]["portfolios"] = [pf for pf in new_state[person_id]["portfolios"] if pf["entity_id"] != from_id]
+        else:
+            new_state[person_id] = {"person_name": name, "portfolios": []}
+        # Add new portfolio if not already present
+        if not any(pf["entity_id"] == to_id and pf["position"] == to_position for pf in new_state[person_id]["portfolios"]):
+            new_state[person_id]["portfolios"].append({"name": to_ministry, "position": to_position, "entity_id": to_id})
+
+    # Apply ADDs
+    for tx in txs.get("adds", []):
+        name = tx["new_person"]
+        ministry = tx["new_ministry"]
+        position = tx["new_position"]
+        person_id = entities.intern(cur, "person", name)
+        ministry_id = entities.intern(cur, "portfolio", ministry)
+        if person_id not in new_state:
+            new_state[person_id] = {"person_name": name, "portfolios": []}
+        # Add new portfolio if not already present; the gazette's spelling wins
+        existing = [pf for pf in new_state[person_id]["portfolios"] if pf["entity_id"] == ministry_id and pf["position"] == position]
+        for pf in existing:
+            pf["name"] = ministry
+        if not existing:
+            new_state[person_id]["portfolios"].append({"name": ministry, "position": position, "entity_id": ministry_id})
+
+    # Apply RENAMEs: the new name becomes an alias of the old portfolio entity,
+    # so the portfolio keeps its id across versions
+    for tx in txs.get("renames", []):
+        name = tx["name"]
+        old_ministry = tx["old_ministry"]
+        new_ministry = tx["new_ministry"]
+        person_id = entities.lookup(cur, "person", name)
+
+        if person_id in new_state:
+            old_id = entities.lookup(cur, "portfolio", old_ministry)
+            found = False
+            for pf in new_state[person_id]["portfolios"]:
+                if pf["entity_id"] == old_id:
+                    pf["name"] = new_ministry 
+                    found = True
+            if found:
+                entities.add_alias(cur, "portfolio", new_ministry, old_ministry, version)
+            else:
+                print(f"⚠️ RENAME skipped: '{old_ministry}' not found under '{name}'")
+        else:
+            print(f"⚠️ RENAME skipped: person '{name}' not found in current state")
+
+    return {
+        "persons": [
+            {
+                "person_name": person["person_name"],
+                "portfolios": [{"name": pf["name"], "position": pf["position"]} for pf in person["portfolios"]]
+            }
+            for person in new_state.values()
+        ]
+    }
+
+
+def _replay(cur, record: dict, base_state: dict, entities: EntityDictionary = entities) -> tuple[dict, dict]:
+    """Rebuild a recorded version on a new base state; returns (state, input)."""
+    version = (record["gazette_number"], record["date"])
+    return build_person_state(cur, base_state, record["input"], entities, version), record["input"]
+
+
+@timed("person.apply_transactions_to_db")
+def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: dict) -> dict:
+    """
+    Apply person transactions on top of the version before this gazette
+    (not necessarily the latest one), then rebase any later versions.
+    """
     txs = transactions.get("transactions", transactions)
 
-    with get_connection() as conn:
+    with get_connection() as conn, storage.write_lock(conn, "person"):
         cur = conn.cursor()
+        entities.begin(cur)
 
         print(f" Applying transactions for gazette {gazette_number} on {date_str}")
 
-        # 1. Remove any existing records for this gazette_number/date
-        cur.execute("SELECT id FROM person WHERE gazette_number = ? AND date = ?", (gazette_number, date_str))
-        person_ids = [r[0] for r in cur.fetchall()]
-        if person_ids:
-            cur.execute("DELETE FROM portfolio WHERE person_id IN ({})".format(",".join(["?"]*len(person_ids))), person_ids)
-            cur.execute("DELETE FROM person WHERE gazette_number = ? AND date = ?", (gazette_number, date_str))
-
-        # 2. Get the previous state (latest gazette_number/date before this one)
+        # 1. Get the previous state (latest gazette_number/date before this one)
         try:
             prev_gazette, prev_date = person_state_manager.get_latest_state_info(cur, gazette_number, date_str)
-            prev_state = person_state_manager._get_state_from_db(cur, prev_gazette, prev_date)
+            base_state = person_state_manager._get_state_from_db(cur, prev_gazette, prev_date)
         except FileNotFoundError:
-            prev_state = {"persons": []}
-
-        # 3. Build new state in memory
-        # Map: person_name -> {"person_name": ..., "portfolios": [...]}
-        new_state = {}
-        for person in prev_state["persons"]:
-            new_state[person["person_name"]] = {
-                "person_name": person["person_name"],
-                "portfolios": [pf.copy() for pf in person["portfolios"]]
-            }
-
-        # Apply TERMINATEs
-        for tx in txs.get("terminates", []):
-            name = tx["name"]
-            ministry = tx["ministry"]
-            if name in new_state:
-                new_state[name]["portfolios"] = [pf for pf in new_state[name]["portfolios"] if pf["name"] != ministry]
-                # If no portfolios left, remove person
-                if not new_state[name]["portfolios"]:
-                    del new_state[name]
-
-        # Apply MOVEs
-        for tx in txs.get("moves", []):
-            name = tx["name"]
-            to_ministry = tx["to_ministry"]
-            to_position = tx["to_position"]
-            from_ministry = tx["from_ministry"]
-            # Remove old portfolio
-            if name in new_state:
-                new_state[name]["portfolios"] = [pf for pf in new_state[name]["portfolios"] if pf["name"] != from_ministry]
-            else:
-                new_state[name] = {"person_name": name, "portfolios": []}
-            # Add new portfolio if not already present
-            if not any(pf["name"] == to_ministry and pf["position"] == to_position for pf in new_state[name]["portfolios"]):
-                new_state[name]["portfolios"].append({"name": to_ministry, "position": to_position})
-
-        # Apply ADDs
-        for tx in txs.get("adds", []):
-            name = tx["new_person"]
-            ministry = tx["new_ministry"]
-            position = tx["new_position"]
-            if name not in new_state:
-                new_state[name] = {"person_name": name, "portfolios": []}
-            # Add new portfolio if not already present
-            if not any(pf["name"] == ministry and pf["position"] == position for pf in new_state[name]["portfolios"]):
-                new_state[name]["portfolios"].append({"name": ministry, "position": position})
-
-        # Apply RENAMEs
-        for tx in txs.get("renames", []):
-            name = tx["name"]
-            old_ministry = tx["old_ministry"]
-            new_ministry = tx["new_ministry"]
-
-            if name in new_state:
-                portfolios = new_state[name]["portfolios"]
-                found = False
-                for pf in portfolios:
-                    if pf["name"] == old_ministry:
-                        pf["name"] = new_ministry 
-                        found = True
-                if not found:
-                    print(f"⚠️ RENAME skipped: '{old_ministry}' not found under '{name}'")
-            else:
-                print(f"⚠️ RENAME skipped: person '{name}' not found in current state")
-
-
-        # 4. Insert new state into person/portfolio with gazette_number/date
-        for person in new_state.values():
-            cur.execute(
-                "INSERT INTO person (name, gazette_number, date) VALUES (?, ?, ?)",
-                (person["person_name"], gazette_number, date_str)
+            base_state = {"persons": []}
+
+        # 2. Build and write the new state, then rebase the versions after it
+        state = build_person_state(cur, base_state, txs, version=(gazette_number, date_str))
+        if is_version_unchanged(cur, "person", gazette_number, date_str, txs, state):
+            # Same input and state as recorded: skip the rewrite, rebase and snapshot
+            conn.rollback()
+            print(f"⏭️ Gazette {gazette_number} on {date_str} is unchanged; nothing rewritten")
+            return {"unchanged": True, "rebased": []}
+
+        _write_version(cur, gazette_number, date_str, state)
+        record_version(cur, "person", gazette_number, date_str, "person", txs, state)
+        with timed("person.rebase_later_versions"):
+            rebased = rebase_later_versions(
+                cur, "person", person_state_manager.VERSION_TABLE, gazette_number, date_str, state, _replay, _write_version
             )
-            person_id = cur.lastrowid
-            for pf in person["portfolios"]:
-                cur.execute(
-                    "INSERT INTO portfolio (name, position, person_id, gazette_number, date) VALUES (?, ?, ?, ?, ?)",
-                    (pf["name"], pf["position"], person_id, gazette_number, date_str)
-                )
+        with timed("person.update_portfolio_history"):
+            update_portfolio_history(cur, gazette_number, date_str, state, rebased)
+        generation = bump_generation(cur, "person")
+        discard_binary_snapshots(person_state_manager, gazette_number, date_str, rebased)
 
         conn.commit()
+        entities.commit(generation)
         print(f"Person-portfolio DB updated for {gazette_number} on {date_str}")
 
-        # Save snapshot
-        person_state_manager.export_state_snapshot(gazette_number, date_str)
+    person_state_manager.invalidate_version_timeline()
+    # Queue snapshot export with the state we just wrote
+    person_state_manager.export_state_snapshot(gazette_number, date_str, state, generation)
+    return publish_rebased(person_state_manager, rebased, generation)
+
 
+@timed("person.get_states_between")
+def get_states_between(from_date: str, to_date: str) -> list[dict]:
+    """
+    States of every version dated from_date..to_date, oldest first, built in
+    one pass by replaying each version's transactions on the one before it.
+    """
+    with get_connection() as conn:
+        cur = conn.cursor()
+        versions, records = versions_between(cur, "person", person_state_manager.VERSION_TABLE, from_date, to_date)
+        # A private dictionary and a rollback keep the replay's interning out of
+        # the shared cache and the DB
+        replay = partial(_replay, entities=EntityDictionary("person"))
+        states = replay_range(cur, versions, records, replay, person_state_manager.load_state)
+        conn.rollback()
+    return states
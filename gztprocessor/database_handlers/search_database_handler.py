@@ -0,0 +1,236 @@
+# database_handlers/search_database_handler.py
+import re
+
+from rapidfuzz import fuzz
+
+from gztprocessor.db_connections.db_gov import get_connection as get_gov_connection
+from gztprocessor.db_connections.db_person import get_connection as get_person_connection
+from gztprocessor.storage import storage
+from gztprocessor.metrics import timed
+
+# Each domain keeps its own search tables. Entity types are named after the
+# versioned table they come from, which the rebuild reads from.
+SEARCH_DOMAINS = {
+    "mindep": {
+        "prefix": "mindep",
+        "db": "gov",
+        "connect": get_gov_connection,
+        "entity_types": ("ministry", "department"),
+    },
+    "person": {
+        "prefix": "person",
+        "db": "person",
+        "connect": get_person_connection,
+        "entity_types": ("person", "portfolio"),
+    },
+}
+
+FUZZY_CANDIDATES = 200
+FUZZY_THRESHOLD = 60
+
+
+def mindep_entities(state: dict) -> set[tuple[str, str]]:
+    entities = set()
+    for ministry in state["ministers"]:
+        entities.add(("ministry", ministry["name"]))
+        entities.update(("department", dept) for dept in ministry["departments"])
+    return entities
+
+
+def person_entities(state: dict) -> set[tuple[str, str]]:
+    entities = set()
+    for person in state["persons"]:
+        entities.add(("person", person["person_name"]))
+        entities.update(("portfolio", pf["name"]) for pf in person["portfolios"])
+    return entities
+
+
+def _index_entities(cur, prefix: str, gazette_number: str, date_str: str, entities: set[tuple[str, str]]):
+    cur.execute(
+        f"DELETE FROM {prefix}_search_version WHERE gazette_number = ? AND date = ?",
+        (gazette_number, date_str),
+    )
+    version_rows = []
+    for entity_type, name in entities:
+        entity_id = storage.insert_returning_id(
+            cur,
+            f"INSERT INTO {prefix}_search_entity (entity_type, name) VALUES (?, ?) ON CONFLICT DO NOTHING",
+            (entity_type, name),
+        )
+        if entity_id is not None:
+            storage.search_index_add(cur, prefix, entity_id, name)
+        else:
+            cur.execute(
+                f"SELECT id FROM {prefix}_search_entity WHERE entity_type = ? AND name = ?",
+                (entity_type, name),
+            )
+            entity_id = cur.fetchone()[0]
+        version_rows.append((entity_id, gazette_number, date_str))
+
+    cur.executemany(
+        f"INSERT INTO {prefix}_search_version (entity_id, gazette_number, date) VALUES (?, ?, ?) ON CONFLICT DO NOTHING",
+        version_rows,
+    )
+
+
+def index_mindep_state(cur, gazette_number: str, date_str: str, state: dict):
+    _index_entities(cur, "mindep", gazette_number, date_str, mindep_entities(state))
+
+
+def index_person_state(cur, gazette_number: str, date_str: str, state: dict):
+    _index_entities(cur, "person", gazette_number, date_str, person_entities(state))
+
+
+def clear_search_index(cur, prefix: str):
+    storage.search_index_clear(cur, prefix)
+    cur.execute(f"DELETE FROM {prefix}_search_version")
+    cur.execute(f"DELETE FROM {prefix}_search_entity")
+
+
+def rebuild_search_index(domain: str):
+    """Rebuild a domain's search index from its versioned tables."""
+    cfg = SEARCH_DOMAINS[domain]
+    prefix = cfg["prefix"]
+    with cfg["connect"]() as conn, storage.write_lock(conn, cfg["db"]):
+        cur = conn.cursor()
+        clear_search_index(cur, prefix)
+        for entity_type in cfg["entity_types"]:
+            cur.execute(
+                f"""
+                INSERT INTO {prefix}_search_entity (entity_type, name)
+                SELECT DISTINCT CAST(? AS TEXT), name FROM {entity_type} WHERE true
+                ON CONFLICT DO NOTHING
+                """,
+                (entity_type,),
+            )
+            cur.execute(
+                f"""
+                INSERT INTO {prefix}_search_version (entity_id, gazette_number, date)
+                SELECT e.id, t.gazette_number, t.date
+                FROM {entity_type} t
+                JOIN {prefix}_search_entity e ON e.entity_type = ? AND e.name = t.name
+                WHERE true
+                ON CONFLICT DO NOTHING
+                """,
+                (entity_type,),
+            )
+        storage.search_index_rebuild(cur, prefix)
+        conn.commit()
+        cur.execute(f"SELECT COUNT(*) FROM {prefix}_search_entity")
+        print(f"🔁 Rebuilt {domain} search index ({cur.fetchone()[0]} entities)")
+
+
+def _search_domain(domain: str, query: str, entity_types: set[str] | None, limit: int) -> list[dict]:
+    """
+    Candidates from one domain. Word-prefix matches rank first (by bm25);
+    when there are fewer than `limit` of them, trigram matches scored with
+    rapidfuzz fill in, so misspellings still find something.
+    """
+    cfg = SEARCH_DOMAINS[domain]
+    prefix = cfg["prefix"]
+    tokens = re.findall(r"\w+", query.lower())
+    if not tokens:
+        return []
+
+    type_filter = ""
+    params = []
+    if entity_types is not None:
+        type_filter = f"AND e.entity_type IN ({','.join(['?'] * len(entity_types))})"
+        params = sorted(entity_types)
+
+    # Only entities that still appear in at least one version
+    live_filter = f"AND EXISTS (SELECT 1 FROM {prefix}_search_version v WHERE v.entity_id = e.id)"
+
+    results = {}
+    with cfg["connect"]() as conn:
+        cur = conn.cursor()
+        rows = storage.search_prefix(cur, prefix, tokens, f"{type_filter} {live_filter}", params, limit)
+        for entity_id, entity_type, name, rank in rows:
+            results[entity_id] = {
+                "domain": domain,
+                "entity_id": entity_id,
+                "entity_type": entity_type,
+                "name": name,
+                "match": "prefix",
+                "score": round(fuzz.WRatio(query, name), 1),
+                "_rank": (0, rank),
+            }
+
+        if len(results) < limit:
+            rows = storage.search_trigram(cur, prefix, query, f"{type_filter} {live_filter}", params, FUZZY_CANDIDATES)
+            for entity_id, entity_type, name in rows:
+                if entity_id in results:
+                    continue
+                score = fuzz.WRatio(query, name)
+                if score < FUZZY_THRESHOLD:
+                    continue
+                results[entity_id] = {
+                    "domain": domain,
+                    "entity_id": entity_id,
+                    "entity_type": entity_type,
+                    "name": name,
+                    "match": "fuzzy",
+                    "score": round(score, 1),
+                    "_rank": (1, -score),
+                }
+
+    return list(results.values())
+
+
+def _attach_versions(results: list[dict]):
+    by_domain = {}
+    for result in results:
+        by_domain.setdefault(result["domain"], []).append(result)
+
+    for domain, domain_results in by_domain.items():
+        cfg = SEARCH_DOMAINS[domain]
+        prefix = cfg["prefix"]
+        ids = [r["entity_id"] for r in domain_results]
+        versions = {entity_id: [] for entity_id in ids}
+        with cfg["connect"]() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                f"""
+                SELECT entity_id, gazette_number, date FROM {prefix}_search_version
+                WHERE entity_id IN ({','.join(['?'] * len(ids))})
+                ORDER BY date, gazette_number
+                """,
+                ids,
+            )
+            for entity_id, gazette_number, date_str in cur.fetchall():
+                versions[entity_id].append({"gazette_number": gazette_number, "date": date_str})
+        for result in domain_results:
+            result["versions"] = versions[result["entity_id"]]
+
+
+@timed("search.search")
+def search(query: str, entity_types: list[str] | None = None, page: int = 1, page_size: int = 20) -> dict:
+    """
+    Search ministries, departments, persons and portfolios across all versions.
+    Returns one page of ranked matches, each with the versions it appears in.
+    """
+    page = max(page, 1)
+    page_size = max(min(page_size, 100), 1)
+    limit = page * page_size
+    wanted = set(entity_types) if entity_types else None
+
+    results = []
+    for domain, cfg in SEARCH_DOMAINS.items():
+        domain_types = set(cfg["entity_types"]) if wanted is None else wanted & set(cfg["entity_types"])
+        if domain_types:
+            # One extra candidate tells us whether another page exists
+            results.extend(_search_domain(domain, query, domain_types, limit + 1))
+
+    results.sort(key=lambda r: r["_rank"])
+    page_results = results[(page - 1) * page_size:limit]
+    for result in page_results:
+        del result["_rank"]
+    _attach_versions(page_results)
+
+    return {
+        "query": query,
+        "page": page,
+        "page_size": page_size,
+        "has_more": len(results) > limit,
+        "results": page_results,
+    }
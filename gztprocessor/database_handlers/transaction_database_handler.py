@@ -1,5 +1,11 @@
 import json
-from gztprocessor.db_connections.db_trans import get_connection 
+import os
+from collections import OrderedDict
+
+from gztprocessor.db_connections.db_trans import get_connection
+from gztprocessor.json_patch import apply_json_patch
+from gztprocessor.metrics import cache_lookup, timed
+from gztprocessor.storage import storage
 
 def create_record(gazette_number: str, gazette_type: str, gazette_format: str, gazette_date: str):
     with get_connection() as conn:
@@ -7,12 +13,10 @@ def create_record(gazette_number: str, gazette_type: str, gazette_format: str, g
         cur.execute(
             """
             INSERT INTO transactions (gazette_number, gazette_type, gazette_format, gazette_date)
-            SELECT ?, ?, ?, ?
-            WHERE NOT EXISTS (
-                SELECT 1 FROM transactions WHERE gazette_number = ?
-            )
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (gazette_number) DO NOTHING
             """,
-            (gazette_number, gazette_type, gazette_format, gazette_date, gazette_number)
+            (gazette_number, gazette_type, gazette_format, gazette_date)
         )
         conn.commit()
 
@@ -29,28 +33,139 @@ def get_gazette_info(gazette_number: str):
         return {"gazette_type": row[0], "gazette_format": row[1]} if row else None
 
 
-def save_transactions(gazette_number: str, data_json: dict):
-    with get_connection() as conn:
-        cur = conn.cursor()
+# Draft transactions
+#
+# A gazette's draft is stored whole in transactions.transactions (at
+# draft_version) plus the JSON patches appended since, so an autosave writes
+# only its edit. At every DRAFT_COMPACT_EVERY-th version the merged draft is
+# saved whole again and its patches are dropped. Merged drafts are cached per
+# worker, keyed by version, so reads apply only patches they haven't seen.
+
+# Configuration (override via environment variables)
+DRAFT_COMPACT_EVERY = int(os.environ.get("GZTP_DRAFT_COMPACT_EVERY", "50"))
+DRAFT_CACHE_SIZE = int(os.environ.get("GZTP_DRAFT_CACHE_SIZE", "128"))
+
+EMPTY_DRAFT = {"transactions": [], "moves": []}
+
+_drafts = OrderedDict()  # gazette_number -> (version, merged draft)
+
+
+class DraftConflictError(ValueError):
+    """A patch was made against a draft version that is no longer the latest."""
+
+    def __init__(self, gazette_number: str, version: int):
+        super().__init__(f"Draft for {gazette_number} is at version {version}")
+        self.version = version
+
+
+def _cache_draft(gazette_number: str, version: int, draft):
+    _drafts[gazette_number] = (version, draft)
+    _drafts.move_to_end(gazette_number)
+    while len(_drafts) > DRAFT_CACHE_SIZE:
+        _drafts.popitem(last=False)
+
+
+def _load_draft(cur, gazette_number: str) -> tuple[int, object] | None:
+    """(version, merged draft), or None if the gazette has no record."""
+    cur.execute(
+        """
+        SELECT draft_version,
+               (SELECT MAX(version) FROM transaction_draft_patch p WHERE p.gazette_number = t.gazette_number)
+        FROM transactions t WHERE gazette_number = ?
+        """,
+        (gazette_number,)
+    )
+    row = cur.fetchone()
+    if not row:
+        return None
+    base_version, latest = row[0], row[1] if row[1] is not None else row[0]
+
+    cached = _drafts.get(gazette_number)
+    usable = cached is not None and base_version <= cached[0] <= latest
+    cache_lookup("drafts", usable)
+    if usable:
+        # Still on top of the saved draft: only the newer patches are missing
+        version, draft = cached
+    else:
+        cur.execute("SELECT transactions FROM transactions WHERE gazette_number = ?", (gazette_number,))
+        saved = cur.fetchone()[0]
+        version, draft = base_version, json.loads(saved) if saved is not None else EMPTY_DRAFT
+
+    if version < latest:
         cur.execute(
-            """
-            UPDATE transactions SET transactions = ? WHERE gazette_number = ?
-            """,
-            (json.dumps(data_json), gazette_number)
+            "SELECT patch FROM transaction_draft_patch WHERE gazette_number = ? AND version > ? ORDER BY version",
+            (gazette_number, version)
         )
+        for (patch,) in cur.fetchall():
+            draft = apply_json_patch(draft, json.loads(patch))
+        version = latest
+    _cache_draft(gazette_number, version, draft)
+    return version, draft
+
+
+def _save_whole_draft(cur, gazette_number: str, version: int, draft):
+    cur.execute(
+        "UPDATE transactions SET transactions = ?, draft_version = ? WHERE gazette_number = ?",
+        (json.dumps(draft), version, gazette_number)
+    )
+    cur.execute("DELETE FROM transaction_draft_patch WHERE gazette_number = ?", (gazette_number,))
+
+
+def save_transactions(gazette_number: str, data_json: dict) -> int | None:
+    """Replace the whole draft. Returns its new version, or None if the gazette has no record."""
+    with get_connection() as conn, storage.write_lock(conn, "trans"):
+        cur = conn.cursor()
+        loaded = _load_draft(cur, gazette_number)
+        if loaded is None:
+            return None
+        version = loaded[0] + 1
+        _save_whole_draft(cur, gazette_number, version, data_json)
         conn.commit()
+    _cache_draft(gazette_number, version, data_json)
+    return version
 
-def get_saved_transactions(gazette_number: str):
-    with get_connection() as conn:
+
+@timed("transactions.patch_transactions")
+def patch_transactions(gazette_number: str, patch: list[dict], base_version: int | None = None) -> int | None:
+    """
+    Apply a JSON patch to the draft and store it. With `base_version`, the
+    patch is rejected (DraftConflictError) unless the draft is still at that
+    version. Raises ValueError for a patch that doesn't apply. Returns the
+    new version, or None if the gazette has no record.
+    """
+    with get_connection() as conn, storage.write_lock(conn, "trans"):
         cur = conn.cursor()
-        cur.execute(
-            "SELECT transactions FROM transactions WHERE gazette_number = ?",
-            (gazette_number,)
-        )
-        row = cur.fetchone()
-        if not row or row[0] is None:
-            return {"transactions": [], "moves": []}
-        return json.loads(row[0])  # Now returns entire saved object with transactions and moves
+        loaded = _load_draft(cur, gazette_number)
+        if loaded is None:
+            return None
+        version, draft = loaded
+        if base_version is not None and base_version != version:
+            raise DraftConflictError(gazette_number, version)
+        draft = apply_json_patch(draft, patch)
+        version += 1
+
+        if version % DRAFT_COMPACT_EVERY == 0:
+            _save_whole_draft(cur, gazette_number, version, draft)
+        else:
+            cur.execute(
+                "INSERT INTO transaction_draft_patch (gazette_number, version, patch) VALUES (?, ?, ?)",
+                (gazette_number, version, json.dumps(patch))
+            )
+        conn.commit()
+    _cache_draft(gazette_number, version, draft)
+    return version
+
+
+@timed("transactions.get_draft")
+def get_draft(gazette_number: str) -> tuple[int, object]:
+    """(version, merged draft); version 0 and an empty draft if nothing was saved."""
+    with get_connection() as conn:
+        loaded = _load_draft(conn.cursor(), gazette_number)
+    return loaded if loaded is not None else (0, EMPTY_DRAFT)
+
+
+def get_saved_transactions(gazette_number: str):
+    return get_draft(gazette_number)[1]  # Now returns entire saved object with transactions and moves
 
 def get_gazettes_by_president(gazette_type: str, from_date: str, to_date: str):
     with get_connection() as conn:
@@ -0,0 +1,32 @@
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Configuration (override via environment variables)
+STORAGE_BACKEND = os.environ.get("GZTP_STORAGE", "sqlite").lower()  # "sqlite" or "postgres"
+# Snapshot files; every API worker must see the same directory
+STATE_DIR = Path(os.environ.get("GZTP_STATE_DIR", BASE_DIR.parent / "state"))
+
+# SQLite
+DATA_DIR = Path(os.environ.get("GZTP_DATA_DIR", BASE_DIR))
+DB_MODE = os.environ.get("GZTP_DB_MODE", "split").lower()  # "split", "unified" or "attached"
+
+# PostgreSQL
+PG_DSN = os.environ.get("GZTP_POSTGRES_DSN", "")
+PG_POOL_SIZE = int(os.environ.get("GZTP_PG_POOL_SIZE", "10"))
+PG_PREPARE_THRESHOLD = int(os.environ.get("GZTP_PG_PREPARE_THRESHOLD", "2"))
+
+DB_FILES = {
+    "gov": DATA_DIR / "gov.db",
+    "person": DATA_DIR / "person.db",
+    "trans": DATA_DIR / "transactions.db",
+}
+UNIFIED_DB_PATH = DATA_DIR / "gztprocessor.db"
+
+if DB_MODE not in ("split", "unified", "attached"):
+    raise ValueError(f"Unknown GZTP_DB_MODE '{DB_MODE}'. Use split, unified or attached.")
+
+
+def db_path(domain: str) -> Path:
+    return UNIFIED_DB_PATH if DB_MODE == "unified" else DB_FILES[domain]
@@ -1,14 +1,12 @@
 from pathlib import Path
-import sqlite3
+
+from gztprocessor.storage import storage
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-DB_PATH = BASE_DIR / "person.db"
 SCHEMA_PATH = BASE_DIR / "schemas" / "person_schema.sql"
 
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    return storage.connect("person")
 
 def init_db():
-    with get_connection() as conn:
-        with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
-            conn.executescript(f.read())
+    storage.init_schema("person", SCHEMA_PATH)
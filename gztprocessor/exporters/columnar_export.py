@@ -0,0 +1,177 @@
+# exporters/columnar_export.py
+"""
+Export the full versioned history as columnar files for analytics.
+
+One row per placement per version:
+    mindep/  date, gazette_number, ministry, ministry_id, department, department_id, position
+    person/  date, gazette_number, person, person_id, portfolio, portfolio_id, position
+
+Rows are read from SQLite in batches and written to hive-style partitions
+by year (`<domain>/year=YYYY/part-000.parquet`, or `.arrow` for Arrow IPC).
+Name columns are dictionary-encoded; `*_id` columns are the entity ids from
+the entity dictionary, stable across renames.
+
+Requires pyarrow (`pip install "gztprocessor[parquet]"`). Run with:
+    python -m gztprocessor.exporters.columnar_export output/columnar --format parquet
+"""
+import argparse
+from pathlib import Path
+
+from gztprocessor.db_connections.db_gov import get_connection as get_gov_connection
+from gztprocessor.db_connections.db_person import get_connection as get_person_connection
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+DEFAULT_BATCH_SIZE = 50_000
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# domain -> (connection, query, columns); query rows are ordered by date so
+# each year partition is written in one go
+COLUMNAR_DOMAINS = {
+    "mindep": (
+        get_gov_connection,
+        """
+        SELECT m.date, m.gazette_number, m.name, m.entity_id, d.name, d.entity_id, d.position
+        FROM ministry m
+        JOIN department d ON d.ministry_id = m.id
+        ORDER BY m.date, m.gazette_number, m.id, d.position
+        """,
+        [
+            ("date", "date"), ("gazette_number", "name"), ("ministry", "name"), ("ministry_id", "id"),
+            ("department", "name"), ("department_id", "id"), ("position", "int"),
+        ],
+    ),
+    "person": (
+        get_person_connection,
+        """
+        SELECT p.date, p.gazette_number, p.name, p.entity_id, pf.name, pf.entity_id, pf.position
+        FROM person p
+        JOIN portfolio pf ON pf.person_id = p.id
+        ORDER BY p.date, p.gazette_number, p.id, pf.id
+        """,
+        [
+            ("date", "date"), ("gazette_number", "name"), ("person", "name"), ("person_id", "id"),
+            ("portfolio", "name"), ("portfolio_id", "id"), ("position", "name"),
+        ],
+    ),
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError('Columnar export needs pyarrow: pip install "gztprocessor[parquet]"')
+
+
+def _arrow_type(kind: str):
+    return {
+        "date": pa.date32(),
+        "name": pa.dictionary(pa.int32(), pa.string()),
+        "id": pa.int64(),
+        "int": pa.int32(),
+    }[kind]
+
+
+class _PartitionWriter:
+    """
+    Writes one partition file. Name dictionaries grow across batches and
+    only ever append, so Arrow IPC can ship them as dictionary deltas.
+    """
+
+    def __init__(self, path: Path, schema, columns: list, file_format: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.schema = schema
+        self.columns = columns
+        self.rows = 0
+        self._dictionaries = {name: {} for name, kind in columns if kind == "name"}
+        if file_format == "parquet":
+            self._writer = pq.ParquetWriter(path, schema, compression="zstd")
+        else:
+            options = ipc.IpcWriteOptions(compression="zstd", emit_dictionary_deltas=True)
+            self._writer = ipc.new_file(path, schema, options=options)
+
+    def _dictionary_array(self, name: str, values: list):
+        index = self._dictionaries[name]
+        indices = [None if value is None else index.setdefault(value, len(index)) for value in values]
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=pa.int32()),
+            pa.array(list(index), type=pa.string()),
+        )
+
+    def write(self, rows: list[tuple]):
+        arrays = []
+        for position, (name, kind) in enumerate(self.columns):
+            values = [row[position] for row in rows]
+            if kind == "name":
+                arrays.append(self._dictionary_array(name, values))
+            elif kind == "date":
+                arrays.append(pa.array(values, type=pa.string()).cast(pa.date32()))
+            else:
+                arrays.append(pa.array(values, type=_arrow_type(kind)))
+        self._writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self.rows += len(rows)
+
+    def close(self):
+        self._writer.close()
+
+
+def export_domain(domain: str, out_dir: Path, file_format: str = "parquet", batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """Write one domain's history; returns rows written per partition."""
+    _require_pyarrow()
+    connect, query, columns = COLUMNAR_DOMAINS[domain]
+    schema = pa.schema([(name, _arrow_type(kind)) for name, kind in columns])
+    domain_dir = Path(out_dir) / domain
+    for stale in domain_dir.glob(f"year=*/part-*{FORMATS[file_format]}"):
+        stale.unlink()
+
+    partitions = {}
+    writer = None
+    year = None
+    with connect() as conn:
+        cur = conn.cursor()
+        cur.execute(query)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            # Split the batch at year boundaries; rows arrive in date order
+            start = 0
+            while start < len(rows):
+                row_year = rows[start][0][:4]
+                end = start
+                while end < len(rows) and rows[end][0][:4] == row_year:
+                    end += 1
+                if row_year != year:
+                    if writer is not None:
+                        writer.close()
+                        partitions[year] = writer.rows
+                    year = row_year
+                    path = domain_dir / f"year={year}" / f"part-000{FORMATS[file_format]}"
+                    writer = _PartitionWriter(path, schema, columns, file_format)
+                writer.write(rows[start:end])
+                start = end
+    if writer is not None:
+        writer.close()
+        partitions[year] = writer.rows
+
+    print(f"✅ Exported {domain} history ({sum(partitions.values())} rows) to {domain_dir}")
+    return partitions
+
+
+def export_columnar(out_dir: Path, file_format: str = "parquet", batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format '{file_format}'. Use one of: {', '.join(FORMATS)}")
+    return {domain: export_domain(domain, out_dir, file_format, batch_size) for domain in COLUMNAR_DOMAINS}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the versioned history as partitioned Parquet/Arrow files.")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+    export_columnar(args.out_dir, args.format, args.batch_size)
@@ -0,0 +1,236 @@
+# exporters/neo4j_bulk_export.py
+"""
+Export every version in the DBs as one set of `neo4j-admin database import`
+files, so a full graph rebuild is a single bulk import instead of a
+LOAD CSV run per gazette.
+
+Each relationship is an interval: it starts at the first version that
+contains it and ends at the first version that no longer does (end columns
+empty while it is current). Node ids are derived from label and name, and
+relationship ids from their endpoints and start version, so re-exporting
+the same data gives the same ids. AS_DEPARTMENT intervals follow the
+department history index: one per stay of a department under a ministry,
+with `position` set to where it was listed when the stay began.
+
+Output (`<out_dir>/`):
+    nodes_<Label>.header.csv         + nodes_<Label>.part-NNN.csv[.gz]
+    rels_<TYPE>.header.csv           + rels_<TYPE>.part-NNN.csv[.gz]
+    import_command.txt               the matching neo4j-admin command
+
+Run with:
+    python -m gztprocessor.exporters.neo4j_bulk_export output/neo4j --gzip --shard-rows 500000
+"""
+import argparse
+import csv
+import gzip
+import hashlib
+from pathlib import Path
+
+from gztprocessor.db_connections.db_gov import get_connection as get_gov_connection
+from gztprocessor.db_connections.db_person import get_connection as get_person_connection
+from gztprocessor.database_handlers.history_database_handler import (
+    DEPARTMENT_HISTORY,
+    PORTFOLIO_HISTORY,
+    collect_intervals,
+)
+
+GOVERNMENT = "Government of Sri Lanka"
+DEFAULT_SHARD_ROWS = 1_000_000
+
+MINISTRY_QUERY = """
+    SELECT gazette_number, date, name
+    FROM ministry
+    ORDER BY date, gazette_number, id
+"""
+
+NODE_HEADER = ["id:ID", "name"]
+REL_HEADER = [
+    "id", ":START_ID", ":END_ID",
+    "start_gazette_number", "start_date", "end_gazette_number", "end_date",
+    "position",
+]
+
+
+def node_id(label: str, name: str) -> str:
+    return hashlib.sha1(f"{label}\x1f{name}".encode("utf-8")).hexdigest()[:20]
+
+
+def rel_id(rel_type: str, start: str, end: str, start_gazette: str, start_date: str) -> str:
+    key = "\x1f".join([rel_type, start, end, start_gazette, start_date])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+
+class _ShardedCsv:
+    """Rows for one node label or relationship type, split across part files."""
+
+    def __init__(self, out_dir: Path, stem: str, header: list[str], shard_rows: int, compress: bool):
+        self.out_dir = out_dir
+        self.stem = stem
+        self.shard_rows = shard_rows
+        self.compress = compress
+        self.rows = 0
+        self.parts = []
+        self._file = None
+        self._writer = None
+
+        self.header_path = out_dir / f"{stem}.header.csv"
+        with open(self.header_path, "w", newline='', encoding="utf-8") as f:
+            csv.writer(f).writerow(header)
+
+    def _open_part(self):
+        self.close()
+        suffix = ".csv.gz" if self.compress else ".csv"
+        path = self.out_dir / f"{self.stem}.part-{len(self.parts):03d}{suffix}"
+        if self.compress:
+            raw = gzip.GzipFile(path.name, mode="wb", fileobj=open(path, "wb"), mtime=0)
+            self._file = _GzipText(raw)
+        else:
+            self._file = open(path, "w", newline='', encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self.parts.append(path)
+
+    def writerow(self, row: list):
+        if self._writer is None or self.rows % self.shard_rows == 0:
+            self._open_part()
+        self._writer.writerow(row)
+        self.rows += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def files_arg(self) -> str:
+        return ",".join(str(path) for path in [self.header_path, *self.parts])
+
+
+class _GzipText:
+    def __init__(self, raw: gzip.GzipFile):
+        self._raw = raw
+
+    def write(self, text: str):
+        self._raw.write(text.encode("utf-8"))
+
+    def close(self):
+        fileobj = self._raw.fileobj
+        self._raw.close()
+        fileobj.close()
+
+
+class Neo4jBulkExporter:
+    def __init__(self, out_dir: Path, shard_rows: int = DEFAULT_SHARD_ROWS, compress: bool = False):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        for stale in list(self.out_dir.glob("nodes_*")) + list(self.out_dir.glob("rels_*")):
+            stale.unlink()
+        self.shard_rows = shard_rows
+        self.compress = compress
+        self.nodes = {}  # label -> {name: id}
+        self.relationships = {}  # type -> _ShardedCsv
+
+    def node(self, label: str, name: str) -> str:
+        names = self.nodes.setdefault(label, {})
+        if name not in names:
+            names[name] = node_id(label, name)
+        return names[name]
+
+    def relationship(self, rel_type: str, start: str, end: str, interval: list, position=None):
+        sink = self.relationships.get(rel_type)
+        if sink is None:
+            sink = self.relationships[rel_type] = _ShardedCsv(
+                self.out_dir, f"rels_{rel_type}", REL_HEADER, self.shard_rows, self.compress
+            )
+        start_gazette, start_date, end_gazette, end_date = interval
+        sink.writerow([
+            rel_id(rel_type, start, end, start_gazette, start_date), start, end,
+            start_gazette, start_date, end_gazette or "", end_date or "",
+            "" if position is None else position,
+        ])
+
+    def export_mindep(self):
+        government = self.node("Government", GOVERNMENT)
+        with get_gov_connection() as conn:
+            cur = conn.cursor()
+
+            cur.execute(MINISTRY_QUERY)
+            intervals, _ = collect_intervals(cur.fetchall(), 1)
+            for ministry, *interval in intervals:
+                self.relationship("AS_MINISTER", government, self.node("Minister", ministry), interval)
+
+            cur.execute(DEPARTMENT_HISTORY["rebuild_query"])
+            # Folded on (department, ministry) only; position shifts don't split a stay
+            intervals, _ = collect_intervals(cur.fetchall(), len(DEPARTMENT_HISTORY["key_columns"]))
+            for department, ministry, position, *interval in intervals:
+                self.relationship(
+                    "AS_DEPARTMENT",
+                    self.node("Minister", ministry),
+                    self.node("Department", department),
+                    interval,
+                    position,
+                )
+
+    def export_person(self):
+        with get_person_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(PORTFOLIO_HISTORY["rebuild_query"])
+            intervals, _ = collect_intervals(cur.fetchall(), len(PORTFOLIO_HISTORY["key_columns"]))
+            for person, portfolio, position, *interval in intervals:
+                self.relationship(
+                    "AS_APPOINTED",
+                    self.node("Minister", portfolio),
+                    self.node("Person", person),
+                    interval,
+                    position,
+                )
+
+    def write_nodes(self) -> dict:
+        node_files = {}
+        for label, names in sorted(self.nodes.items()):
+            sink = _ShardedCsv(self.out_dir, f"nodes_{label}", NODE_HEADER, self.shard_rows, self.compress)
+            for name, id_ in sorted(names.items(), key=lambda item: item[1]):
+                sink.writerow([id_, name])
+            sink.close()
+            node_files[label] = sink
+        return node_files
+
+    def import_command(self, node_files: dict, database: str = "neo4j") -> str:
+        args = ["neo4j-admin database import full"]
+        args += [f"--nodes={label}={sink.files_arg()}" for label, sink in node_files.items()]
+        args += [f"--relationships={rel_type}={sink.files_arg()}" for rel_type, sink in sorted(self.relationships.items())]
+        args.append(database)
+        return " \\\n  ".join(args)
+
+    def run(self, database: str = "neo4j") -> dict:
+        self.export_mindep()
+        self.export_person()
+        for sink in self.relationships.values():
+            sink.close()
+        node_files = self.write_nodes()
+
+        command = self.import_command(node_files, database)
+        (self.out_dir / "import_command.txt").write_text(command + "\n", encoding="utf-8")
+
+        summary = {
+            "out_dir": str(self.out_dir),
+            "nodes": {label: sink.rows for label, sink in node_files.items()},
+            "relationships": {rel_type: sink.rows for rel_type, sink in sorted(self.relationships.items())},
+            "command": command,
+        }
+        print(f"✅ Neo4j import files written to {self.out_dir}")
+        return summary
+
+
+def export_neo4j_bulk(out_dir: Path, shard_rows: int = DEFAULT_SHARD_ROWS, compress: bool = False, database: str = "neo4j") -> dict:
+    return Neo4jBulkExporter(out_dir, shard_rows, compress).run(database)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export all versions as neo4j-admin import files.")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--shard-rows", type=int, default=DEFAULT_SHARD_ROWS)
+    parser.add_argument("--gzip", action="store_true", help="write .csv.gz parts")
+    parser.add_argument("--database", default="neo4j")
+    args = parser.parse_args()
+    summary = export_neo4j_bulk(args.out_dir, args.shard_rows, args.gzip, args.database)
+    print(summary["command"])
@@ -0,0 +1,219 @@
+# gazette_processors/department_matcher.py
+"""
+Pairs departments omitted from one ministry with departments inserted under
+another, so an amendment gazette's OMIT/ADD lines can be read as MOVEs.
+
+Matching runs in three stages over whatever is still unpaired:
+    1. exact    - normalized names are equal
+    2. alias    - both names resolve to the same department entity
+    3. fuzzy    - candidates from a token/trigram blocking index are scored
+                  with rapidfuzz, and the best overall pairing is chosen by
+                  optimal assignment within each connected group of candidates
+
+Blocking keeps the fuzzy stage close to linear: each inserted name is only
+scored against the omitted names it shares discriminating tokens or trigrams
+with, and the assignment runs on the (small) groups those candidates form.
+A pathological group larger than MAX_GROUP_SIZE is paired greedily by score.
+"""
+import re
+from collections import defaultdict
+
+from rapidfuzz import fuzz
+
+from gztprocessor.metrics import timed
+
+MATCH_THRESHOLD = 85  # minimum fuzzy score (0-100) for a MOVE
+MAX_CANDIDATES = 10   # omitted names scored per inserted name
+MAX_POSTINGS = 100    # keys shared by more names than this don't discriminate
+MAX_GROUP_SIZE = 200  # larger candidate groups are paired greedily instead
+STOPWORDS = {"of", "and", "the", "for", "in", "on"}
+
+
+def normalize_department_name(name: str) -> str:
+    """Lowercase, spell out '&' and drop punctuation and extra whitespace."""
+    name = name.lower().replace("&", " and ")
+    return " ".join(re.findall(r"\w+", name))
+
+
+def _blocking_keys(normalized: str) -> set[str]:
+    keys = set()
+    for token in normalized.split():
+        if token in STOPWORDS:
+            continue
+        keys.add(f"w:{token}")
+        padded = f" {token} "
+        keys.update(f"t:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return keys
+
+
+class BlockingIndex:
+    """Inverted index from word tokens and character trigrams to names."""
+
+    def __init__(self, normalized_names: list[str]):
+        self._postings = defaultdict(list)
+        for index, name in enumerate(normalized_names):
+            for key in _blocking_keys(name):
+                self._postings[key].append(index)
+
+    def candidates(self, normalized: str, limit: int = MAX_CANDIDATES) -> list[int]:
+        """Indexes of the names sharing the most keys with `normalized`."""
+        shared = defaultdict(int)
+        for key in _blocking_keys(normalized):
+            postings = self._postings.get(key, ())
+            if len(postings) > MAX_POSTINGS:
+                continue
+            for index in postings:
+                shared[index] += 1
+        return sorted(shared, key=lambda index: (-shared[index], index))[:limit]
+
+
+def optimal_assignment(scores: list[list[float]]) -> list[tuple[int, int]]:
+    """
+    Hungarian algorithm: (row, column) pairs maximising the total score of a
+    rectangular score matrix, one pair per row or column (whichever is fewer).
+    """
+    if not scores or not scores[0]:
+        return []
+    transposed = len(scores) > len(scores[0])
+    if transposed:
+        scores = [list(column) for column in zip(*scores)]
+
+    n, m = len(scores), len(scores[0])
+    top = max(max(row) for row in scores)
+    cost = [[top - value for value in row] for row in scores]
+
+    # 1-based potentials and column -> row assignment
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    match = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for row in range(1, n + 1):
+        match[0] = row
+        column = 0
+        min_slack = [float("inf")] * (m + 1)
+        used = [False] * (m + 1)
+        while match[column]:
+            used[column] = True
+            current_row = match[column]
+            delta = float("inf")
+            next_column = 0
+            for j in range(1, m + 1):
+                if used[j]:
+                    continue
+                slack = cost[current_row - 1][j - 1] - u[current_row] - v[j]
+                if slack < min_slack[j]:
+                    min_slack[j] = slack
+                    way[j] = column
+                if min_slack[j] < delta:
+                    delta = min_slack[j]
+                    next_column = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_slack[j] -= delta
+            column = next_column
+        while column:
+            previous = way[column]
+            match[column] = match[previous]
+            column = previous
+
+    pairs = [(match[j] - 1, j - 1) for j in range(1, m + 1) if match[j]]
+    if transposed:
+        pairs = [(column, row) for row, column in pairs]
+    return sorted(pairs)
+
+
+def _connected_groups(edges: dict[tuple[int, int], float]) -> list[tuple[list[int], list[int]]]:
+    """Split a bipartite candidate graph into (omitted, inserted) index groups."""
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for omitted, inserted in edges:
+        parent[find(("o", omitted))] = find(("i", inserted))
+
+    groups = defaultdict(lambda: ([], []))
+    for node in list(parent):
+        side, index = node
+        groups[find(node)][0 if side == "o" else 1].append(index)
+    return [(sorted(omitted), sorted(inserted)) for omitted, inserted in groups.values()]
+
+
+@timed("mindep.match_departments")
+def match_departments(omitted: list[str], inserted: list[str], resolve_alias=None) -> list[dict]:
+    """
+    Pair omitted department names with inserted ones.
+
+    `resolve_alias`, if given, maps a name to its department entity id (or
+    None); two names with the same id are paired even if they look nothing
+    alike. Returns one dict per pair with the indexes into both lists, a
+    0-100 `confidence` and how it was matched (`exact`, `alias`, `fuzzy`).
+    """
+    normalized_omitted = [normalize_department_name(name) for name in omitted]
+    normalized_inserted = [normalize_department_name(name) for name in inserted]
+    open_omitted = set(range(len(omitted)))
+    open_inserted = set(range(len(inserted)))
+    matches = []
+
+    def pair(o, i, confidence, kind):
+        open_omitted.discard(o)
+        open_inserted.discard(i)
+        matches.append({"omitted": o, "inserted": i, "confidence": round(confidence, 1), "match": kind})
+
+    # 1. Exact normalized names
+    by_name = defaultdict(list)
+    for o in sorted(open_omitted):
+        by_name[normalized_omitted[o]].append(o)
+    for i in sorted(open_inserted):
+        if by_name.get(normalized_inserted[i]):
+            pair(by_name[normalized_inserted[i]].pop(0), i, 100.0, "exact")
+
+    # 2. Known aliases of the same entity
+    if resolve_alias is not None and open_omitted and open_inserted:
+        by_entity = defaultdict(list)
+        for o in sorted(open_omitted):
+            entity_id = resolve_alias(omitted[o])
+            if entity_id is not None:
+                by_entity[entity_id].append(o)
+        for i in sorted(open_inserted):
+            entity_id = resolve_alias(inserted[i])
+            if entity_id is not None and by_entity.get(entity_id):
+                pair(by_entity[entity_id].pop(0), i, 100.0, "alias")
+
+    # 3. Fuzzy candidates from the blocking index, assigned per connected group
+    if open_omitted and open_inserted:
+        remaining = sorted(open_omitted)
+        index = BlockingIndex([normalized_omitted[o] for o in remaining])
+        edges = {}
+        for i in sorted(open_inserted):
+            for candidate in index.candidates(normalized_inserted[i]):
+                o = remaining[candidate]
+                score = fuzz.token_sort_ratio(normalized_omitted[o], normalized_inserted[i])
+                if score >= MATCH_THRESHOLD:
+                    edges[(o, i)] = score
+
+        for group_omitted, group_inserted in _connected_groups(edges):
+            if len(group_omitted) + len(group_inserted) > MAX_GROUP_SIZE:
+                members = set(group_omitted)
+                group_edges = sorted(
+                    ((score, o, i) for (o, i), score in edges.items() if o in members),
+                    key=lambda edge: (-edge[0], edge[1], edge[2]),
+                )
+                for score, o, i in group_edges:
+                    if o in open_omitted and i in open_inserted:
+                        pair(o, i, score, "fuzzy")
+                continue
+            scores = [[edges.get((o, i), 0.0) for i in group_inserted] for o in group_omitted]
+            for row, column in optimal_assignment(scores):
+                o, i = group_omitted[row], group_inserted[column]
+                if (o, i) in edges:
+                    pair(o, i, edges[(o, i)], "fuzzy")
+
+    return sorted(matches, key=lambda m: m["inserted"])
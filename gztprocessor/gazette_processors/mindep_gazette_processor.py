@@ -4,11 +4,15 @@ from collections import defaultdict
 from gztprocessor.db_connections.db_gov import get_connection
 from gztprocessor.state_managers.mindep_state_manager import MindepStateManager
 import gztprocessor.database_handlers.transaction_database_handler as trans_database
+from gztprocessor.database_handlers.entity_database_handler import EntityDictionary
+from gztprocessor.gazette_processors.department_matcher import match_departments
+from gztprocessor.metrics import timed
 
 mindep_state_manager = MindepStateManager()
 
 # TODO: resolve issue https://github.com/LDFLK/gztprocessor/issues/4
 # Currently the processor identifies a department that wasn't in previous gov's latest state as a new department assuming that all departments are always assigned to some portfolio at any given moment.
+@timed("mindep.previous_ministry_lookup")
 def get_ministry_where_department_was_before(department_name: str, gazette_number: str, date_str: str
 ) -> str:
     """
@@ -38,6 +42,7 @@ def get_ministry_where_department_was_before(department_name: str, gazette_numbe
         print(f"❗ Error fetching previous ministry for {department_name}: {e}")
         return None
 
+@timed("mindep.extract_initial_gazette_data")
 def extract_initial_gazette_data(gazette_number: str, date_str: str, data: dict) -> dict:
     ministries = data.get("ministers", [])
     if not ministries:
@@ -64,6 +69,7 @@ def extract_initial_gazette_data(gazette_number: str, date_str: str, data: dict)
 
 # TODO: Resolve this issue for renames: https://github.com/zaeema-n/orgchart_nexoan/issues/11#issue-3238949430
 
+@timed("mindep.extract_column_II_changes")
 def extract_column_II_department_changes(data: dict) -> tuple[list[dict], list[dict]]:
     if "ADD" not in data or "OMIT" not in data:
         raise ValueError(
@@ -129,6 +135,7 @@ def extract_column_II_department_changes(data: dict) -> tuple[list[dict], list[d
     return added_departments, removed_departments_raw
 
 
+@timed("mindep.resolve_omitted_items")
 def resolve_omitted_items(removed_departments_raw: list[dict], gazette_number: str, date_str: str) -> list[dict]:
     resolved = []
     try:
@@ -180,51 +187,55 @@ def resolve_omitted_items(removed_departments_raw: list[dict], gazette_number: s
     return resolved
 
 
-def classify_department_changes(added: list[dict], removed: list[dict]) -> dict:
-    def normalize(name: str) -> str:
-        return name.strip().lower()
-
-    moves = []
-    adds_list = []
-    terminates = []
-    added_map = {}
-
+def classify_department_changes(added: list[dict], removed: list[dict], resolve_alias=None) -> dict:
+    """
+    Turn omitted/inserted departments into MOVE, ADD and TERMINATE transactions.
+    Omitted and inserted names are paired by department_matcher; each MOVE
+    carries the match `confidence` (0-100) and kind, plus `previous_department`
+    when the gazette spells the department differently from the last state.
+    """
+    added_entries = []
     for item in added:
         for dept_entry in item["departments"]:
-            raw_name = dept_entry["name"]
-            name = normalize(raw_name)
-            added_map[name] = {
-                "original_name": raw_name,
+            added_entries.append({
+                "original_name": dept_entry["name"],
                 "ministry": item["ministry_name"],
                 "position": dept_entry.get("position"),
-            }
-
-    removed_map = {}
-    for item in removed:
-        name = normalize(item["department"])
-        removed_map[name] = item["ministry"]
-
-    processed = set()
+            })
 
     print("\n Matching departments for MOVEs...")
-    for dept, from_min in removed_map.items():
-        if dept in added_map:
-            to_entry = added_map[dept]
-            moves.append(
-                {
-                    "type": "MOVE",
-                    "department": to_entry["original_name"],
-                    "from_ministry": from_min,
-                    "to_ministry": to_entry["ministry"],
-                    "position": to_entry["position"],
-                }
-            )
-            processed.add(dept)
-            print(f"- MOVE detected: {to_entry['original_name']} from {from_min} → {to_entry['ministry']}")
+    matches = match_departments(
+        [item["department"] for item in removed],
+        [entry["original_name"] for entry in added_entries],
+        resolve_alias=resolve_alias,
+    )
 
+    moves = []
+    matched_added = set()
+    matched_removed = set()
+    for match in matches:
+        to_entry = added_entries[match["inserted"]]
+        from_item = removed[match["omitted"]]
+        move = {
+            "type": "MOVE",
+            "department": to_entry["original_name"],
+            "from_ministry": from_item["ministry"],
+            "to_ministry": to_entry["ministry"],
+            "position": to_entry["position"],
+            "confidence": match["confidence"],
+            "match": match["match"],
+        }
+        if from_item["department"] != to_entry["original_name"]:
+            move["previous_department"] = from_item["department"]
+        moves.append(move)
+        matched_added.add(match["inserted"])
+        matched_removed.add(match["omitted"])
+        print(f"- MOVE detected ({match['match']}, {match['confidence']}): {to_entry['original_name']} from {from_item['ministry']} → {to_entry['ministry']}")
+
+    adds_list = []
     print("\n Remaining ADDs...")
-    for dept, to_entry in added_map.items():
-        if dept not in processed:
+    for index, to_entry in enumerate(added_entries):
+        if index not in matched_added:
             adds_list.append(
                 {
                     "type": "ADD",
@@ -235,17 +246,18 @@ def classify_department_changes(added: list[dict], removed: list[dict]) -> dict:
             )
             print(f"- ADD: {to_entry['original_name']} → {to_entry['ministry']}")
 
+    terminates = []
     print("\n Remaining TERMINATEs...")
-    for dept, from_min in removed_map.items():
-        if dept not in processed:
+    for index, item in enumerate(removed):
+        if index not in matched_removed:
             terminates.append(
                 {
                     "type": "TERMINATE",
-                    "department": dept.title(),
-                    "from_ministry": from_min,
+                    "department": item["department"],
+                    "from_ministry": item["ministry"],
                 }
             )
-            print(f"- TERMINATE: {dept.title()} from {from_min}")
+            print(f"- TERMINATE: {item['department']} from {item['ministry']}")
 
     return {
         "transactions": {
@@ -257,6 +269,7 @@ def classify_department_changes(added: list[dict], removed: list[dict]) -> dict:
 
 
 
+@timed("mindep.process_amendment_gazette")
 def process_amendment_gazette(gazette_number: str, date_str: str, data) -> list[dict]:
     try:
         added, removed_raw = extract_column_II_department_changes(data)
@@ -264,6 +277,15 @@ def process_amendment_gazette(gazette_number: str, date_str: str, data) -> list[
         return {"error": f"Amendment Gazette file for {gazette_number}, not found."}
     trans_database.create_record(gazette_number,"mindep","amendment", date_str)
     resolved_removed = resolve_omitted_items(removed_raw, gazette_number, date_str)
-    transactions = classify_department_changes(added, resolved_removed)
+    # A private dictionary keeps this read away from the writers' shared cache
+    # and the ids of their uncommitted transactions
+    entities = EntityDictionary("mindep")
+    with get_connection() as conn:
+        cur = conn.cursor()
+        transactions = classify_department_changes(
+            added,
+            resolved_removed,
+            resolve_alias=lambda name: entities.lookup(cur, "department", name),
+        )
 
     return transactions
@@ -4,6 +4,7 @@ from gztprocessor.db_connections.db_person import get_connection
 from nltk.stem import PorterStemmer
 from gztprocessor.state_managers.person_state_manager import PersonStateManager
 import gztprocessor.database_handlers.transaction_database_handler as trans_database
+from gztprocessor.metrics import timed
 
 stemmer = PorterStemmer()
 person_state_manager = PersonStateManager()
@@ -18,6 +19,7 @@ def clean_ministry_name(name: str) -> str:
     return " ".join(filtered)
 
 
+@timed("person.fuzzy_match_ministry")
 def get_fuzzy_matches_for_ministry(ministry_name: str, gazette_number: str, date_str: str, threshold=70) -> list[dict]:
     """
     Fuzzy match a given ministry name against current ministry-person assignments in DB.
@@ -68,6 +70,7 @@ def get_fuzzy_matches_for_ministry(ministry_name: str, gazette_number: str, date
     return sorted(matches, key=lambda x: x["score"], reverse=True)
 
 
+@timed("person.process_person_gazette")
 def process_person_gazette(gazette_number: str, date_str: str, data: dict) -> dict:
     adds = data.get("ADD", [])
     terminates = data.get("TERMINATE", [])
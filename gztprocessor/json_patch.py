@@ -0,0 +1,112 @@
+# json_patch.py
+"""
+JSON Patch (RFC 6902) for the transaction drafts: add, remove, replace,
+move, copy and test operations addressed by JSON Pointers (RFC 6901).
+"""
+import copy
+
+_MISSING = object()
+
+
+def _parse_pointer(pointer: str) -> list[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer '{pointer}'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise ValueError(f"Invalid array index '{token}'")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise ValueError(f"Array index {index} out of range")
+    return index
+
+
+def _resolve(doc, tokens: list[str]):
+    for token in tokens:
+        if isinstance(doc, list):
+            doc = doc[_index(doc, token, allow_end=False)]
+        elif isinstance(doc, dict) and token in doc:
+            doc = doc[token]
+        else:
+            raise ValueError(f"Path segment '{token}' not found")
+    return doc
+
+
+def _get(doc, pointer: str):
+    return _resolve(doc, _parse_pointer(pointer))
+
+
+def _add(doc, pointer: str, value):
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        return value
+    parent = _resolve(doc, tokens[:-1])
+    if isinstance(parent, list):
+        parent.insert(_index(parent, tokens[-1], allow_end=True), value)
+    elif isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    else:
+        raise ValueError(f"Can't add to a non-container at '{pointer}'")
+    return doc
+
+
+def _remove(doc, pointer: str):
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        raise ValueError("Can't remove the whole document")
+    parent = _resolve(doc, tokens[:-1])
+    if isinstance(parent, list):
+        del parent[_index(parent, tokens[-1], allow_end=False)]
+    elif isinstance(parent, dict) and tokens[-1] in parent:
+        del parent[tokens[-1]]
+    else:
+        raise ValueError(f"Nothing to remove at '{pointer}'")
+    return doc
+
+
+def apply_json_patch(doc, operations: list[dict]):
+    """
+    Apply `operations` to a copy of `doc` and return the result. Raises
+    ValueError (leaving `doc` untouched) if any operation doesn't apply.
+    """
+    if not isinstance(operations, list):
+        raise ValueError("A JSON patch must be a list of operations")
+    doc = copy.deepcopy(doc)
+    for operation in operations:
+        op = operation.get("op") if isinstance(operation, dict) else None
+        path = operation.get("path", _MISSING) if isinstance(operation, dict) else _MISSING
+        if not isinstance(path, str):
+            raise ValueError(f"Invalid patch operation {operation!r}")
+        value = operation.get("value", _MISSING)
+        if op in ("add", "replace", "test") and value is _MISSING:
+            raise ValueError(f"'{op}' at '{path}' needs a value")
+
+        if op == "add":
+            doc = _add(doc, path, copy.deepcopy(value))
+        elif op == "remove":
+            doc = _remove(doc, path)
+        elif op == "replace":
+            _get(doc, path)  # the target must exist
+            doc = _add(_remove(doc, path), path, copy.deepcopy(value)) if path else copy.deepcopy(value)
+        elif op in ("move", "copy"):
+            source = operation.get("from")
+            if not isinstance(source, str):
+                raise ValueError(f"'{op}' at '{path}' needs a 'from' pointer")
+            if op == "move" and (path + "/").startswith(source + "/") and path != source:
+                raise ValueError(f"Can't move '{source}' into its own child '{path}'")
+            moved = copy.deepcopy(_get(doc, source))
+            if op == "move":
+                doc = _remove(doc, source)
+            doc = _add(doc, path, moved)
+        elif op == "test":
+            if _get(doc, path) != value:
+                raise ValueError(f"Test failed at '{path}'")
+        else:
+            raise ValueError(f"Unknown patch operation '{op}'")
+    return doc
@@ -0,0 +1,194 @@
+# metrics.py
+"""
+In-process metrics in the Prometheus text format.
+
+`timed(stage)` times a block or a function into the stage histogram, the
+storage backends report every SQL statement through `count_query()`, and
+in-memory caches report lookups through `cache_lookup()`. Inside a request
+(see `request_scope()`) the statements are also counted for that request.
+
+Every worker process keeps its own figures, so with several uvicorn workers
+each scrape of /metrics sees one worker's share.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Configuration (override via environment variables)
+METRICS_ENABLED = os.environ.get("GZTP_METRICS", "1").lower() not in ("0", "false", "no")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, labels: tuple = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def series(self) -> list[tuple]:
+        with self._lock:
+            return list(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: tuple = (), buckets: tuple = SECONDS_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def count(self, labels: tuple = ()) -> int:
+        series = self._series.get(labels)
+        return series[-2] if series else 0
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        bounds = [f'le="{_number(bound)}"' for bound in self.buckets] + ['le="+Inf"']
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                for bound, count in zip(bounds, series):
+                    lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, bound)} {count}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(series[-1])}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {series[-2]}")
+        return lines
+
+
+stage_seconds = Histogram(
+    "gztp_stage_duration_seconds", "Time spent in one processing stage.", ("stage",)
+)
+request_seconds = Histogram(
+    "gztp_request_duration_seconds", "HTTP request time by route, including serialization.", ("method", "route")
+)
+request_queries = Histogram(
+    "gztp_request_db_queries", "SQL statements run while serving one HTTP request.", ("method", "route"), QUERY_BUCKETS
+)
+db_queries = Counter("gztp_db_queries_total", "SQL statements run, inside requests or not.")
+cache_lookups = Counter("gztp_cache_lookups_total", "In-memory cache lookups by cache and result.", ("cache", "result"))
+
+# Statement count of the request being served, if any
+_request_queries: ContextVar[list | None] = ContextVar("gztp_request_queries", default=None)
+
+
+@contextmanager
+def timed(stage: str):
+    """Record the time a block (`with timed(...)`) or function (`@timed(...)`) takes under `stage`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if METRICS_ENABLED:
+            stage_seconds.observe((stage,), time.perf_counter() - started)
+
+
+def count_query(*_):
+    """Count one SQL statement; doubles as a sqlite3 trace callback."""
+    if not METRICS_ENABLED:
+        return
+    db_queries.inc()
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def cache_lookup(cache: str, hit: bool):
+    if METRICS_ENABLED:
+        cache_lookups.inc((cache, "hit" if hit else "miss"))
+
+
+@contextmanager
+def request_scope():
+    """Count the statements run until the block ends; yields a one-item list holding the count."""
+    counter = [0]
+    token = _request_queries.set(counter)
+    try:
+        yield counter
+    finally:
+        _request_queries.reset(token)
+
+
+def observe_request(method: str, route: str, seconds: float, queries: int):
+    if METRICS_ENABLED:
+        request_seconds.observe((method, route), seconds)
+        request_queries.observe((method, route), queries)
+
+
+def _cache_hit_ratios() -> list[str]:
+    name = "gztp_cache_hit_ratio"
+    lines = [f"# HELP {name} Share of cache lookups that were hits since the worker started.", f"# TYPE {name} gauge"]
+    for cache in sorted({labels[0] for labels in cache_lookups.series()}):
+        hits = cache_lookups.get((cache, "hit"))
+        total = hits + cache_lookups.get((cache, "miss"))
+        lines.append(f'{name}{{cache="{_escape(cache)}"}} {_number(hits / total if total else 0.0)}')
+    return lines
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in (stage_seconds, request_seconds, request_queries, db_queries, cache_lookups):
+        lines.extend(metric.render())
+    lines.extend(_cache_hit_ratios())
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Forget every recorded value (for benchmarks and tests)."""
+    for metric in (stage_seconds, request_seconds, request_queries, db_queries, cache_lookups):
+        metric.clear()
@@ -5,16 +5,131 @@ DROP TABLE IF EXISTS ministry;
 CREATE TABLE ministry (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL,
+    entity_id INTEGER,
     gazette_number TEXT NOT NULL,
-    date TEXT NOT NULL
+    date TEXT NOT NULL,
+    FOREIGN KEY(entity_id) REFERENCES mindep_entity(id)
 );
 
 CREATE TABLE department (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL,
+    entity_id INTEGER,
     ministry_id INTEGER NOT NULL,
     position INTEGER NOT NULL,
     gazette_number TEXT NOT NULL,
     date TEXT NOT NULL,
-    FOREIGN KEY(ministry_id) REFERENCES ministry(id)
+    FOREIGN KEY(ministry_id) REFERENCES ministry(id),
+    FOREIGN KEY(entity_id) REFERENCES mindep_entity(id)
+);
+
+CREATE INDEX idx_ministry_entity ON ministry(entity_id, date, gazette_number);
+CREATE INDEX idx_department_entity ON department(entity_id, date, gazette_number);
+
+-- Entity dictionary: canonical ministry/department names interned to integer ids.
+-- Aliases map other spellings (or renamed names) to an existing entity.
+DROP TABLE IF EXISTS mindep_entity_alias;
+DROP TABLE IF EXISTS mindep_entity;
+
+CREATE TABLE mindep_entity (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity_type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE(entity_type, name)
+);
+
+CREATE TABLE mindep_entity_alias (
+    entity_type TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    -- Version that introduced the alias; rebuilding that version drops it
+    gazette_number TEXT,
+    date TEXT,
+    PRIMARY KEY (entity_type, alias),
+    FOREIGN KEY(entity_id) REFERENCES mindep_entity(id)
+);
+
+-- History index: one row per interval a department spent under a ministry.
+-- end_gazette_number/end_date are NULL while the interval is still open.
+DROP TABLE IF EXISTS department_history;
+DROP TABLE IF EXISTS department_history_version;
+
+CREATE TABLE department_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    department TEXT NOT NULL,
+    ministry TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    start_gazette_number TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_gazette_number TEXT,
+    end_date TEXT
 );
+
+CREATE INDEX idx_department_history_department
+    ON department_history(department COLLATE NOCASE, start_date, start_gazette_number);
+
+-- Last version folded into department_history
+CREATE TABLE department_history_version (
+    gazette_number TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+
+-- Search index: distinct ministry and department names, the versions they appear in,
+-- and two FTS5 indexes over the names (word/prefix and trigram for fuzzy matching).
+DROP TABLE IF EXISTS mindep_search_fts;
+DROP TABLE IF EXISTS mindep_search_trigram;
+DROP TABLE IF EXISTS mindep_search_version;
+DROP TABLE IF EXISTS mindep_search_entity;
+
+CREATE TABLE mindep_search_entity (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity_type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE(entity_type, name)
+);
+
+CREATE TABLE mindep_search_version (
+    entity_id INTEGER NOT NULL,
+    gazette_number TEXT NOT NULL,
+    date TEXT NOT NULL,
+    PRIMARY KEY (entity_id, date, gazette_number),
+    FOREIGN KEY(entity_id) REFERENCES mindep_search_entity(id)
+);
+
+CREATE INDEX idx_mindep_search_version_version ON mindep_search_version(gazette_number, date);
+
+CREATE VIRTUAL TABLE mindep_search_fts USING fts5(
+    name, content='mindep_search_entity', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+
+CREATE VIRTUAL TABLE mindep_search_trigram USING fts5(
+    name, content='mindep_search_entity', content_rowid='id',
+    tokenize='trigram'
+);
+
+-- Ledger of applied versions: the input each version was built from, with
+-- content hashes of that input and of the resulting state, so later
+-- versions can be replayed (and skipped when nothing changed) after an edit.
+DROP TABLE IF EXISTS mindep_applied_version;
+
+CREATE TABLE mindep_applied_version (
+    gazette_number TEXT NOT NULL,
+    date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    input TEXT NOT NULL CHECK(json_valid(input)),
+    input_hash TEXT NOT NULL,
+    state_hash TEXT NOT NULL,
+    applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (gazette_number, date)
+);
+
+-- Bumped by every committed write, so each API worker can tell when the
+-- data behind its in-memory caches was changed by another worker.
+DROP TABLE IF EXISTS mindep_generation;
+
+CREATE TABLE mindep_generation (
+    generation INTEGER NOT NULL
+);
+
+INSERT INTO mindep_generation (generation) VALUES (0);
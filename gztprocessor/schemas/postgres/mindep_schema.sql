@@ -0,0 +1,123 @@
+-- schema.sql (PostgreSQL)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+DROP TABLE IF EXISTS department CASCADE;
+DROP TABLE IF EXISTS ministry CASCADE;
+DROP TABLE IF EXISTS mindep_entity_alias CASCADE;
+DROP TABLE IF EXISTS mindep_entity CASCADE;
+
+-- Entity dictionary: canonical ministry/department names interned to integer ids.
+-- Aliases map other spellings (or renamed names) to an existing entity.
+CREATE TABLE mindep_entity (
+    id BIGSERIAL PRIMARY KEY,
+    entity_type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE(entity_type, name)
+);
+
+CREATE TABLE mindep_entity_alias (
+    entity_type TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    entity_id BIGINT NOT NULL REFERENCES mindep_entity(id),
+    -- Version that introduced the alias; rebuilding that version drops it
+    gazette_number TEXT,
+    date TEXT,
+    PRIMARY KEY (entity_type, alias)
+);
+
+CREATE TABLE ministry (
+    id BIGSERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    entity_id BIGINT REFERENCES mindep_entity(id),
+    gazette_number TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+
+CREATE TABLE department (
+    id BIGSERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    entity_id BIGINT REFERENCES mindep_entity(id),
+    ministry_id BIGINT NOT NULL REFERENCES ministry(id),
+    position INTEGER NOT NULL,
+    gazette_number TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+
+CREATE INDEX idx_ministry_version ON ministry(date, gazette_number);
+CREATE INDEX idx_department_ministry ON department(ministry_id);
+CREATE INDEX idx_ministry_entity ON ministry(entity_id, date, gazette_number);
+CREATE INDEX idx_department_entity ON department(entity_id, date, gazette_number);
+
+-- History index: one row per interval a department spent under a ministry.
+-- end_gazette_number/end_date are NULL while the interval is still open.
+DROP TABLE IF EXISTS department_history;
+DROP TABLE IF EXISTS department_history_version;
+
+CREATE TABLE department_history (
+    id BIGSERIAL PRIMARY KEY,
+    department TEXT NOT NULL,
+    ministry TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    start_gazette_number TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_gazette_number TEXT,
+    end_date TEXT
+);
+
+CREATE INDEX idx_department_history_department
+    ON department_history(lower(department), start_date, start_gazette_number);
+
+-- Last version folded into department_history
+CREATE TABLE department_history_version (
+    gazette_number TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+
+-- Search index: distinct ministry and department names and the versions they appear in.
+-- Expression indexes give word/prefix (full-text) and trigram (pg_trgm) matching.
+DROP TABLE IF EXISTS mindep_search_version;
+DROP TABLE IF EXISTS mindep_search_entity;
+
+CREATE TABLE mindep_search_entity (
+    id BIGSERIAL PRIMARY KEY,
+    entity_type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE(entity_type, name)
+);
+
+CREATE TABLE mindep_search_version (
+    entity_id BIGINT NOT NULL REFERENCES mindep_search_entity(id),
+    gazette_number TEXT NOT NULL,
+    date TEXT NOT NULL,
+    PRIMARY KEY (entity_id, date, gazette_number)
+);
+
+CREATE INDEX idx_mindep_search_version_version ON mindep_search_version(gazette_number, date);
+CREATE INDEX idx_mindep_search_fts ON mindep_search_entity USING GIN (to_tsvector('simple', name));
+CREATE INDEX idx_mindep_search_trigram ON mindep_search_entity USING GIN (name gin_trgm_ops);
+
+-- Ledger of applied versions: the input each version was built from, with
+-- content hashes of that input and of the resulting state, so later
+-- versions can be replayed (and skipped when nothing changed) after an edit.
+DROP TABLE IF EXISTS mindep_applied_version;
+
+CREATE TABLE mindep_applied_version (
+    gazette_number TEXT NOT NULL,
+    date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    input TEXT NOT NULL CHECK((input::jsonb) IS NOT NULL),
+    input_hash TEXT NOT NULL,
+    state_hash TEXT NOT NULL,
+    applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (gazette_number, date)
+);
+
+-- Bumped by every committed write, so each API worker can tell when the
+-- data behind its in-memory caches was changed by another worker.
+DROP TABLE IF EXISTS mindep_generation;
+
+CREATE TABLE mindep_generation (
+    generation BIGINT NOT NULL
+);
+
+INSERT INTO mindep_generation (generation) VALUES (0);
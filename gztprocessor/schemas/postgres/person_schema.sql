@@ -0,0 +1,124 @@
+-- schema.sql (PostgreSQL)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+DROP TABLE IF EXISTS portfolio CASCADE;
+DROP TABLE IF EXISTS person CASCADE;
+DROP TABLE IF EXISTS person_entity_alias CASCADE;
+DROP TABLE IF EXISTS person_entity CASCADE;
+
+-- Entity dictionary: canonical person/portfolio names interned to integer ids.
+-- Aliases map other spellings (or renamed portfolios) to an existing entity.
+CREATE TABLE person_entity (
+    id BIGSERIAL PRIMARY KEY,
+    entity_type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE(entity_type, name)
+);
+
+CREATE TABLE person_entity_alias (
+    entity_type TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    entity_id BIGINT NOT NULL REFERENCES person_entity(id),
+    -- Version that introduced the alias; rebuilding that version drops it
+    gazette_number TEXT,
+    date TEXT,
+    PRIMARY KEY (entity_type, alias)
+);
+
+CREATE TABLE person (
+    id BIGSERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    entity_id BIGINT REFERENCES person_entity(id),
+    gazette_number TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+
+CREATE TABLE portfolio (
+    id BIGSERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    entity_id BIGINT REFERENCES person_entity(id),
+    position TEXT NOT NULL,
+    person_id BIGINT REFERENCES person(id),
+    gazette_number TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+
+CREATE INDEX idx_person_version ON person(date, gazette_number);
+CREATE INDEX idx_portfolio_version ON portfolio(gazette_number, date);
+CREATE INDEX idx_portfolio_person ON portfolio(person_id);
+CREATE INDEX idx_person_entity ON person(entity_id, date, gazette_number);
+CREATE INDEX idx_portfolio_entity ON portfolio(entity_id, date, gazette_number);
+
+-- History index: one row per interval a person held a portfolio in a position.
+-- end_gazette_number/end_date are NULL while the interval is still open.
+DROP TABLE IF EXISTS portfolio_history;
+DROP TABLE IF EXISTS portfolio_history_version;
+
+CREATE TABLE portfolio_history (
+    id BIGSERIAL PRIMARY KEY,
+    person TEXT NOT NULL,
+    portfolio TEXT NOT NULL,
+    position TEXT NOT NULL,
+    start_gazette_number TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_gazette_number TEXT,
+    end_date TEXT
+);
+
+CREATE INDEX idx_portfolio_history_person
+    ON portfolio_history(lower(person), start_date, start_gazette_number);
+
+-- Last version folded into portfolio_history
+CREATE TABLE portfolio_history_version (
+    gazette_number TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+
+-- Search index: distinct person and portfolio names and the versions they appear in.
+-- Expression indexes give word/prefix (full-text) and trigram (pg_trgm) matching.
+DROP TABLE IF EXISTS person_search_version;
+DROP TABLE IF EXISTS person_search_entity;
+
+CREATE TABLE person_search_entity (
+    id BIGSERIAL PRIMARY KEY,
+    entity_type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE(entity_type, name)
+);
+
+CREATE TABLE person_search_version (
+    entity_id BIGINT NOT NULL REFERENCES person_search_entity(id),
+    gazette_number TEXT NOT NULL,
+    date TEXT NOT NULL,
+    PRIMARY KEY (entity_id, date, gazette_number)
+);
+
+CREATE INDEX idx_person_search_version_version ON person_search_version(gazette_number, date);
+CREATE INDEX idx_person_search_fts ON person_search_entity USING GIN (to_tsvector('simple', name));
+CREATE INDEX idx_person_search_trigram ON person_search_entity USING GIN (name gin_trgm_ops);
+
+-- Ledger of applied versions: the input each version was built from, with
+-- content hashes of that input and of the resulting state, so later
+-- versions can be replayed (and skipped when nothing changed) after an edit.
+DROP TABLE IF EXISTS person_applied_version;
+
+CREATE TABLE person_applied_version (
+    gazette_number TEXT NOT NULL,
+    date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    input TEXT NOT NULL CHECK((input::jsonb) IS NOT NULL),
+    input_hash TEXT NOT NULL,
+    state_hash TEXT NOT NULL,
+    applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (gazette_number, date)
+);
+
+-- Bumped by every committed write, so each API worker can tell when the
+-- data behind its in-memory caches was changed by another worker.
+DROP TABLE IF EXISTS person_generation;
+
+CREATE TABLE person_generation (
+    generation BIGINT NOT NULL
+);
+
+INSERT INTO person_generation (generation) VALUES (0);
@@ -7,7 +7,20 @@ CREATE TABLE transactions (
     gazette_number TEXT NOT NULL UNIQUE,
     gazette_date TEXT NOT NULL,
     warning INTEGER DEFAULT 0, 
+    -- Version of the draft saved in `transactions`; later edits are in transaction_draft_patch
+    draft_version INTEGER NOT NULL DEFAULT 0,
     transactions TEXT DEFAULT '[]' CHECK(json_valid(transactions))
 
 );
 
+-- Draft edits as JSON patches, appended since the draft in
+-- transactions.transactions was last saved whole (compacted).
+-- Patch `version` n turns draft version n-1 into n.
+DROP TABLE IF EXISTS transaction_draft_patch;
+
+CREATE TABLE transaction_draft_patch (
+    gazette_number TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    patch TEXT NOT NULL CHECK(json_valid(patch)),
+    PRIMARY KEY (gazette_number, version)
+);
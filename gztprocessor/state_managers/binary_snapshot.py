@@ -0,0 +1,209 @@
+# state_managers/binary_snapshot.py
+"""
+Compact binary snapshot format that can be read straight from an mmap.
+
+Layout (little-endian):
+    header    magic "GZTS", version u16, kind u16,
+              n_strings u32, n_parents u32, n_children u32, blob_size u32
+    offsets   (n_strings + 1) x u32   byte offsets of each string in the blob
+    parents   n_parents x (name u32, first_child u32, child_count u32)
+    children  n_children x (name u32, extra u32)
+    blob      UTF-8 bytes of every distinct string
+
+Parents are ministries (mindep) or persons (person); children are
+departments or portfolios. `extra` is the portfolio position for person
+snapshots and NO_STRING for mindep. Every name is an index into the string
+table, so repeated names are stored once.
+
+Convert existing JSON snapshots with:
+    python -m gztprocessor.state_managers.binary_snapshot state/mindep state/person
+"""
+import json
+import mmap
+import struct
+import sys
+from pathlib import Path
+
+from gztprocessor.state_managers.snapshot_writer import write_bytes_atomic
+
+MAGIC = b"GZTS"
+FORMAT_VERSION = 1
+NO_STRING = 0xFFFFFFFF
+
+KIND_MINDEP = 0
+KIND_PERSON = 1
+# kind -> (list key, parent name key, children key)
+KINDS = {
+    KIND_MINDEP: ("ministers", "name", "departments"),
+    KIND_PERSON: ("persons", "person_name", "portfolios"),
+}
+
+HEADER = struct.Struct("<4sHHIIII")
+OFFSET = struct.Struct("<I")
+PARENT = struct.Struct("<III")
+CHILD = struct.Struct("<II")
+
+
+def kind_for_state(state: dict) -> int:
+    for kind, (list_key, _, _) in KINDS.items():
+        if list_key in state:
+            return kind
+    raise ValueError("Unrecognised state: expected a 'ministers' or 'persons' list.")
+
+
+def encode_state(state: dict, kind: int | None = None) -> bytes:
+    if kind is None:
+        kind = kind_for_state(state)
+    list_key, name_key, children_key = KINDS[kind]
+
+    string_ids = {}
+    strings = []
+
+    def intern(value: str) -> int:
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value.encode("utf-8"))
+        return string_ids[value]
+
+    parents = bytearray()
+    children = bytearray()
+    n_children = 0
+    entries = state.get(list_key, [])
+    for entry in entries:
+        first_child = n_children
+        for child in entry.get(children_key, []):
+            if kind == KIND_PERSON:
+                children += CHILD.pack(intern(child["name"]), intern(child["position"]))
+            else:
+                children += CHILD.pack(intern(child), NO_STRING)
+            n_children += 1
+        parents += PARENT.pack(intern(entry[name_key]), first_child, n_children - first_child)
+
+    offsets = bytearray()
+    position = 0
+    for encoded in strings:
+        offsets += OFFSET.pack(position)
+        position += len(encoded)
+    offsets += OFFSET.pack(position)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, kind, len(strings), len(entries), n_children, position)
+    return b"".join([header, offsets, parents, children, *strings])
+
+
+def write_binary_snapshot(path: Path, state: dict, kind: int | None = None) -> Path:
+    write_bytes_atomic(path, encode_state(state, kind))
+    return path
+
+
+class BinarySnapshot:
+    """
+    Read-only view over a binary snapshot file.
+
+    The file is mapped with mmap and decoded lazily: opening a snapshot only
+    reads the header, and each name is decoded from the mapped bytes when it
+    is asked for.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, kind, n_strings, n_parents, n_children, blob_size = HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a binary state snapshot.")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported binary snapshot version {version} in {self.path}")
+
+        self.kind = kind
+        self.list_key, self.name_key, self.children_key = KINDS[kind]
+        self.n_strings = n_strings
+        self.n_parents = n_parents
+        self.n_children = n_children
+        self._offsets_at = HEADER.size
+        self._parents_at = self._offsets_at + (n_strings + 1) * OFFSET.size
+        self._children_at = self._parents_at + n_parents * PARENT.size
+        self._blob_at = self._children_at + n_children * CHILD.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_parents
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            self._mmap.close()
+
+    def string(self, index: int) -> str | None:
+        if index == NO_STRING:
+            return None
+        start, end = struct.unpack_from("<II", self._view, self._offsets_at + index * OFFSET.size)
+        return str(self._view[self._blob_at + start:self._blob_at + end], "utf-8")
+
+    def parent_name(self, index: int) -> str:
+        name, _, _ = PARENT.unpack_from(self._view, self._parents_at + index * PARENT.size)
+        return self.string(name)
+
+    def children(self, index: int) -> list:
+        _, first_child, count = PARENT.unpack_from(self._view, self._parents_at + index * PARENT.size)
+        result = []
+        for child in range(first_child, first_child + count):
+            name, extra = CHILD.unpack_from(self._view, self._children_at + child * CHILD.size)
+            if self.kind == KIND_PERSON:
+                result.append({"name": self.string(name), "position": self.string(extra)})
+            else:
+                result.append(self.string(name))
+        return result
+
+    def find(self, name: str) -> int | None:
+        """Index of the ministry/person called `name`, or None."""
+        for index in range(self.n_parents):
+            if self.parent_name(index) == name:
+                return index
+        return None
+
+    def entry(self, index: int) -> dict:
+        return {self.name_key: self.parent_name(index), self.children_key: self.children(index)}
+
+    def to_state(self, names: list[str] | None = None) -> dict:
+        wanted = set(names) if names is not None else None
+        entries = []
+        for index in range(self.n_parents):
+            if wanted is not None and self.parent_name(index) not in wanted:
+                continue
+            entries.append(self.entry(index))
+        return {self.list_key: entries}
+
+
+def convert_json_snapshot(json_path: Path, out_path: Path | None = None) -> Path:
+    json_path = Path(json_path)
+    if out_path is None:
+        out_path = json_path.with_suffix(".gzts")
+    with open(json_path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    return write_binary_snapshot(out_path, state)
+
+
+def convert_state_dir(state_dir: Path, out_dir: Path | None = None) -> list[Path]:
+    """Convert every state_*.json under `state_dir` (into `out_dir`, default state_dir/binary)."""
+    state_dir = Path(state_dir)
+    out_dir = Path(out_dir) if out_dir is not None else state_dir / "binary"
+    converted = []
+    for json_path in sorted(state_dir.glob("state_*.json")):
+        converted.append(convert_json_snapshot(json_path, out_dir / f"{json_path.stem}.gzts"))
+    return converted
+
+
+if __name__ == "__main__":
+    for directory in sys.argv[1:]:
+        paths = convert_state_dir(Path(directory))
+        print(f"✅ Converted {len(paths)} snapshots in {directory}")
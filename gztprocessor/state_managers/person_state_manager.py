@@ -1,15 +1,25 @@
 # state_managers/person_state_manager.py
 from gztprocessor.state_managers.state_manager import AbstractStateManager
 from gztprocessor.db_connections.db_person import get_connection
-from pathlib import Path
-import json
+from gztprocessor.state_managers.snapshot_writer import snapshot_writer
+from gztprocessor.state_managers.binary_snapshot import write_binary_snapshot
+from gztprocessor.database_handlers.search_database_handler import clear_search_index
+from gztprocessor.database_handlers.entity_database_handler import person_entity_dictionary
+from gztprocessor.database_handlers.ledger_database_handler import bump_generation, clear_ledger
+from gztprocessor.state_managers.state_diff import diff_person_states
+from gztprocessor.db_connections.db_config import STATE_DIR
+from gztprocessor.metrics import timed
+from gztprocessor.storage import storage
 
 
 class PersonStateManager(AbstractStateManager):
+    STATE_LIST_KEY = "persons"
+    STATE_NAME_KEY = "person_name"
+    VERSION_TABLE = "person"
+    TABLE_PREFIX = "person"
+
     def __init__(self):
-        project_root = Path(__file__).resolve().parent.parent.parent
-        state_dir = project_root / "state" / "person"
-        super().__init__(state_dir)
+        super().__init__(STATE_DIR / "person")
 
     def get_connection(self):
         return get_connection()
@@ -23,6 +33,7 @@ class PersonStateManager(AbstractStateManager):
             raise FileNotFoundError("No state found in person DB.")
         return row
 
+    @timed("person.get_latest_state_info")
     def get_latest_state_info(self, cur, gazette_number, date_str):
         cur.execute(
             """
@@ -44,6 +55,7 @@ class PersonStateManager(AbstractStateManager):
         )
         return [row[0] for row in cur.fetchall()]
 
+    @timed("person.get_state_from_db")
     def _get_state_from_db(self, cur, gazette_number: str, date_str: str) -> dict:
         snapshot = {"persons": []}
         cur.execute(
@@ -83,20 +95,40 @@ class PersonStateManager(AbstractStateManager):
             return [{"gazette_number": row[0], "date": row[1]} for row in rows]
 
 
-    def export_state_snapshot(self, gazette_number: str, date_str: str):
-      state = self._get_state_from_db(
-        self.get_connection().cursor(), gazette_number, date_str
-    )
-      state_path = self.get_state_file_path(gazette_number, date_str)
-      with open(state_path, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2, ensure_ascii=False)
-      print(f"✅ Person snapshot exported to {state_path}")
- 
+    def export_state_snapshot(self, gazette_number: str, date_str: str, state: dict | None = None, generation: int | None = None):
+        """
+        Queue the snapshot for the background writer.
+        Pass the in-memory `state` that was just written to skip re-reading it
+        from the DB, with the write `generation` it was committed at.
+        """
+        if state is None:
+            with self.get_connection() as conn:
+                state = self._get_state_from_db(conn.cursor(), gazette_number, date_str)
+
+        @timed("person.snapshot_write")
+        def write():
+            current = self.current_state(gazette_number, date_str, state, generation)
+            if current is None:
+                return
+            manifest_path = self.snapshot_store.save(gazette_number, date_str, current)
+            write_binary_snapshot(self.get_binary_snapshot_path(gazette_number, date_str), current)
+            print(f"✅ Person snapshot exported to {manifest_path}")
+
+        snapshot_writer.submit(self.snapshot_key(gazette_number, date_str), write)
+
+    def diff_states(self, old_state: dict, new_state: dict) -> dict:
+        return diff_person_states(old_state, new_state)
 
     def clear_db(self):
-      with get_connection() as conn:
+      with get_connection() as conn, storage.write_lock(conn, "person"):
         cur = conn.cursor()
         cur.execute("DELETE FROM portfolio")
         cur.execute("DELETE FROM person")
+        cur.execute("DELETE FROM portfolio_history")
+        cur.execute("DELETE FROM portfolio_history_version")
+        clear_search_index(cur, "person")
+        person_entity_dictionary.clear(cur)
+        clear_ledger(cur, "person")
+        bump_generation(cur, "person")
         conn.commit()
       print("🧹 Person and portfolio tables cleared.")
@@ -0,0 +1,145 @@
+# state_managers/snapshot_store.py
+import gzip
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+from gztprocessor.state_managers.snapshot_writer import write_bytes_atomic
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        if zstandard is None:
+            raise ValueError("Snapshot chunk is zstd-compressed but zstandard is not installed.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class SnapshotStore:
+    """
+    Content-addressed, compressed store for state snapshots.
+
+    A state is split into one chunk per entry of its top-level list (a ministry
+    for mindep, a person for person). Chunks are named by the sha256 of their
+    canonical JSON, so an entry that did not change between versions is stored
+    once no matter how many versions reference it. Each version only writes a
+    small manifest listing its chunks in order.
+
+    Layout:
+        <root>/chunks/<hash[:2]>/<hash>.<gz|zst>
+        <root>/manifests/manifest_<gazette_number>_<date>.json
+    """
+
+    def __init__(self, root: Path, list_key: str, name_key: str):
+        self.root = root
+        self.list_key = list_key
+        self.name_key = name_key
+        self.codec = "zst" if zstandard is not None else "gz"
+        self.chunk_dir = root / "chunks"
+        self.manifest_dir = root / "manifests"
+
+    def get_manifest_path(self, gazette_number: str, date_str: str) -> Path:
+        return self.manifest_dir / f"manifest_{gazette_number}_{date_str}.json"
+
+    def _chunk_path(self, chunk_hash: str, codec: str) -> Path:
+        return self.chunk_dir / chunk_hash[:2] / f"{chunk_hash}.{codec}"
+
+    def _write_chunk(self, entry: dict) -> tuple[str, bool]:
+        data = json.dumps(entry, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        chunk_hash = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(chunk_hash, self.codec)
+        if path.exists():
+            return chunk_hash, False
+        write_bytes_atomic(path, _compress(data, self.codec))
+        return chunk_hash, True
+
+    def _read_chunk(self, chunk_hash: str, codec: str) -> dict:
+        with open(self._chunk_path(chunk_hash, codec), "rb") as f:
+            return json.loads(_decompress(f.read(), codec))
+
+    def save(self, gazette_number: str, date_str: str, state: dict) -> Path:
+        chunks = []
+        new_chunks = 0
+        for entry in state.get(self.list_key, []):
+            chunk_hash, created = self._write_chunk(entry)
+            new_chunks += created
+            chunks.append({"name": entry.get(self.name_key), "hash": chunk_hash})
+
+        manifest = {
+            "gazette_number": gazette_number,
+            "date": date_str,
+            "codec": self.codec,
+            "chunks": chunks,
+        }
+        manifest_path = self.get_manifest_path(gazette_number, date_str)
+        write_bytes_atomic(manifest_path, json.dumps(manifest, ensure_ascii=False).encode("utf-8"))
+        print(f"📦 Stored {len(chunks)} chunks ({new_chunks} new) for {gazette_number} on {date_str}")
+        return manifest_path
+
+    def has(self, gazette_number: str, date_str: str) -> bool:
+        return self.get_manifest_path(gazette_number, date_str).exists()
+
+    def load_manifest(self, gazette_number: str, date_str: str) -> dict:
+        manifest_path = self.get_manifest_path(gazette_number, date_str)
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No stored snapshot for {gazette_number} on {date_str}")
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self, gazette_number: str, date_str: str, names: list[str] | None = None) -> dict:
+        """
+        Reassemble a stored state. When `names` is given only the chunks for
+        those ministries/persons are read.
+        """
+        manifest = self.load_manifest(gazette_number, date_str)
+        wanted = set(names) if names is not None else None
+        entries = [
+            self._read_chunk(chunk["hash"], manifest["codec"])
+            for chunk in manifest["chunks"]
+            if wanted is None or chunk["name"] in wanted
+        ]
+        return {self.list_key: entries}
+
+    def list_versions(self) -> list[tuple[str, str]]:
+        versions = []
+        for path in self.manifest_dir.glob("manifest_*.json"):
+            gazette_number, date_str = path.stem[len("manifest_"):].rsplit("_", 1)
+            versions.append((gazette_number, date_str))
+        return sorted(versions, key=lambda v: (v[1], v[0]))
+
+    def delete_version(self, gazette_number: str, date_str: str):
+        manifest_path = self.get_manifest_path(gazette_number, date_str)
+        if manifest_path.exists():
+            manifest_path.unlink()
+
+    def collect_garbage(self) -> int:
+        """Delete chunks no manifest references any more. Returns the number removed."""
+        referenced = set()
+        for path in self.manifest_dir.glob("manifest_*.json"):
+            with open(path, "r", encoding="utf-8") as f:
+                referenced.update(chunk["hash"] for chunk in json.load(f)["chunks"])
+
+        removed = 0
+        for path in self.chunk_dir.glob("*/*"):
+            if path.name.startswith("."):
+                continue  # in-flight temp file
+            if path.name.split(".", 1)[0] not in referenced:
+                path.unlink()
+                removed += 1
+        return removed
+
+    def clear(self):
+        if self.root.exists():
+            shutil.rmtree(self.root)
@@ -0,0 +1,82 @@
+# state_managers/snapshot_writer.py
+import atexit
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+
+def write_bytes_atomic(path: Path, data: bytes):
+    """
+    Write to a temp file in the same directory and rename it into place,
+    so readers never see a half-written file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates owner-only files
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class SnapshotWriter:
+    """
+    Background worker that runs snapshot writes off the request path.
+
+    Writes are keyed by version: submitting a write for a key that is still
+    queued replaces the queued one, so repeated POSTs for the same gazette
+    only hit the disk once.
+    """
+
+    def __init__(self):
+        self._pending = {}  # key -> write callable, in submission order
+        self._cond = threading.Condition()
+        self._in_progress = 0
+        self._current_key = None
+        self._thread = None
+
+    def submit(self, key, write):
+        with self._cond:
+            self._pending.pop(key, None)
+            self._pending[key] = write
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def is_pending(self, key) -> bool:
+        """True while a write for `key` is queued or running."""
+        with self._cond:
+            return key in self._pending or key == self._current_key
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every queued write has finished. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._in_progress, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                key = next(iter(self._pending))
+                write = self._pending.pop(key)
+                self._current_key = key
+                self._in_progress += 1
+            try:
+                write()
+            except Exception as e:
+                print(f"❗ Snapshot export failed for {key}: {e}")
+            finally:
+                with self._cond:
+                    self._current_key = None
+                    self._in_progress -= 1
+                    self._cond.notify_all()
+
+
+snapshot_writer = SnapshotWriter()
+atexit.register(snapshot_writer.flush)
@@ -0,0 +1,134 @@
+# state_managers/state_diff.py
+from collections import defaultdict
+
+
+def diff_mindep_states(old_state: dict, new_state: dict) -> dict:
+    """
+    Structural diff between two mindep states.
+
+    Department placements are compared as sets of (ministry, department)
+    pairs; a department that leaves one ministry and appears under another is
+    a MOVE, otherwise it is an ADD or TERMINATE. Output uses the same
+    transaction shapes as process_amendment_gazette.
+    """
+    def placements(state):
+        pairs = {}
+        for ministry in state.get("ministers", []):
+            for position, dept in enumerate(ministry["departments"], start=1):
+                pairs[(ministry["name"], dept)] = position
+        return pairs
+
+    old_pairs = placements(old_state)
+    new_pairs = placements(new_state)
+    removed = old_pairs.keys() - new_pairs.keys()
+    added = new_pairs.keys() - old_pairs.keys()
+
+    removed_by_dept = defaultdict(list)
+    for ministry, dept in sorted(removed):
+        removed_by_dept[dept].append(ministry)
+
+    moves = []
+    adds = []
+    for ministry, dept in sorted(added):
+        position = new_pairs[(ministry, dept)]
+        if removed_by_dept.get(dept):
+            from_ministry = removed_by_dept[dept].pop(0)
+            moves.append({
+                "type": "MOVE",
+                "department": dept,
+                "from_ministry": from_ministry,
+                "to_ministry": ministry,
+                "position": position,
+            })
+        else:
+            adds.append({
+                "type": "ADD",
+                "department": dept,
+                "to_ministry": ministry,
+                "position": position,
+            })
+
+    terminates = [
+        {"type": "TERMINATE", "department": dept, "from_ministry": ministry}
+        for dept, ministries in sorted(removed_by_dept.items())
+        for ministry in ministries
+    ]
+
+    old_ministries = {m["name"] for m in old_state.get("ministers", [])}
+    new_ministries = {m["name"] for m in new_state.get("ministers", [])}
+
+    return {
+        "ministries_added": sorted(new_ministries - old_ministries),
+        "ministries_removed": sorted(old_ministries - new_ministries),
+        "transactions": {
+            "moves": moves,
+            "adds": adds,
+            "terminates": terminates,
+        },
+    }
+
+
+def diff_person_states(old_state: dict, new_state: dict) -> dict:
+    """
+    Structural diff between two person states.
+
+    Appointments are compared as sets of (person, portfolio, position). A
+    person who loses one appointment and gains another is a MOVE; otherwise
+    the change is an ADD or TERMINATE. Output uses the same transaction
+    shapes as process_person_gazette.
+    """
+    def appointments(state):
+        return {
+            (person["person_name"], pf["name"], pf["position"])
+            for person in state.get("persons", [])
+            for pf in person["portfolios"]
+        }
+
+    old_appointments = appointments(old_state)
+    new_appointments = appointments(new_state)
+    removed = old_appointments - new_appointments
+    added = new_appointments - old_appointments
+
+    removed_by_person = defaultdict(list)
+    for name, ministry, position in sorted(removed):
+        removed_by_person[name].append((ministry, position))
+
+    moves = []
+    adds = []
+    for name, ministry, position in sorted(added):
+        if removed_by_person.get(name):
+            from_ministry, from_position = removed_by_person[name].pop(0)
+            moves.append({
+                "type": "MOVE",
+                "name": name,
+                "from_ministry": from_ministry,
+                "from_position": from_position,
+                "to_ministry": ministry,
+                "to_position": position,
+            })
+        else:
+            adds.append({
+                "type": "ADD",
+                "new_person": name,
+                "new_ministry": ministry,
+                "new_position": position,
+            })
+
+    terminates = [
+        {"type": "TERMINATE", "name": name, "ministry": ministry, "position": position}
+        for name, removed_items in sorted(removed_by_person.items())
+        for ministry, position in removed_items
+    ]
+
+    old_persons = {p["person_name"] for p in old_state.get("persons", [])}
+    new_persons = {p["person_name"] for p in new_state.get("persons", [])}
+
+    return {
+        "persons_added": sorted(new_persons - old_persons),
+        "persons_removed": sorted(old_persons - new_persons),
+        "transactions": {
+            "moves": moves,
+            "adds": adds,
+            "terminates": terminates,
+        },
+    }
@@ -1,9 +1,32 @@
 from abc import ABC, abstractmethod
+from bisect import bisect_right
 from pathlib import Path
+import json
+import shutil
+from gztprocessor.state_managers.snapshot_writer import snapshot_writer
+from gztprocessor.state_managers.snapshot_store import SnapshotStore
+from gztprocessor.state_managers.binary_snapshot import BinarySnapshot, write_binary_snapshot
+from gztprocessor.database_handlers.ledger_database_handler import get_generation
+from gztprocessor.metrics import cache_lookup, timed
+# (write generation, sorted (date, gazette_number) version index) per state
+# dir, shared by every manager instance so an apply through one instance
+# invalidates them all; the generation catches writes by other workers
+_version_timelines: dict[str, tuple[int, list[tuple[str, str]]]] = {}
+
+
 class AbstractStateManager(ABC):
+    # Top-level list in a state dict and the key naming each of its entries
+    STATE_LIST_KEY: str
+    STATE_NAME_KEY: str
+    # Table holding one row group per (gazette_number, date) version
+    VERSION_TABLE: str
+    # Prefix of the domain's entity, ledger and generation tables
+    TABLE_PREFIX: str
+
     def __init__(self, state_dir: Path):
         self.state_dir = state_dir
         self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_store = SnapshotStore(state_dir / "store", self.STATE_LIST_KEY, self.STATE_NAME_KEY)
 
     @abstractmethod
     def get_connection(self): ...
@@ -15,7 +38,7 @@ class AbstractStateManager(ABC):
     def get_gazette_numbers_for_date(self, cur, date_str: str) -> list[str]: ...
 
     @abstractmethod
-    def export_state_snapshot(self, gazette_number: str, date_str: str): ...
+    def export_state_snapshot(self, gazette_number: str, date_str: str, state: dict | None = None): ...
 
     @abstractmethod
     def get_latest_state_info(self) -> tuple[str, str]: ...
@@ -26,10 +49,84 @@ class AbstractStateManager(ABC):
     @abstractmethod
     def clear_db(self): ...
 
+    @abstractmethod
+    def diff_states(self, old_state: dict, new_state: dict) -> dict: ...
+
     def get_state_file_path(self, gazette_number: str, date_str: str) -> Path:
         filename = f"state_{gazette_number}_{date_str}.json"
         return self.state_dir / filename
 
+    def get_binary_snapshot_path(self, gazette_number: str, date_str: str) -> Path:
+        return self.state_dir / "binary" / f"state_{gazette_number}_{date_str}.gzts"
+
+    def discard_binary_snapshot(self, gazette_number: str, date_str: str):
+        # Called inside the write transaction that rewrites the version, before
+        # it commits: until the new snapshot lands, every worker reads the
+        # version from the DB instead
+        self.get_binary_snapshot_path(gazette_number, date_str).unlink(missing_ok=True)
+
+    def current_state(self, gazette_number: str, date_str: str, state: dict, generation: int | None) -> dict:
+        """
+        `state` if nothing has been written since `generation`, otherwise the
+        version as stored now, so a late snapshot write from one worker can't
+        overwrite a newer version from another. None if the version has been
+        deleted since.
+        """
+        if generation is None:
+            return state
+        with self.get_connection() as conn:
+            cur = conn.cursor()
+            if get_generation(cur, self.TABLE_PREFIX) == generation:
+                return state
+            if gazette_number not in self.get_gazette_numbers_for_date(cur, date_str):
+                return None
+            return self._get_state_from_db(cur, gazette_number, date_str)
+
+    def snapshot_key(self, gazette_number: str, date_str: str) -> tuple[str, str, str]:
+        # Identifies one version's snapshot write in the background writer queue
+        return (str(self.state_dir), gazette_number, date_str)
+
+    def load_snapshot(self, gazette_number: str, date_str: str, names: list[str] | None = None) -> dict:
+        """
+        Load a saved snapshot, reading only the chunks for `names` when given.
+        Falls back to a legacy state_*.json file.
+        """
+        if self.snapshot_store.has(gazette_number, date_str):
+            return self.snapshot_store.load(gazette_number, date_str, names)
+
+        state_path = self.get_state_file_path(gazette_number, date_str)
+        if not state_path.exists():
+            raise FileNotFoundError(f"No snapshot found for {gazette_number} on {date_str}")
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if names is not None:
+            wanted = set(names)
+            state[self.STATE_LIST_KEY] = [
+                entry for entry in state[self.STATE_LIST_KEY] if entry[self.STATE_NAME_KEY] in wanted
+            ]
+        return state
+
+    def open_binary_snapshot(self, gazette_number: str, date_str: str) -> BinarySnapshot:
+        """
+        Open the mmap-backed binary snapshot for a version, building it from the
+        stored snapshot first if it doesn't exist yet.
+        """
+        binary_path = self.get_binary_snapshot_path(gazette_number, date_str)
+        if not binary_path.exists():
+            write_binary_snapshot(binary_path, self.load_snapshot(gazette_number, date_str))
+        return BinarySnapshot(binary_path)
+
+    def import_json_snapshots(self) -> int:
+        """Move legacy state_*.json files into the snapshot store. Returns the number imported."""
+        imported = 0
+        for state_path in sorted(self.state_dir.glob("state_*.json")):
+            gazette_number, date_str = state_path.stem[len("state_"):].rsplit("_", 1)
+            with open(state_path, "r", encoding="utf-8") as f:
+                self.snapshot_store.save(gazette_number, date_str, json.load(f))
+            state_path.unlink()
+            imported += 1
+        return imported
+
     def get_latest_state(self) -> tuple[str, str, dict]:
         with self.get_connection() as conn:
             cur = conn.cursor()
@@ -49,14 +146,87 @@ class AbstractStateManager(ABC):
                 return {"gazette_number": gazette_number, "state": state}
             return gazettes
 
+    def get_version_timeline(self) -> list[tuple[str, str]]:
+        """
+        All versions as (date, gazette_number), oldest first. Cached in memory
+        until the domain's write generation moves.
+        """
+        key = str(self.state_dir)
+        with self.get_connection() as conn:
+            cur = conn.cursor()
+            generation = get_generation(cur, self.TABLE_PREFIX)
+            cached = _version_timelines.get(key)
+            fresh = cached is not None and cached[0] == generation
+            cache_lookup(f"{self.TABLE_PREFIX}_timeline", fresh)
+            if fresh:
+                return cached[1]
+            cur.execute(
+                f"SELECT date, gazette_number FROM {self.VERSION_TABLE} GROUP BY date, gazette_number ORDER BY date, gazette_number"
+            )
+            timeline = [tuple(row) for row in cur.fetchall()]
+        _version_timelines[key] = (generation, timeline)
+        return timeline
+
+    def invalidate_version_timeline(self):
+        _version_timelines.pop(str(self.state_dir), None)
+
+    def resolve_version_as_of(self, date_str: str) -> tuple[str, str] | None:
+        """
+        (gazette_number, date) of the state in effect on `date_str`: the last
+        version dated on or before it. None if it predates every version.
+        """
+        timeline = self.get_version_timeline()
+        # "\uffff" sorts after any gazette number, so versions dated date_str are included
+        index = bisect_right(timeline, (date_str, "\uffff")) - 1
+        if index < 0:
+            return None
+        version_date, gazette_number = timeline[index]
+        return gazette_number, version_date
+
+    def get_state_as_of(self, date_str: str) -> dict:
+        version = self.resolve_version_as_of(date_str)
+        if version is None:
+            raise FileNotFoundError(f"No state in effect on {date_str}")
+        gazette_number, version_date = version
+        return {
+            "gazette_number": gazette_number,
+            "date": version_date,
+            "state": self.load_state(gazette_number, version_date),
+        }
+
     def load_state(self, gazette_number: str, date_str: str) -> dict:
+        with timed(f"{self.TABLE_PREFIX}.load_state"):
+            # Serve from the binary snapshot unless a newer write for this version is still queued
+            binary_path = self.get_binary_snapshot_path(gazette_number, date_str)
+            usable = binary_path.exists() and not snapshot_writer.is_pending(self.snapshot_key(gazette_number, date_str))
+            cache_lookup(f"{self.TABLE_PREFIX}_binary_snapshots", usable)
+            if usable:
+                with BinarySnapshot(binary_path) as snapshot:
+                    return snapshot.to_state()
+
+            with self.get_connection() as conn:
+                cur = conn.cursor()
+                return self._get_state_from_db(cur, gazette_number, date_str)
+
+    def get_state_diff(self, from_gazette: str, from_date: str, to_gazette: str, to_date: str) -> dict:
         with self.get_connection() as conn:
             cur = conn.cursor()
-            return self._get_state_from_db(cur, gazette_number, date_str)
+            for gazette_number, date_str in ((from_gazette, from_date), (to_gazette, to_date)):
+                if gazette_number not in self.get_gazette_numbers_for_date(cur, date_str):
+                    raise FileNotFoundError(f"No state found for gazette {gazette_number} on {date_str}")
+            old_state = self._get_state_from_db(cur, from_gazette, from_date)
+            new_state = self._get_state_from_db(cur, to_gazette, to_date)
+        with timed(f"{self.TABLE_PREFIX}.diff_states"):
+            return self.diff_states(old_state, new_state)
 
     def clear_all_state_data(self):
+        # Let queued snapshot writes land first so they can't recreate files after the reset
+        snapshot_writer.flush()
         for f in self.state_dir.glob("state_*.json"):
             f.unlink()
+        self.snapshot_store.clear()
+        shutil.rmtree(self.state_dir / "binary", ignore_errors=True)
         self.clear_db()
+        self.invalidate_version_timeline()
 
     
\ No newline at end of file
@@ -0,0 +1,23 @@
+# storage/__init__.py
+from gztprocessor.db_connections.db_config import (
+    PG_DSN,
+    PG_POOL_SIZE,
+    PG_PREPARE_THRESHOLD,
+    STORAGE_BACKEND,
+)
+from gztprocessor.storage.base import StorageBackend
+from gztprocessor.storage.postgres_backend import PostgresBackend
+from gztprocessor.storage.sqlite_backend import SQLiteBackend
+
+
+def create_backend(name: str = STORAGE_BACKEND) -> StorageBackend:
+    if name == "sqlite":
+        return SQLiteBackend()
+    if name == "postgres":
+        return PostgresBackend(PG_DSN, PG_POOL_SIZE, PG_PREPARE_THRESHOLD)
+    raise ValueError(f"Unknown GZTP_STORAGE '{name}'. Use sqlite or postgres.")
+
+
+storage = create_backend()
+
+__all__ = ["StorageBackend", "SQLiteBackend", "PostgresBackend", "create_backend", "storage"]
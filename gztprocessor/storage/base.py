@@ -0,0 +1,74 @@
+# storage/base.py
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+
+class StorageBackend(ABC):
+    """
+    The database the handlers and state managers run against.
+
+    Handlers write portable SQL with `?` placeholders and go through the
+    backend only for what differs between databases: opening connections,
+    creating the schema, locking out concurrent writers, getting generated
+    ids back, bulk inserts,
+    case-insensitive matching and the name search index.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def connect(self, domain: str):
+        """
+        Connection for one domain's tables ("gov", "person" or "trans").
+        Use as a context manager; it offers cursor(), commit() and rollback().
+        """
+
+    @abstractmethod
+    def init_schema(self, domain: str, schema_path: Path):
+        """(Re)create a domain's tables from its schema file."""
+
+    @abstractmethod
+    def write_lock(self, conn, domain: str):
+        """
+        Context manager serializing writers to a domain across threads and
+        worker processes. Enter it right after opening `conn`, before the
+        first statement, and hold it until the transaction has committed.
+        Readers are never blocked.
+        """
+
+    @abstractmethod
+    def insert_returning_id(self, cur, sql: str, params) -> int | None:
+        """Run an INSERT and return the new row's id, or None if nothing was inserted."""
+
+    def copy_rows(self, cur, table: str, columns: list[str], rows):
+        """Bulk-insert rows into `table`."""
+        cur.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})",
+            rows,
+        )
+
+    @abstractmethod
+    def nocase_equals(self, column: str) -> str:
+        """SQL condition comparing `column` to a `?` parameter, ignoring case."""
+
+    # Name search index over {prefix}_search_entity
+
+    @abstractmethod
+    def search_index_add(self, cur, prefix: str, entity_id: int, name: str):
+        """Index a newly inserted search entity."""
+
+    @abstractmethod
+    def search_index_clear(self, cur, prefix: str):
+        """Drop everything from the search index (the entity rows are deleted separately)."""
+
+    @abstractmethod
+    def search_index_rebuild(self, cur, prefix: str):
+        """Re-index every search entity."""
+
+    @abstractmethod
+    def search_prefix(self, cur, prefix: str, tokens: list[str], filter_sql: str, filter_params: list, limit: int) -> list[tuple]:
+        """(id, entity_type, name, rank) of entities with words starting with every token, best (lowest rank) first."""
+
+    @abstractmethod
+    def search_trigram(self, cur, prefix: str, query: str, filter_sql: str, filter_params: list, limit: int) -> list[tuple]:
+        """(id, entity_type, name) candidates sharing trigrams with `query`, best first."""
@@ -0,0 +1,195 @@
+# storage/postgres_backend.py
+"""
+PostgreSQL storage, so several API workers can share one store.
+
+All domains live in one database (like the SQLite "unified" mode). The
+handlers' `?` placeholders are rewritten to psycopg's `%s` once per query
+string, so the same text maps to the same server-side prepared statement:
+psycopg prepares a query after it has run `GZTP_PG_PREPARE_THRESHOLD`
+times on a connection. Connections come from a pool of up to
+`GZTP_PG_POOL_SIZE`, writers are serialized with advisory locks, bulk state
+rows are written with COPY, and the name search uses full-text search plus
+pg_trgm.
+
+Requires psycopg (`pip install "gztprocessor[postgres]"`).
+"""
+import re
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+from gztprocessor.metrics import count_query
+from gztprocessor.storage.base import StorageBackend
+
+try:
+    import psycopg
+    from psycopg_pool import ConnectionPool
+except ImportError:
+    psycopg = None
+
+# String literals are left alone; outside them `?` becomes `%s` and a
+# literal `%` (e.g. pg_trgm's operators) is escaped
+_PLACEHOLDER = re.compile(r"'(?:[^']|'')*'|\?|%")
+
+
+@lru_cache(maxsize=2048)
+def to_psycopg(sql: str) -> str:
+    return _PLACEHOLDER.sub(lambda m: {"?": "%s", "%": "%%"}.get(m.group(0), m.group(0)), sql)
+
+
+class _Cursor:
+    """psycopg cursor taking the handlers' `?`-style SQL."""
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, sql: str, params=()):
+        count_query()
+        self._cur.execute(to_psycopg(sql), tuple(params))
+        return self
+
+    def executemany(self, sql: str, rows):
+        count_query()
+        self._cur.executemany(to_psycopg(sql), [tuple(row) for row in rows])
+        return self
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+class _PooledConnection:
+    """A pooled connection for the length of a `with` block: commits on success, rolls back on error."""
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._conn = None
+
+    def __enter__(self):
+        self._conn = self._pool.getconn()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        finally:
+            self._pool.putconn(self._conn)
+            self._conn = None
+
+    def cursor(self) -> _Cursor:
+        return _Cursor(self._conn.cursor())
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+
+class PostgresBackend(StorageBackend):
+    name = "postgres"
+
+    def __init__(self, dsn: str, pool_size: int = 10, prepare_threshold: int = 2):
+        if psycopg is None:
+            raise RuntimeError('PostgreSQL storage needs psycopg: pip install "gztprocessor[postgres]"')
+        if not dsn:
+            raise RuntimeError("Set GZTP_POSTGRES_DSN to use PostgreSQL storage.")
+        self.dsn = dsn
+        self.pool_size = pool_size
+        self.prepare_threshold = prepare_threshold
+        self._pool = None
+
+    @property
+    def pool(self):
+        # Opened on first use, so importing the package doesn't need a server
+        if self._pool is None:
+            self._pool = ConnectionPool(
+                self.dsn,
+                min_size=1,
+                max_size=self.pool_size,
+                kwargs={"prepare_threshold": self.prepare_threshold},
+                open=True,
+            )
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def connect(self, domain: str) -> _PooledConnection:
+        return _PooledConnection(self.pool)
+
+    def init_schema(self, domain: str, schema_path: Path):
+        # Same schema file name under schemas/postgres/
+        pg_schema_path = schema_path.parent / "postgres" / schema_path.name
+        with self.connect(domain) as conn:
+            with open(pg_schema_path, "r", encoding="utf-8") as f:
+                # Several statements in one call: run unprepared, without parameters
+                conn.cursor()._cur.execute(f.read(), prepare=False)
+
+    @contextmanager
+    def write_lock(self, conn, domain: str):
+        # Transaction-scoped advisory lock: released by the commit or rollback
+        # when the connection's `with` block ends
+        key = zlib.crc32(f"gztprocessor:{domain}".encode("utf-8"))
+        conn.cursor().execute("SELECT pg_advisory_xact_lock(?)", (key,))
+        yield
+
+    def insert_returning_id(self, cur, sql: str, params) -> int | None:
+        cur.execute(f"{sql} RETURNING id", params)
+        row = cur.fetchone()
+        return row[0] if row else None
+
+    def copy_rows(self, cur, table: str, columns: list[str], rows):
+        count_query()
+        with cur.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+
+    def nocase_equals(self, column: str) -> str:
+        return f"lower({column}) = lower(?)"
+
+    # The search columns are indexed by the schema's expression indexes, so
+    # entity rows need no separate index maintenance
+
+    def search_index_add(self, cur, prefix: str, entity_id: int, name: str):
+        pass
+
+    def search_index_clear(self, cur, prefix: str):
+        pass
+
+    def search_index_rebuild(self, cur, prefix: str):
+        pass
+
+    def search_prefix(self, cur, prefix: str, tokens: list[str], filter_sql: str, filter_params: list, limit: int) -> list[tuple]:
+        cur.execute(
+            f"""
+            SELECT e.id, e.entity_type, e.name, -ts_rank(to_tsvector('simple', e.name), q.query)
+            FROM {prefix}_search_entity e, (SELECT to_tsquery('simple', ?) AS query) q
+            WHERE to_tsvector('simple', e.name) @@ q.query {filter_sql}
+            ORDER BY 4, e.id
+            LIMIT ?
+            """,
+            [" & ".join(f"{token}:*" for token in tokens), *filter_params, limit],
+        )
+        return cur.fetchall()
+
+    def search_trigram(self, cur, prefix: str, query: str, filter_sql: str, filter_params: list, limit: int) -> list[tuple]:
+        cur.execute(
+            f"""
+            SELECT e.id, e.entity_type, e.name
+            FROM {prefix}_search_entity e
+            WHERE CAST(? AS TEXT) <% e.name {filter_sql}
+            ORDER BY word_similarity(CAST(? AS TEXT), e.name) DESC, e.id
+            LIMIT ?
+            """,
+            [query, *filter_params, query, limit],
+        )
+        return cur.fetchall()
@@ -0,0 +1,145 @@
+# storage/sqlite_backend.py
+import re
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from gztprocessor.db_connections.db_config import DATA_DIR, DB_FILES, DB_MODE, db_path
+from gztprocessor.metrics import count_query
+from gztprocessor.storage.base import StorageBackend
+
+
+def _lock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:  # LK_LOCK gives up after ~10s; keep waiting
+                pass
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _prefix_query(tokens: list[str]) -> str:
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _trigram_query(query: str) -> str:
+    text = " ".join(re.findall(r"\w+", query.lower()))
+    grams = {text[i:i + 3] for i in range(len(text) - 2)}
+    grams = {gram for gram in grams if " " not in gram}
+    return " OR ".join(f'"{gram}"' for gram in sorted(grams))
+
+
+class SQLiteBackend(StorageBackend):
+    """SQLite files laid out according to GZTP_DB_MODE (see db_config.py); search uses FTS5."""
+
+    name = "sqlite"
+
+    def connect(self, domain: str):
+        """
+        - split:    each domain has its own file (the default)
+        - unified:  every domain shares gztprocessor.db, so one connection sees
+                    all tables and a single commit covers them all
+        - attached: the domain's own file, with the other files ATTACHed under
+                    their domain name (e.g. `person.portfolio` from a gov
+                    connection); unqualified names still resolve to the own file
+        """
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(db_path(domain))
+        # Every statement run on the connection counts towards /metrics
+        conn.set_trace_callback(count_query)
+        if DB_MODE == "unified":
+            # One WAL for every domain, and readers don't wait for writers. Attached
+            # mode keeps the rollback journal: under WAL, commits spanning several
+            # attached files aren't atomic
+            conn.execute("PRAGMA journal_mode=WAL")
+        elif DB_MODE == "attached":
+            for other, path in DB_FILES.items():
+                if other != domain:
+                    conn.execute(f"ATTACH DATABASE ? AS {other}", (str(path),))
+        return conn
+
+    def init_schema(self, domain: str, schema_path: Path):
+        with self.connect(domain) as conn:
+            with open(schema_path, "r", encoding="utf-8") as f:
+                conn.executescript(f.read())
+
+    @contextmanager
+    def write_lock(self, conn, domain: str):
+        # An exclusive lock on a file next to the databases. Every `with`
+        # opens its own handle, so threads of one worker exclude each other
+        # as well as other workers do.
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        with open(DATA_DIR / f".{domain}.lock", "a+b") as f:
+            _lock_file(f)
+            try:
+                yield
+            finally:
+                _unlock_file(f)
+
+    def insert_returning_id(self, cur, sql: str, params) -> int | None:
+        cur.execute(sql, params)
+        return cur.lastrowid if cur.rowcount else None
+
+    def nocase_equals(self, column: str) -> str:
+        return f"{column} = ? COLLATE NOCASE"
+
+    def search_index_add(self, cur, prefix: str, entity_id: int, name: str):
+        cur.execute(f"INSERT INTO {prefix}_search_fts (rowid, name) VALUES (?, ?)", (entity_id, name))
+        cur.execute(f"INSERT INTO {prefix}_search_trigram (rowid, name) VALUES (?, ?)", (entity_id, name))
+
+    def search_index_clear(self, cur, prefix: str):
+        cur.execute(f"INSERT INTO {prefix}_search_fts ({prefix}_search_fts) VALUES ('delete-all')")
+        cur.execute(f"INSERT INTO {prefix}_search_trigram ({prefix}_search_trigram) VALUES ('delete-all')")
+
+    def search_index_rebuild(self, cur, prefix: str):
+        cur.execute(f"INSERT INTO {prefix}_search_fts ({prefix}_search_fts) VALUES ('rebuild')")
+        cur.execute(f"INSERT INTO {prefix}_search_trigram ({prefix}_search_trigram) VALUES ('rebuild')")
+
+    def search_prefix(self, cur, prefix: str, tokens: list[str], filter_sql: str, filter_params: list, limit: int) -> list[tuple]:
+        cur.execute(
+            f"""
+            SELECT e.id, e.entity_type, e.name, bm25({prefix}_search_fts)
+            FROM {prefix}_search_fts
+            JOIN {prefix}_search_entity e ON e.id = {prefix}_search_fts.rowid
+            WHERE {prefix}_search_fts MATCH ? {filter_sql}
+            ORDER BY bm25({prefix}_search_fts)
+            LIMIT ?
+            """,
+            [_prefix_query(tokens), *filter_params, limit],
+        )
+        return cur.fetchall()
+
+    def search_trigram(self, cur, prefix: str, query: str, filter_sql: str, filter_params: list, limit: int) -> list[tuple]:
+        trigram_query = _trigram_query(query)
+        if not trigram_query:
+            return []
+        cur.execute(
+            f"""
+            SELECT e.id, e.entity_type, e.name
+            FROM {prefix}_search_trigram
+            JOIN {prefix}_search_entity e ON e.id = {prefix}_search_trigram.rowid
+            WHERE {prefix}_search_trigram MATCH ? {filter_sql}
+            ORDER BY bm25({prefix}_search_trigram)
+            LIMIT ?
+            """,
+            [trigram_query, *filter_params, limit],
+        )
+        return cur.fetchall()
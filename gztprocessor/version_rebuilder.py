@@ -0,0 +1,163 @@
+# version_rebuilder.py
+"""
+Rebases the versions after a newly written (or rewritten) gazette.
+
+Every applied version is recorded in the domain's `*_applied_version`
+ledger with the input it was built from and a hash of the resulting state.
+When a version is written with later versions already in the DB - an edit
+to an old gazette, or a backfilled one - the later versions are replayed
+from their recorded inputs, oldest first, each on the in-memory state of
+the one before it. As soon as one comes out with the same state (and input)
+as before, everything after it is unchanged too and the rebase stops, so a
+backfill costs work proportional to the affected suffix only.
+
+The rebase runs inside the caller's DB transaction; `publish_rebased` then
+exports snapshots and rewrites the CSVs that depend on the new states.
+Amendment and person CSVs depend only on a version's own transactions, so
+only initial gazette CSVs (whose MOVE rows carry `previous_ministry`) are
+rewritten.
+
+The same replay serves `replay_range`: the states of a run of versions are
+built by loading the first and replaying each later one on the state before
+it, instead of reading every version back from the DB.
+"""
+from gztprocessor import csv_writer
+from gztprocessor.database_handlers.ledger_database_handler import (
+    content_hash,
+    get_later_version_records,
+    get_version_records_between,
+    record_version,
+)
+
+
+def later_versions(cur, version_table: str, gazette_number: str, date_str: str) -> list[tuple[str, str]]:
+    """(date, gazette_number) of the versions after the given one, oldest first."""
+    cur.execute(
+        f"""
+        SELECT DISTINCT date, gazette_number FROM {version_table}
+        WHERE (date > ? OR (date = ? AND gazette_number > ?))
+        ORDER BY date, gazette_number
+        """,
+        (date_str, date_str, gazette_number),
+    )
+    return [tuple(row) for row in cur.fetchall()]
+
+
+def rebase_later_versions(cur, domain: str, version_table: str, gazette_number: str, date_str: str, state: dict, replay, write_version) -> list[dict]:
+    """
+    Replay the versions after (gazette_number, date_str) in `version_table`
+    on top of `state`, from their ledger records. `replay(cur, record,
+    base_state)` returns the version's new (state, input); `write_version(cur, gazette_number, date_str, state)`
+    stores a changed state. Returns what was rebased, oldest first.
+    """
+    records = {
+        (record["date"], record["gazette_number"]): record
+        for record in get_later_version_records(cur, domain, gazette_number, date_str)
+    }
+    rebased = []
+    base_state = state
+    # A version whose state is empty has no rows, only a ledger entry
+    versions = sorted(set(later_versions(cur, version_table, gazette_number, date_str)) | set(records))
+    for version in versions:
+        record = records.get(version)
+        if record is None:
+            # Applied before the ledger existed: nothing to replay it from
+            print(f"⚠️ No recorded input for {version[1]} on {version[0]}; stopping rebase there")
+            break
+        new_state, new_input = replay(cur, record, base_state)
+        state_hash = content_hash(new_state)
+        state_changed = state_hash != record["state_hash"]
+        input_changed = content_hash(new_input) != record["input_hash"]
+        if not state_changed and not input_changed:
+            break
+
+        if state_changed:
+            write_version(cur, record["gazette_number"], record["date"], new_state)
+        record_version(cur, domain, record["gazette_number"], record["date"], record["kind"], new_input, new_state)
+        rebased.append({
+            "gazette_number": record["gazette_number"],
+            "date": record["date"],
+            "kind": record["kind"],
+            "state": new_state,
+            "input": new_input,
+            "state_changed": state_changed,
+        })
+        if not state_changed:
+            # Only this version's own output changed; later ones build on the same state
+            break
+        base_state = new_state
+    return rebased
+
+
+def versions_between(cur, domain: str, version_table: str, from_date: str, to_date: str) -> tuple[list[tuple[str, str]], dict]:
+    """
+    (date, gazette_number) of the versions dated from_date..to_date, oldest
+    first, and their ledger records by version.
+    """
+    records = {
+        (record["date"], record["gazette_number"]): record
+        for record in get_version_records_between(cur, domain, from_date, to_date)
+    }
+    cur.execute(
+        f"SELECT DISTINCT date, gazette_number FROM {version_table} WHERE date >= ? AND date <= ?",
+        (from_date, to_date),
+    )
+    # A version whose state is empty has no rows, only a ledger entry
+    return sorted({tuple(row) for row in cur.fetchall()} | set(records)), records
+
+
+def replay_range(cur, versions: list[tuple[str, str]], records: dict, replay, load) -> list[dict]:
+    """
+    States of consecutive `versions` ((date, gazette_number), oldest first)
+    in one pass. The first is loaded with `load(gazette_number, date_str)`;
+    each later one is its ledger record replayed on the state before it,
+    trusted only if it comes out with the recorded state hash and loaded
+    otherwise (e.g. no record). Returns [{gazette_number, date, state}].
+    """
+    states = []
+    state = None
+    for date_str, gazette_number in versions:
+        record = records.get((date_str, gazette_number))
+        replayed = None
+        if state is not None and record is not None:
+            replayed, _ = replay(cur, record, state)
+            if content_hash(replayed) != record["state_hash"]:
+                replayed = None
+        state = replayed if replayed is not None else load(gazette_number, date_str)
+        states.append({"gazette_number": gazette_number, "date": date_str, "state": state})
+    return states
+
+
+def discard_binary_snapshots(state_manager, gazette_number: str, date_str: str, rebased: list[dict]):
+    """
+    Drop the binary snapshots of the written version and of the rebased ones
+    whose state changed. Called before the write commits and while it still
+    holds the domain's write lock, so no worker can serve an old binary
+    snapshot of a committed version; after a rollback, readers just use the DB.
+    """
+    state_manager.discard_binary_snapshot(gazette_number, date_str)
+    for version in rebased:
+        if version["state_changed"]:
+            state_manager.discard_binary_snapshot(version["gazette_number"], version["date"])
+
+
+def publish_rebased(state_manager, rebased: list[dict], generation: int) -> dict:
+    """
+    After commit: export snapshots and rewrite dependent CSVs. Returns a summary.
+    `generation` is the write generation the rebase committed.
+    """
+    for version in rebased:
+        if version["state_changed"]:
+            state_manager.export_state_snapshot(version["gazette_number"], version["date"], version["state"], generation)
+        if version["kind"] == "initial":
+            csv_writer.generate_initial_add_csv(version["gazette_number"], version["date"], version["input"])
+
+    if rebased:
+        print(f"🔁 Rebased {len(rebased)} later version(s)")
+    return {
+        "unchanged": False,
+        "rebased": [
+            {"gazette_number": v["gazette_number"], "date": v["date"], "state_changed": v["state_changed"]}
+            for v in rebased
+        ]
+    }
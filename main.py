@@ -7,7 +7,11 @@ from gztprocessor.db_connections.db_trans import init_db as init_transaction_db
 from routes.mindep_router import mindep_router
 from routes.person_router import person_router
 from routes.transaction_router import transaction_router
+from routes.search_router import search_router
+from routes.metrics_router import metrics_router
 from fastapi.middleware.cors import CORSMiddleware
+from compression import CompressionMiddleware, COMPRESSION, COMPRESSION_MIN_SIZE, COMPRESSION_LEVEL
+from metrics_middleware import MetricsMiddleware, TimedJSONResponse
 
 if __name__ == "__main__":
     init_gov_db()
@@ -15,10 +19,12 @@ if __name__ == "__main__":
     init_transaction_db()
     print("✅ Databases initialized.")
 
-app = FastAPI()
+app = FastAPI(default_response_class=TimedJSONResponse)
 app.include_router(mindep_router)
 app.include_router(person_router)
 app.include_router(transaction_router)
+app.include_router(search_router)
+app.include_router(metrics_router)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"], 
@@ -26,6 +32,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    encoding=COMPRESSION,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    level=COMPRESSION_LEVEL,
+)
+# Outermost, so request times include compression
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
@@ -0,0 +1,42 @@
+import time
+
+from fastapi.responses import JSONResponse
+
+import gztprocessor.metrics as metrics
+
+
+class MetricsMiddleware:
+    """
+    Record each HTTP request's time and SQL statement count under its route
+    template (e.g. /mindep/state/{date}), so the labels stay bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        with metrics.request_scope() as queries:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                # The router puts the matched route into the shared scope
+                route = scope.get("route")
+                metrics.observe_request(
+                    scope["method"],
+                    getattr(route, "path", "unmatched"),
+                    time.perf_counter() - started,
+                    queries[0],
+                )
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse whose encoding shows up as the "response.render" stage."""
+
+    def render(self, content) -> bytes:
+        with metrics.timed("response.render"):
+            return super().render(content)
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+import gztprocessor.metrics as metrics
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics")
+def get_metrics():
+    """
+    Stage timings, request latency and SQL statement counts per route, and
+    cache hit rates of this worker, in the Prometheus text format.
+    """
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -7,6 +7,7 @@ from gztprocessor.state_managers.mindep_state_manager import MindepStateManager
 import gztprocessor.gazette_processors.mindep_gazette_processor as mindep_gazette_processor
 import gztprocessor.database_handlers.mindep_database_handler as mindep_database
 import gztprocessor.database_handlers.transaction_database_handler as trans_database
+import gztprocessor.database_handlers.history_database_handler as history_database
 import gztprocessor.csv_writer as csv_writer
 from routes.state_router import create_state_routes
 import utils as utils
@@ -14,7 +15,7 @@ import utils as utils
 mindep_router = APIRouter()
 mindep_state_manager = MindepStateManager()
 
-mindep_router.include_router(create_state_routes("mindep", mindep_state_manager))
+mindep_router.include_router(create_state_routes("mindep", mindep_state_manager, mindep_database.get_states_between))
 
 
 @mindep_router.get("/mindep/initial/{date}/{gazette_number}")
@@ -40,9 +41,10 @@ def create_state_from_initial_gazette(gazette_number: str, date: str, ministries
     Load ministries to DB and save state snapshot for initial gazette.
     """
     try:
-        mindep_database.load_initial_state_to_db(gazette_number, date, ministries)
-        csv_writer.generate_initial_add_csv(gazette_number, date, ministries)
-        return {"message": f"State created for initial gazette {gazette_number} on {date}"}
+        downstream = mindep_database.load_initial_state_to_db(gazette_number, date, ministries)
+        if not downstream["unchanged"]:
+            csv_writer.generate_initial_add_csv(gazette_number, date, ministries)
+        return {"message": f"State created for initial gazette {gazette_number} on {date}", "downstream": downstream}
     except FileNotFoundError:
         return {"error": f"Gazette file for {gazette_number}, {date} not found."}
 
@@ -69,9 +71,21 @@ def create_state_from_amendment_gazette(gazette_number: str, date: str, transact
     Apply user-reviewed transactions and save new state snapshot.
     """
     try:
-        mindep_database.apply_transactions_to_db(gazette_number, date, transactions)
-        csv_writer.generate_amendment_csvs(gazette_number, date, transactions)
-        return {"message": f"State updated for amendment gazette {gazette_number} on {date}"}
+        downstream = mindep_database.apply_transactions_to_db(gazette_number, date, transactions)
+        if not (downstream and downstream["unchanged"]):
+            csv_writer.generate_amendment_csvs(gazette_number, date, transactions)
+        return {"message": f"State updated for amendment gazette {gazette_number} on {date}", "downstream": downstream}
     except FileNotFoundError:
         return {"error": f"Gazette file for {gazette_number}, {date} not found."}
-    
+
+
+@mindep_router.get("/mindep/history/{department}")
+def get_department_history(department: str, since: str | None = None):
+    """
+    Return every ministry the department has belonged to, oldest first.
+    Optional `since` (YYYY-MM-DD) drops intervals that ended before that date.
+    """
+    history = history_database.get_department_history(department, since)
+    if not history:
+        return {"error": f"No history found for department {department}"}
+    return {"department": department, "history": history}
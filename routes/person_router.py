@@ -7,6 +7,7 @@ from gztprocessor.state_managers.person_state_manager import PersonStateManager
 import gztprocessor.gazette_processors.person_gazette_processor as person_gazette_processor
 import gztprocessor.database_handlers.person_database_handler as person_database
 import gztprocessor.database_handlers.transaction_database_handler as trans_database
+import gztprocessor.database_handlers.history_database_handler as history_database
 import gztprocessor.csv_writer as csv_writer
 from routes.state_router import create_state_routes
 import utils as utils
@@ -14,7 +15,20 @@ import utils as utils
 person_router = APIRouter()
 person_state_manager = PersonStateManager()
 
-person_router.include_router(create_state_routes("person", person_state_manager))
+person_router.include_router(create_state_routes("person", person_state_manager, person_database.get_states_between))
+
+# Registered before /person/{date}/{gazette_number} so "history" isn't taken as a date
+@person_router.get("/person/history/{name}")
+def get_person_history(name: str, since: str | None = None):
+    """
+    Return every portfolio the person has held, oldest first.
+    Optional `since` (YYYY-MM-DD) drops intervals that ended before that date.
+    """
+    history = history_database.get_person_history(name, since)
+    if not history:
+        return {"error": f"No history found for person {name}"}
+    return {"person": name, "history": history}
+
 
 @person_router.get("/person/{date}/{gazette_number}")
 def get_contents_of_person_gazette(gazette_number: str, date: str):
@@ -38,10 +52,12 @@ def create_state_from_person_gazette(date: str, gazette_number: str, payload: di
     try:
         transactions = payload.get("transactions", {})
 
-        person_database.apply_transactions_to_db(gazette_number, date, transactions)
-        csv_writer.generate_person_csvs(gazette_number, date, transactions)
+        downstream = person_database.apply_transactions_to_db(gazette_number, date, transactions)
+        if not downstream["unchanged"]:
+            csv_writer.generate_person_csvs(gazette_number, date, transactions)
         return {
-            "message": f"State updated for amendment gazette {gazette_number} on {date}"
+            "message": f"State updated for amendment gazette {gazette_number} on {date}",
+            "downstream": downstream
         }
     except FileNotFoundError:
         return {
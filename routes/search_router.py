@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Query
+from typing import List, Optional
+
+import gztprocessor.database_handlers.search_database_handler as search_database
+
+search_router = APIRouter()
+
+
+@search_router.get("/search")
+def search_entities(
+    q: str,
+    type: Optional[List[str]] = Query(None),
+    page: int = 1,
+    page_size: int = 20,
+):
+    """
+    Search ministries, departments, persons and portfolios across all versions.
+    `type` narrows results (repeatable): ministry, department, person, portfolio.
+    Word-prefix matches rank first, then fuzzy (trigram) matches.
+    """
+    if not q.strip():
+        return {"error": "Query must not be empty"}
+    return search_database.search(q, type, page, page_size)
+
+
+@search_router.post("/search/rebuild")
+def rebuild_search_index():
+    """
+    Rebuild both search indexes from the versioned ministry/department and person/portfolio tables.
+    """
+    for domain in search_database.SEARCH_DOMAINS:
+        search_database.rebuild_search_index(domain)
+    return {"message": "Search index rebuilt."}
@@ -2,7 +2,8 @@ from fastapi import APIRouter
 from gztprocessor.state_managers.state_manager import AbstractStateManager  # the shared base class
 from gztprocessor.database_handlers.transaction_database_handler import get_gazette_info
 
-def create_state_routes(prefix: str, state_manager: AbstractStateManager) -> APIRouter:
+def create_state_routes(prefix: str, state_manager: AbstractStateManager, get_states_between) -> APIRouter:
+    """`get_states_between(from_date, to_date)` is the domain handler's one-pass range reader."""
     router = APIRouter(prefix=f"/{prefix}/state")
 
     @router.get("/latest")
@@ -27,6 +28,51 @@ def create_state_routes(prefix: str, state_manager: AbstractStateManager) -> API
             return {"error": "No gazettes found"}
     
 
+    @router.get("/range/{from_date}/{to_date}")
+    def get_states_in_range(from_date: str, to_date: str, deltas: bool = False):
+        """
+        Every version dated from_date..to_date in one response, oldest first.
+        With `deltas=true` only the first carries its full state; the others
+        carry their diff from it.
+        """
+        versions = get_states_between(from_date, to_date)
+        if not versions:
+            return {"error": f"No state versions between {from_date} and {to_date}"}
+        if deltas:
+            first = versions[0]["state"]
+            versions = versions[:1] + [
+                {"gazette_number": v["gazette_number"], "date": v["date"], "diff": state_manager.diff_states(first, v["state"])}
+                for v in versions[1:]
+            ]
+        return {"from_date": from_date, "to_date": to_date, "versions": versions}
+
+    @router.get("/timeline")
+    def get_version_timeline():
+        """All versions, oldest first, so clients can resolve dates locally while scrubbing."""
+        return [
+            {"gazette_number": gazette_number, "date": date_str}
+            for date_str, gazette_number in state_manager.get_version_timeline()
+        ]
+
+    @router.get("/asof/{date}")
+    def get_state_as_of(date: str):
+        try:
+            return state_manager.get_state_as_of(date)
+        except FileNotFoundError as e:
+            return {"error": str(e)}
+
+    @router.get("/diff/{from_date}/{from_gazette}/{to_date}/{to_gazette}")
+    def get_state_diff(from_date: str, from_gazette: str, to_date: str, to_gazette: str):
+        try:
+            diff = state_manager.get_state_diff(from_gazette, from_date, to_gazette, to_date)
+            return {
+                "from": {"gazette_number": from_gazette, "date": from_date},
+                "to": {"gazette_number": to_gazette, "date": to_date},
+                "diff": diff
+            }
+        except FileNotFoundError as e:
+            return {"error": str(e)}
+
     @router.get("/{date}")
     def get_state_by_date(date: str):
         try:
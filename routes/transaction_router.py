@@ -1,13 +1,13 @@
 import json
 from pathlib import Path
 from typing import Any, Dict
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.params import Body
 from fastapi.responses import FileResponse
 
 import utils as utils
 from gztprocessor.database_handlers.transaction_database_handler import get_gazette_info, get_gazettes_by_president, set_warning
-from gztprocessor.database_handlers.transaction_database_handler import (save_transactions,)
+from gztprocessor.database_handlers.transaction_database_handler import (save_transactions, patch_transactions, DraftConflictError)
 from gztprocessor.database_handlers.transaction_database_handler import (get_saved_transactions,)
 
 transaction_router = APIRouter()
@@ -26,8 +26,27 @@ def get_gazettes_per_president(gazette_type:str,from_date: str, to_date: str):
 @transaction_router.post("/transactions/{gazette_number}")
 def save_current_transactions(gazette_number: str, payload: Dict[str, Any] = Body(...)):
     # payload expected to be like: {"transactions": [...], "moves": [...]}
-    save_transactions(gazette_number, payload)
-    return {"status": "success"}
+    version = save_transactions(gazette_number, payload)
+    if version is None:
+        return {"error": "No record found for gazette"}
+    return {"status": "success", "version": version}
+
+@transaction_router.patch("/transactions/{gazette_number}")
+def patch_current_transactions(gazette_number: str, payload: Dict[str, Any] = Body(...)):
+    """
+    Apply an edit to the saved draft.
+    Expects payload like: {"patch": [{"op": "replace", "path": "/moves/0/to_ministry", "value": "..."}], "base_version": 3}
+    `patch` is a JSON Patch (RFC 6902); `base_version` (optional) is the draft version it was made against.
+    """
+    try:
+        version = patch_transactions(gazette_number, payload.get("patch"), payload.get("base_version"))
+    except DraftConflictError as e:
+        return {"error": str(e), "version": e.version}
+    except ValueError as e:
+        return {"error": f"Invalid patch: {e}"}
+    if version is None:
+        return {"error": "No record found for gazette"}
+    return {"status": "success", "version": version}
 
 @transaction_router.get("/transactions/{gazette_number}")
 def get_transactions(gazette_number: str):
@@ -48,17 +67,27 @@ def set_warning_route(gazette_number: str, payload: dict = Body(...)):
     return {"status": "success", "gazette_number": gazette_number, "warning": bool(warning)}
 
 @transaction_router.get("/download/{gazette_number}/{date_str}/{gazette_type}/{file_type}")
-def download_csv(gazette_number: str, date_str: str, gazette_type:str, file_type: str):
+def download_csv(gazette_number: str, date_str: str, gazette_type:str, file_type: str, request: Request):
     """
     file_type: 'add', 'terminate', 'move'
+    Serves the pre-compressed .csv.gz written by csv_writer when the client accepts gzip.
     """
     file_path = Path("output") / gazette_type / date_str / gazette_number / f"{file_type}.csv"
-    
-    if file_path.exists():
+    gz_path = file_path.with_name(file_path.name + ".gz")
+
+    if not file_path.exists():
+        return {"error": "File not found"}
+
+    if "gzip" in request.headers.get("accept-encoding", "") and gz_path.exists():
         return FileResponse(
-            path=file_path,
+            path=gz_path,
             filename=f"{file_type}.csv",
-            media_type="text/csv"
+            media_type="text/csv",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
         )
-    else:
-        return {"error": "File not found"}
\ No newline at end of file
+
+    return FileResponse(
+        path=file_path,
+        filename=f"{file_type}.csv",
+        media_type="text/csv"
+    )
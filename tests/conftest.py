@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+# db_config reads these at import time, so point them at a scratch directory
+# before anything imports gztprocessor.
+_SCRATCH = tempfile.mkdtemp(prefix="gztp-tests-")
+os.environ["GZTP_STORAGE"] = "sqlite"
+os.environ["GZTP_DB_MODE"] = "split"
+os.environ["GZTP_DATA_DIR"] = _SCRATCH
+os.environ["GZTP_STATE_DIR"] = os.path.join(_SCRATCH, "state")
+
+import pytest
+
+from gztprocessor.db_connections import db_gov, db_person, db_trans
+
+db_gov.init_db()
+db_person.init_db()
+db_trans.init_db()
+
+from gztprocessor.database_handlers import mindep_database_handler, person_database_handler, transaction_database_handler
+from gztprocessor.state_managers.snapshot_writer import snapshot_writer
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Empty databases and snapshot directories; CSVs go under tmp_path/output."""
+    monkeypatch.chdir(tmp_path)
+    db_trans.init_db()
+    mindep_database_handler.mindep_state_manager.clear_all_state_data()
+    person_database_handler.person_state_manager.clear_all_state_data()
+    transaction_database_handler._drafts.clear()
+    yield
+    snapshot_writer.flush()
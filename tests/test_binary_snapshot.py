@@ -0,0 +1,57 @@
+import pytest
+
+from gztprocessor.database_handlers import mindep_database_handler as md
+from gztprocessor.gazette_processors.mindep_gazette_processor import extract_initial_gazette_data
+from gztprocessor.state_managers.binary_snapshot import BinarySnapshot, write_binary_snapshot
+from gztprocessor.state_managers.snapshot_writer import snapshot_writer
+
+MINDEP_STATE = {
+    "ministers": [
+        {"name": "Minister of Finance", "departments": ["Treasury", "Customs", "Treasury"]},
+        {"name": "අමාත්‍යාංශය", "departments": []},
+        {"name": "Minister of Health", "departments": ["Hospitals"]},
+    ]
+}
+PERSON_STATE = {
+    "persons": [
+        {"person_name": "A. Perera", "portfolios": [{"name": "Minister of Finance", "position": "Minister"}]},
+        {"person_name": "B. Silva", "portfolios": [
+            {"name": "Minister of Health", "position": "State Minister"},
+            {"name": "Minister of Finance", "position": "Minister"},
+        ]},
+    ]
+}
+
+
+@pytest.mark.parametrize("state", [MINDEP_STATE, PERSON_STATE, {"ministers": []}])
+def test_round_trip(tmp_path, state):
+    path = write_binary_snapshot(tmp_path / "state.gzts", state)
+    with BinarySnapshot(path) as snapshot:
+        assert snapshot.to_state() == state
+
+
+def test_read_selected_parents(tmp_path):
+    path = write_binary_snapshot(tmp_path / "state.gzts", MINDEP_STATE)
+    with BinarySnapshot(path) as snapshot:
+        assert snapshot.find("Minister of Health") == 2
+        assert snapshot.find("Minister of Trade") is None
+        assert snapshot.to_state(["Minister of Health"]) == {"ministers": [MINDEP_STATE["ministers"][2]]}
+
+
+def test_written_snapshot_matches_db_state(db):
+    data = {"ministers": [dict(m) for m in MINDEP_STATE["ministers"] if m["departments"]]}
+    md.load_initial_state_to_db("1", "2020-01-01", extract_initial_gazette_data("1", "2020-01-01", data))
+    md.apply_transactions_to_db("2", "2020-02-01", [
+        {"type": "MOVE", "department": "Customs", "from_ministry": "Minister of Finance", "to_ministry": "Minister of Health"},
+    ])
+    assert snapshot_writer.flush()
+
+    manager = md.mindep_state_manager
+    for gazette_number, date_str in (("1", "2020-01-01"), ("2", "2020-02-01")):
+        path = manager.get_binary_snapshot_path(gazette_number, date_str)
+        assert path.exists()
+        with md.get_connection() as conn:
+            expected = manager._get_state_from_db(conn.cursor(), gazette_number, date_str)
+        with BinarySnapshot(path) as snapshot:
+            assert snapshot.to_state() == expected
+        assert manager.load_state(gazette_number, date_str) == expected
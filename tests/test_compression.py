@@ -0,0 +1,71 @@
+import pytest
+
+brotli = pytest.importorskip("brotli")
+pytest.importorskip("httpx")
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from compression import CompressionMiddleware
+
+BODY = "gazette " * 500
+
+
+def stream():
+    for _ in range(4):
+        yield BODY
+
+
+app = Starlette(routes=[
+    Route("/text", lambda request: PlainTextResponse(BODY), methods=["GET", "HEAD"]),
+    Route("/small", lambda request: PlainTextResponse("ok")),
+    Route("/stream", lambda request: StreamingResponse(stream(), media_type="text/csv")),
+    Route("/events", lambda request: StreamingResponse(stream(), media_type="text/event-stream")),
+    Route("/empty", lambda request: Response(status_code=204)),
+    Route("/cached", lambda request: Response(status_code=304, headers={"Content-Length": "4000"})),
+])
+client = TestClient(CompressionMiddleware(app, encoding="br", minimum_size=1024, level=5))
+BR = {"Accept-Encoding": "br"}
+
+
+def test_compresses_whole_body():
+    response = client.get("/text", headers=BR)
+    assert response.headers["content-encoding"] == "br"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(BODY)
+    assert response.text == BODY
+
+
+def test_small_body_is_not_compressed():
+    response = client.get("/small", headers=BR)
+    assert "content-encoding" not in response.headers
+    assert response.text == "ok"
+
+
+def test_streamed_body_is_compressed_per_chunk():
+    response = client.get("/stream", headers=BR)
+    assert response.headers["content-encoding"] == "br"
+    assert "content-length" not in response.headers
+    assert response.text == BODY * 4
+
+
+def test_excluded_content_type_passes_through():
+    response = client.get("/events", headers=BR)
+    assert "content-encoding" not in response.headers
+    assert response.text == BODY * 4
+
+
+def test_head_keeps_content_length():
+    response = client.head("/text", headers=BR)
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-length"] == str(len(BODY))
+
+
+@pytest.mark.parametrize("path, status, length", [("/empty", 204, None), ("/cached", 304, "4000")])
+def test_bodiless_statuses_pass_through(path, status, length):
+    response = client.get(path, headers=BR)
+    assert response.status_code == status
+    assert "content-encoding" not in response.headers
+    assert response.headers.get("content-length") == length
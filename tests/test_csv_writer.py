@@ -0,0 +1,57 @@
+import csv
+import gzip
+from pathlib import Path
+
+from gztprocessor.csv_writer import TransactionIdAllocator, generate_amendment_csvs, gzip_path_for
+
+FIELDS = ["transaction_id", "parent", "child"]
+ROW = {"parent": "Minister of Finance", "child": "Treasury"}
+
+TRANSACTIONS = [
+    {"type": "ADD", "department": "Excise", "to_ministry": "Minister of Finance"},
+    {"type": "TERMINATE", "department": "Ports", "from_ministry": "Minister of Trade"},
+    {"type": "MOVE", "department": "Customs", "from_ministry": "Minister of Finance", "to_ministry": "Minister of Trade"},
+]
+
+
+def read_csv(path: Path) -> list[dict]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_ids_are_content_addressed():
+    first = TransactionIdAllocator("mindep", "2289/43").allocate("add", ROW, FIELDS)
+    assert first == TransactionIdAllocator("mindep", "2289/43").allocate("add", dict(ROW), FIELDS)
+    assert first.startswith("2289/43_tr_")
+    assert first != TransactionIdAllocator("mindep", "2297/78").allocate("add", ROW, FIELDS)
+    assert first != TransactionIdAllocator("person", "2289/43").allocate("add", ROW, FIELDS)
+    assert first != TransactionIdAllocator("mindep", "2289/43").allocate("terminate", ROW, FIELDS)
+
+
+def test_identical_rows_get_distinct_ids():
+    ids = TransactionIdAllocator("mindep", "1")
+    allocated = [ids.allocate("add", ROW, FIELDS) for _ in range(3)]
+    assert len(set(allocated)) == 3
+    again = TransactionIdAllocator("mindep", "1")
+    assert [again.allocate("add", ROW, FIELDS) for _ in range(3)] == allocated
+
+
+def test_reexport_keeps_ids_and_order_does_not_matter(db):
+    generate_amendment_csvs("5", "2020-05-01", TRANSACTIONS)
+    output_dir = Path("output") / "mindep" / "2020-05-01" / "5"
+    first = {kind: read_csv(output_dir / f"{kind}.csv") for kind in ("add", "terminate", "move")}
+
+    generate_amendment_csvs("5", "2020-05-01", list(reversed(TRANSACTIONS)))
+    for kind, rows in first.items():
+        path = output_dir / f"{kind}.csv"
+        assert read_csv(path) == rows
+        assert gzip.decompress(gzip_path_for(path).read_bytes()) == path.read_bytes()
+
+
+def test_kinds_without_rows_are_removed(db):
+    generate_amendment_csvs("6", "2020-06-01", TRANSACTIONS)
+    generate_amendment_csvs("6", "2020-06-01", TRANSACTIONS[:1])
+    output_dir = Path("output") / "mindep" / "2020-06-01" / "6"
+    assert (output_dir / "add.csv").exists()
+    assert not (output_dir / "move.csv").exists()
+    assert not gzip_path_for(output_dir / "move.csv").exists()
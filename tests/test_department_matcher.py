@@ -0,0 +1,52 @@
+from gztprocessor.gazette_processors.department_matcher import match_departments, normalize_department_name, optimal_assignment
+
+
+def pairs(matches):
+    return [(m["omitted"], m["inserted"], m["match"]) for m in matches]
+
+
+def test_normalize_department_name():
+    assert normalize_department_name("  Ports & Shipping, Dept. ") == "ports and shipping dept"
+
+
+def test_exact_matches_win_over_fuzzy_ones():
+    matches = match_departments(
+        ["Department of Customs", "Department of Excise"],
+        ["department of excise", "Department of Customs."],
+    )
+    assert pairs(matches) == [(1, 0, "exact"), (0, 1, "exact")]
+    assert all(m["confidence"] == 100.0 for m in matches)
+
+
+def test_alias_match():
+    ids = {"Registrar of Companies": 7, "Department of the Registrar of Companies": 7}
+    matches = match_departments(
+        ["Registrar of Companies"], ["Department of the Registrar of Companies"], resolve_alias=ids.get
+    )
+    assert pairs(matches) == [(0, 0, "alias")]
+
+
+def test_fuzzy_match_above_threshold_only():
+    matches = match_departments(
+        ["Department of Wild Life Conservation", "Department of Meteorology"],
+        ["Department of Wildlife Conservation", "Department of Archaeology"],
+    )
+    assert pairs(matches) == [(0, 0, "fuzzy")]
+    assert 85 <= matches[0]["confidence"] < 100
+
+
+def test_fuzzy_pairs_are_assigned_jointly():
+    # Pairing the highest score first (1 with 1) would leave omitted name 0
+    # without a partner above the threshold
+    matches = match_departments(
+        ["Department of Fisheries and Aquatic Resources", "Department of Fisheries Resources"],
+        ["Department of Fishery Resources", "Department of Fisheries and Resources"],
+    )
+    assert pairs(matches) == [(1, 0, "fuzzy"), (0, 1, "fuzzy")]
+
+
+def test_optimal_assignment():
+    assert optimal_assignment([[90, 80], [85, 10]]) == [(0, 1), (1, 0)]
+    assert optimal_assignment([[1, 5, 3]]) == [(0, 1)]
+    assert optimal_assignment([[1], [5], [3]]) == [(1, 0)]
+    assert optimal_assignment([]) == []
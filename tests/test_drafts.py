@@ -0,0 +1,82 @@
+import pytest
+
+from gztprocessor.database_handlers import transaction_database_handler as th
+from gztprocessor.db_connections.db_trans import get_connection
+from gztprocessor.json_patch import apply_json_patch
+
+ADD_EXCISE = {"type": "ADD", "department": "Excise", "to_ministry": "Minister of Finance"}
+
+
+def patch_rows(gazette_number):
+    with get_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM transaction_draft_patch WHERE gazette_number = ?", (gazette_number,))
+        return cur.fetchone()[0]
+
+
+def test_apply_json_patch():
+    doc = {"transactions": [{"department": "A"}], "moves": []}
+    patched = apply_json_patch(doc, [
+        {"op": "add", "path": "/transactions/-", "value": {"department": "B"}},
+        {"op": "replace", "path": "/transactions/0/department", "value": "C"},
+        {"op": "move", "from": "/transactions/1", "path": "/moves/0"},
+        {"op": "test", "path": "/moves/0/department", "value": "B"},
+    ])
+    assert patched == {"transactions": [{"department": "C"}], "moves": [{"department": "B"}]}
+    assert doc == {"transactions": [{"department": "A"}], "moves": []}
+
+
+@pytest.mark.parametrize("patch", [
+    [{"op": "remove", "path": "/missing"}],
+    [{"op": "test", "path": "/moves", "value": ["x"]}],
+    [{"op": "add", "path": "/transactions/5", "value": 1}],
+    {"op": "add", "path": "/moves/-", "value": 1},
+])
+def test_apply_json_patch_rejects(patch):
+    with pytest.raises(ValueError):
+        apply_json_patch({"transactions": [], "moves": []}, patch)
+
+
+def test_patches_build_on_the_saved_draft(db):
+    th.create_record("10", "mindep", "amendment", "2020-01-01")
+    assert th.get_draft("10")[0] == 0
+    assert th.save_transactions("10", {"transactions": [], "moves": []}) == 1
+    assert th.patch_transactions("10", [{"op": "add", "path": "/transactions/-", "value": ADD_EXCISE}]) == 2
+    assert th.patch_transactions("10", [{"op": "add", "path": "/moves/-", "value": "Customs"}], base_version=2) == 3
+
+    expected = {"transactions": [ADD_EXCISE], "moves": ["Customs"]}
+    assert th.get_draft("10") == (3, expected)
+    # A worker with nothing cached rebuilds the same draft from the stored patches
+    th._drafts.clear()
+    assert th.get_draft("10") == (3, expected)
+
+
+def test_stale_patch_is_rejected(db):
+    th.create_record("11", "mindep", "amendment", "2020-01-01")
+    th.save_transactions("11", {"transactions": [], "moves": []})
+    th.patch_transactions("11", [{"op": "add", "path": "/moves/-", "value": "Customs"}])
+
+    with pytest.raises(th.DraftConflictError) as error:
+        th.patch_transactions("11", [{"op": "add", "path": "/moves/-", "value": "Excise"}], base_version=1)
+    assert error.value.version == 2
+    assert th.get_draft("11") == (2, {"transactions": [], "moves": ["Customs"]})
+
+
+def test_patch_for_unknown_gazette(db):
+    assert th.patch_transactions("missing", [{"op": "add", "path": "/moves/-", "value": "x"}]) is None
+
+
+def test_patches_are_compacted(db, monkeypatch):
+    monkeypatch.setattr(th, "DRAFT_COMPACT_EVERY", 3)
+    th.create_record("12", "mindep", "amendment", "2020-01-01")
+    th.save_transactions("12", {"transactions": [], "moves": []})
+    th.patch_transactions("12", [{"op": "add", "path": "/moves/-", "value": "A"}])
+    assert patch_rows("12") == 1
+
+    # Version 3 saves the merged draft whole and drops its patches
+    th.patch_transactions("12", [{"op": "add", "path": "/moves/-", "value": "B"}])
+    assert patch_rows("12") == 0
+    th.patch_transactions("12", [{"op": "add", "path": "/moves/-", "value": "C"}])
+    assert patch_rows("12") == 1
+    th._drafts.clear()
+    assert th.get_draft("12") == (4, {"transactions": [], "moves": ["A", "B", "C"]})
@@ -0,0 +1,149 @@
+from gztprocessor.database_handlers import mindep_database_handler as md
+from gztprocessor.database_handlers.history_database_handler import DEPARTMENT_HISTORY, collect_intervals, _insert_columns
+from gztprocessor.database_handlers.ledger_database_handler import get_generation
+from gztprocessor.gazette_processors.mindep_gazette_processor import extract_initial_gazette_data
+
+INITIAL = {
+    "ministers": [
+        {"name": "Minister of Finance", "departments": ["Treasury", "Customs"]},
+        {"name": "Minister of Health", "departments": ["Hospitals"]},
+    ]
+}
+
+
+def load_initial(gazette_number, date_str, data):
+    ministries = extract_initial_gazette_data(gazette_number, date_str, {"ministers": [dict(m) for m in data["ministers"]]})
+    return md.load_initial_state_to_db(gazette_number, date_str, ministries)
+
+
+def add(department, ministry):
+    return {"type": "ADD", "department": department, "to_ministry": ministry}
+
+
+def move(department, from_ministry, to_ministry):
+    return {"type": "MOVE", "department": department, "from_ministry": from_ministry, "to_ministry": to_ministry}
+
+
+def terminate(department, ministry):
+    return {"type": "TERMINATE", "department": department, "from_ministry": ministry}
+
+
+def state_of(gazette_number, date_str):
+    with md.get_connection() as conn:
+        return md.mindep_state_manager._get_state_from_db(conn.cursor(), gazette_number, date_str)
+
+
+def history_rows():
+    with md.get_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT {', '.join(_insert_columns(DEPARTMENT_HISTORY))}, end_gazette_number, end_date "
+            f"FROM {DEPARTMENT_HISTORY['table']}"
+        )
+        return sorted(map(tuple, cur.fetchall()), key=repr)
+
+
+def rebuilt_history_rows():
+    with md.get_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(DEPARTMENT_HISTORY["rebuild_query"])
+        rows, _ = collect_intervals(cur.fetchall(), len(DEPARTMENT_HISTORY["key_columns"]))
+        return sorted(map(tuple, rows), key=repr)
+
+
+def test_backfilled_amendment_rebases_later_versions(db):
+    load_initial("1", "2020-01-01", INITIAL)
+    md.apply_transactions_to_db("3", "2020-03-01", [move("Customs", "Minister of Finance", "Minister of Health")])
+
+    summary = md.apply_transactions_to_db("2", "2020-02-01", [add("Excise", "Minister of Finance")])
+
+    assert summary["unchanged"] is False
+    assert [(v["gazette_number"], v["state_changed"]) for v in summary["rebased"]] == [("3", True)]
+    assert state_of("3", "2020-03-01") == {
+        "ministers": [
+            {"name": "Minister of Finance", "departments": ["Treasury", "Excise"]},
+            {"name": "Minister of Health", "departments": ["Hospitals", "Customs"]},
+        ]
+    }
+    assert history_rows() == rebuilt_history_rows()
+
+
+def test_backfilled_version_matches_sequential_apply(db):
+    versions = [
+        ("2", "2020-02-01", [add("Excise", "Minister of Finance")]),
+        ("3", "2020-03-01", [move("Customs", "Minister of Finance", "Minister of Health")]),
+        ("4", "2020-04-01", [terminate("Excise", "Minister of Finance")]),
+    ]
+    load_initial("1", "2020-01-01", INITIAL)
+    for gazette_number, date_str, transactions in versions:
+        md.apply_transactions_to_db(gazette_number, date_str, transactions)
+    expected = [state_of(g, d) for g, d, _ in versions]
+    expected_history = history_rows()
+
+    md.mindep_state_manager.clear_all_state_data()
+    load_initial("1", "2020-01-01", INITIAL)
+    for gazette_number, date_str, transactions in reversed(versions):
+        md.apply_transactions_to_db(gazette_number, date_str, transactions)
+
+    assert [state_of(g, d) for g, d, _ in versions] == expected
+    assert history_rows() == expected_history == rebuilt_history_rows()
+
+
+def test_rebase_stops_at_first_unchanged_version(db):
+    load_initial("1", "2020-01-01", INITIAL)
+    md.apply_transactions_to_db("3", "2020-03-01", [terminate("Hospitals", "Minister of Health")])
+    load_initial("4", "2020-04-01", {"ministers": [{"name": "Minister of Trade", "departments": ["Treasury"]}]})
+    md.apply_transactions_to_db("5", "2020-05-01", [add("Ports", "Minister of Trade")])
+
+    summary = md.apply_transactions_to_db("2", "2020-02-01", [add("Excise", "Minister of Finance")])
+
+    # Version 4 restates the whole structure, so nothing after it changes
+    assert [v["gazette_number"] for v in summary["rebased"]] == ["3"]
+    assert state_of("5", "2020-05-01") == {
+        "ministers": [{"name": "Minister of Trade", "departments": ["Treasury", "Ports"]}]
+    }
+    assert history_rows() == rebuilt_history_rows()
+
+
+def test_repost_leaves_version_unchanged(db):
+    load_initial("1", "2020-01-01", INITIAL)
+    transactions = [add("Excise", "Minister of Finance")]
+    md.apply_transactions_to_db("2", "2020-02-01", transactions)
+    state = state_of("2", "2020-02-01")
+    with md.get_connection() as conn:
+        generation = get_generation(conn.cursor(), "mindep")
+
+    summary = md.apply_transactions_to_db("2", "2020-02-01", list(transactions))
+
+    assert summary == {"unchanged": True, "rebased": []}
+    assert state_of("2", "2020-02-01") == state
+    with md.get_connection() as conn:
+        assert get_generation(conn.cursor(), "mindep") == generation
+
+
+def test_repost_with_new_input_rewrites_version(db):
+    load_initial("1", "2020-01-01", INITIAL)
+    md.apply_transactions_to_db("2", "2020-02-01", [add("Excise", "Minister of Finance")])
+
+    summary = md.apply_transactions_to_db("2", "2020-02-01", [add("Ports", "Minister of Finance")])
+
+    assert summary["unchanged"] is False
+    assert state_of("2", "2020-02-01")["ministers"][0]["departments"] == ["Treasury", "Customs", "Ports"]
+
+
+def test_repost_without_fuzzy_move_drops_its_alias(db):
+    load_initial("1", "2020-01-01", INITIAL)
+    renamed = dict(move("Dept. of Customs", "Minister of Finance", "Minister of Health"), previous_department="Customs")
+    md.apply_transactions_to_db("2", "2020-02-01", [renamed])
+    with md.get_connection() as conn:
+        cur = conn.cursor()
+        assert md.entities.lookup(cur, "department", "Dept. of Customs") == md.entities.lookup(cur, "department", "Customs")
+
+    md.apply_transactions_to_db("2", "2020-02-01", [
+        terminate("Customs", "Minister of Finance"),
+        add("Dept. of Customs", "Minister of Health"),
+    ])
+    assert state_of("2", "2020-02-01")["ministers"][1]["departments"] == ["Hospitals", "Dept. of Customs"]
+    with md.get_connection() as conn:
+        cur = conn.cursor()
+        assert md.entities.lookup(cur, "department", "Dept. of Customs") != md.entities.lookup(cur, "department", "Customs")
@@ -1,9 +1,12 @@
 import json
 from pathlib import Path
 
+from gztprocessor.metrics import timed
+
 MINDEP_INPUT_DIR = Path(__file__).resolve().parent / "input" / "mindep"
 PERSON_INPUT_DIR = Path(__file__).resolve().parent / "input" / "person"
 
+@timed("utils.load_mindep_gazette")
 def load_mindep_gazette_data_from_JSON(gazette_number: str, date_str: str) -> dict:
     """
     Load a gazette JSON file using gazette number and date.
@@ -45,6 +48,7 @@ def load_mindep_gazette_data_from_JSON(gazette_number: str, date_str: str) -> di
         raise ValueError(f"Invalid JSON format in {json_path}: {e}")
     
 
+@timed("utils.load_person_gazette")
 def load_person_gazette_data_from_JSON(gazette_number: str, date_str: str) -> dict:
     """
     Load a gazette JSON file using gazette number and date.